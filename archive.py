@@ -0,0 +1,241 @@
+# archive.py - Потоковый зашифрованный экспорт хранилища
+"""
+Формат архива (.pmvault):
+
+    Заголовок:  magic "PMVAULT1" | версия (1) | размер порции (4)
+                | итерации PBKDF2 (4) | соль (32) | префикс nonce (8)
+    Порции:     флаг последней порции (1) | длина шифротекста (4) | шифротекст
+
+Открытый текст - поток JSON-строк (по записи на строку), нарезанный на
+порции фиксированного размера без учёта границ записей. Каждая порция
+шифруется AES-256-GCM: nonce = префикс || номер порции, AAD = заголовок
+|| номер порции || флаг последней. Перестановка, удаление или обрезка
+порций обнаруживаются при чтении. Ключ выводится из пароля архива,
+поэтому архив переносим между хранилищами.
+
+Запись и чтение идут последовательно, память не зависит от размера хранилища.
+"""
+import json
+import os
+import secrets
+import struct
+from typing import BinaryIO, Callable, Iterator, Optional
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from crypto_utils import CryptoUtils
+from importer import import_records
+from models import PasswordEntry, ImportReport
+from storage import StorageManager
+
+ARCHIVE_EXTENSION = ".pmvault"
+MAGIC = b"PMVAULT1"
+VERSION = 1
+CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024  # Порция читается в память целиком
+MAX_ITERATIONS = 10_000_000  # Заголовок недоверенный: не зависаем в PBKDF2
+
+HEADER = struct.Struct(">8sBII32s8s")
+FRAME = struct.Struct(">BI")
+CHUNK_AAD = struct.Struct(">IB")
+
+
+class ArchiveError(Exception):
+    """Архив повреждён, обрезан или пароль неверный"""
+
+
+class ArchiveWriter:
+    """Запись потока байт в архив порциями фиксированного размера"""
+
+    def __init__(self, f: BinaryIO, passphrase: str, chunk_size: int = CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._counter = 0
+
+        salt = CryptoUtils.generate_salt()
+        iterations = CryptoUtils.ITERATIONS
+        self._nonce_prefix = secrets.token_bytes(8)
+        self._header = HEADER.pack(MAGIC, VERSION, chunk_size, iterations,
+                                   salt, self._nonce_prefix)
+        self._aesgcm = AESGCM(CryptoUtils.derive_key(passphrase, salt, iterations))
+
+        f.write(self._header)
+
+    def write(self, data: bytes):
+        self._buffer += data
+        # Строго больше: последняя порция всегда остаётся для close()
+        while len(self._buffer) > self._chunk_size:
+            self._seal(bytes(self._buffer[:self._chunk_size]), final=False)
+            del self._buffer[:self._chunk_size]
+
+    def close(self):
+        self._seal(bytes(self._buffer), final=True)
+        self._buffer.clear()
+
+    def _seal(self, chunk: bytes, final: bool):
+        nonce = self._nonce_prefix + struct.pack(">I", self._counter)
+        aad = self._header + CHUNK_AAD.pack(self._counter, final)
+        ciphertext = self._aesgcm.encrypt(nonce, chunk, aad)
+
+        self._f.write(FRAME.pack(final, len(ciphertext)))
+        self._f.write(ciphertext)
+        self._counter += 1
+
+
+def read_chunks(f: BinaryIO, passphrase: str) -> Iterator[bytes]:
+    """
+    Последовательное чтение и проверка порций архива
+
+    Raises:
+        ArchiveError: неверный формат/пароль, подмена или обрезка порций
+    """
+    header = f.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ArchiveError("Файл слишком короткий")
+
+    magic, version, chunk_size, iterations, salt, nonce_prefix = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ArchiveError("Неизвестный формат архива")
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ArchiveError(f"Недопустимый размер порции: {chunk_size}")
+    if not CryptoUtils.MIN_ITERATIONS <= iterations <= MAX_ITERATIONS:
+        raise ArchiveError(f"Недопустимое число итераций: {iterations}")
+
+    aesgcm = AESGCM(CryptoUtils.derive_key(passphrase, salt, iterations))
+    # Шифротекст не длиннее порции + тег GCM
+    max_length = chunk_size + 16
+
+    counter = 0
+    while True:
+        frame = f.read(FRAME.size)
+        if len(frame) != FRAME.size:
+            raise ArchiveError("Архив обрезан: нет последней порции")
+
+        final, length = FRAME.unpack(frame)
+        if length > max_length:
+            raise ArchiveError("Повреждённая порция")
+
+        ciphertext = f.read(length)
+        if len(ciphertext) != length:
+            raise ArchiveError("Архив обрезан")
+
+        nonce = nonce_prefix + struct.pack(">I", counter)
+        aad = header + CHUNK_AAD.pack(counter, final)
+        try:
+            chunk = aesgcm.decrypt(nonce, ciphertext, aad)
+        except Exception:
+            raise ArchiveError("Неверный пароль или повреждённые данные")
+
+        yield chunk
+        counter += 1
+
+        if final:
+            if f.read(1):
+                raise ArchiveError("Лишние данные после последней порции")
+            return
+
+
+def iter_archive(path: str, passphrase: str) -> Iterator[PasswordEntry]:
+    """Потоковое чтение записей из архива"""
+    with open(path, "rb") as f:
+        tail = b""
+        for chunk in read_chunks(f, passphrase):
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                yield _decode_record(line)
+
+        if tail:
+            yield _decode_record(tail)
+
+
+def export_vault(
+        storage: StorageManager,
+        path: str,
+        passphrase: str,
+        progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Экспорт хранилища в архив
+
+    Записи читаются курсором порциями (iter_entries), файл пишется
+    во временный и переименовывается только после успешного завершения.
+
+    Returns:
+        Число экспортированных записей
+    """
+    if storage.is_locked():
+        raise RuntimeError("БД заблокирована")
+
+    tmp_path = path + ".part"
+    count = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = ArchiveWriter(f, passphrase)
+            for entry in storage.iter_entries():
+                writer.write(_encode_record(entry))
+                count += 1
+                if progress and count % storage.ITER_BATCH_SIZE == 0:
+                    progress(count)
+            writer.close()
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    print(f"✅ Экспортировано записей: {count} → {path}")
+    return count
+
+
+def verify_archive(path: str, passphrase: str) -> int:
+    """
+    Проверка целостности архива без записи в БД
+
+    Returns:
+        Число записей в архиве
+
+    Raises:
+        ArchiveError: архив повреждён или пароль неверный
+    """
+    return sum(1 for _ in iter_archive(path, passphrase))
+
+
+def import_archive(
+        storage: StorageManager,
+        path: str,
+        passphrase: str,
+        policy: str = "skip",
+        progress: Optional[Callable[[ImportReport], None]] = None
+) -> ImportReport:
+    """
+    Импорт архива в хранилище (см. importer.import_records)
+
+    Обрезка или подмена порций обнаруживаются только при чтении, поэтому
+    весь импорт идёт одной транзакцией: при ошибке ничего не записывается.
+    """
+    with storage.batch():
+        return import_records(storage, iter_archive(path, passphrase), policy,
+                              progress=progress)
+
+
+def _encode_record(entry: PasswordEntry) -> bytes:
+    record = {
+        "site": entry.site,
+        "username": entry.username,
+        "password": entry.password,
+        "notes": entry.notes,
+        "created_at": entry.created_at,
+        "updated_at": entry.updated_at,
+    }
+    return json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _decode_record(line: bytes) -> PasswordEntry:
+    try:
+        return PasswordEntry(**json.loads(line))
+    except (ValueError, TypeError) as e:
+        raise ArchiveError(f"Повреждённая запись: {e}")
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# benchmark.py - Замеры производительности хранилища
+"""
+Использование:
+    python benchmark.py decrypt --rows 10000 100000 --workers 1 2 4 8
+    python benchmark.py sqlite --rows 10000 --writes 500
+    python benchmark.py import --rows 100000
+    python benchmark.py backup --rows 100000 --pages 64 256 -1
+    python benchmark.py kdf --targets 0.25 0.5 1.0 --algorithms pbkdf2-sha256 scrypt
+    python benchmark.py aead --sizes 32 256 4096
+    python benchmark.py generate --counts 1000 100000 --length 16
+    python benchmark.py strength --passwords "Password123!" "correct-horse-1990"
+    python benchmark.py pwned --records 1000000 --lookups 100000
+"""
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import generator
+from crypto_utils import CryptoUtils, KdfParams
+from generator import PasswordGenerator
+from pwned import PwnedDatabase, build_bloom, convert
+from strength import StrengthEstimator, dictionaries
+from importer import import_file
+from models import PasswordEntry
+from storage import StorageManager, CONNECTION_PROFILES
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+def quiet():
+    """Подавление служебного вывода StorageManager во время замеров"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def create_vault(path: str, rows: int, profile=None) -> None:
+    """Создание тестовой БД с заданным числом записей"""
+    storage = StorageManager(path, profile=profile)
+    with quiet():
+        storage.initialize(BENCH_PASSWORD, kdf_target=None)
+
+    now = datetime.now().isoformat()
+    passwords = storage.cipher.encrypt_many(
+        [f"password-{i}".encode() for i in range(rows)]
+    )
+    notes = storage.cipher.encrypt_many(
+        [f"note for entry {i}".encode() for i in range(rows)]
+    )
+
+    storage.conn.executemany("""
+        INSERT INTO vault (site, username, password, notes, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (
+        (f"site{i:07d}.com", f"user{i}", passwords[i], notes[i], now, now)
+        for i in range(rows)
+    ))
+    storage.conn.commit()
+
+    with quiet():
+        storage.close()
+
+
+def best_of(func, repeat: int) -> float:
+    """Лучшее время из нескольких прогонов"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_decrypt(args):
+    """Масштабирование get_all_passwords по числу потоков расшифровки"""
+    print(f"{'строк':>8} {'потоков':>8} {'время, с':>10} {'строк/с':>12} {'ускорение':>10}")
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            create_vault(path, rows)
+
+            baseline = None
+            for workers in args.workers:
+                storage = StorageManager(path, decrypt_workers=workers)
+                with quiet():
+                    storage.unlock(BENCH_PASSWORD)
+                    elapsed = best_of(storage.get_all_passwords, args.repeat)
+                    storage.close()
+
+                baseline = baseline or elapsed
+                print(f"{rows:>8} {workers:>8} {elapsed:>10.3f} "
+                      f"{rows / elapsed:>12.0f} {baseline / elapsed:>9.2f}x")
+
+
+def bench_sqlite(args):
+    """Пропускная способность чтения и записи для профилей соединения"""
+    print(f"{'профиль':>10} {'запись, оп/с':>14} {'list, строк/с':>15} {'get_all, строк/с':>18}")
+
+    for name in args.profiles:
+        profile = CONNECTION_PROFILES[name]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            create_vault(path, args.rows, profile)
+
+            storage = StorageManager(path, profile=profile)
+            with quiet():
+                storage.unlock(BENCH_PASSWORD)
+
+                # Запись: отдельная транзакция (commit) на каждую операцию
+                start = time.perf_counter()
+                for i in range(args.writes):
+                    storage.add_password(PasswordEntry(
+                        site=f"write{i:07d}.com", username="user", password=f"password-{i}"
+                    ))
+                writes = args.writes / (time.perf_counter() - start)
+
+                total = args.rows + args.writes
+                listing = total / best_of(storage.list_entries, args.repeat)
+                full = total / best_of(storage.get_all_passwords, args.repeat)
+                storage.close()
+
+        print(f"{name:>10} {writes:>14.0f} {listing:>15.0f} {full:>18.0f}")
+
+
+def bench_import(args):
+    """Импорт CSV браузера: строк в секунду"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "export.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "url", "username", "password", "note"])
+            for i in range(args.rows):
+                writer.writerow([f"site{i}", f"https://site{i:07d}.com/login",
+                                 f"user{i}", f"password-{i}", ""])
+
+        path = os.path.join(tmp, "bench.db")
+        create_vault(path, 0)
+        storage = StorageManager(path)
+        with quiet():
+            storage.unlock(BENCH_PASSWORD)
+
+        for policy in ("skip", "overwrite"):
+            start = time.perf_counter()
+            with quiet():
+                report = import_file(storage, csv_path, policy=policy, workers=args.workers)
+            elapsed = time.perf_counter() - start
+            print(f"{policy:>10}: {report.processed} строк за {elapsed:.2f} с "
+                  f"({report.processed / elapsed:.0f} строк/с), новых {report.imported}, "
+                  f"обновлено {report.updated}, пропущено {report.skipped}")
+
+        with quiet():
+            storage.close()
+
+
+def bench_backup(args):
+    """Длительность горячей копии и задержка записи во время копирования"""
+    print(f"{'страниц/шаг':>12} {'время, с':>10} {'записей':>9} {'макс. задержка записи, мс':>26}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        create_vault(path, args.rows)
+
+        for pages in args.pages:
+            storage = StorageManager(path)
+            result = {}
+
+            def run():
+                start = time.perf_counter()
+                result["ok"] = storage.backup(os.path.join(tmp, "copy.db"),
+                                              pages_per_step=pages)
+                result["elapsed"] = time.perf_counter() - start
+
+            # redirect_stdout глобален - перенаправляем только из основного потока
+            with quiet():
+                storage.unlock(BENCH_PASSWORD)
+
+                # Фоновая копия, в основном потоке - запись, как в приложении
+                thread = threading.Thread(target=run)
+                thread.start()
+
+                writes, worst = 0, 0.0
+                while thread.is_alive():
+                    start = time.perf_counter()
+                    storage.add_password(PasswordEntry(
+                        site=f"backup{pages}-{writes:07d}.com", username="user", password="password"
+                    ))
+                    worst = max(worst, time.perf_counter() - start)
+                    writes += 1
+                    time.sleep(args.write_interval)
+                thread.join()
+
+                storage.close()
+
+            status = "" if result.get("ok") else "  (ошибка)"
+            print(f"{pages:>12} {result['elapsed']:>10.3f} {writes:>9} {worst * 1000:>26.1f}{status}")
+
+
+def bench_kdf(args):
+    """Калибровка KDF: подобранные параметры, время вычисления ключа и память"""
+    print(f"{'цель, мс':>9} {'оценка, мс':>11} {'факт, мс':>9} {'память, МиБ':>12}  параметры")
+
+    salt = CryptoUtils.generate_salt()
+    for algorithm in args.algorithms:
+        for target in args.targets:
+            calibration = CryptoUtils.calibrate_kdf(target, algorithm)
+            params = calibration.params
+            elapsed = best_of(lambda: CryptoUtils.derive(BENCH_PASSWORD, salt, params),
+                              args.repeat)
+            print(f"{target * 1000:>9.0f} {calibration.estimated * 1000:>11.0f} "
+                  f"{elapsed * 1000:>9.0f} {params.memory / (1024 * 1024):>12.0f}  "
+                  f"{params.describe()}")
+
+
+def bench_aead(args):
+    """Шифрование AES-GCM и ChaCha20-Poly1305 по размерам записи"""
+    names = list(CryptoUtils.AEAD_ALGORITHMS)
+    print(f"{'байт':>8} " + " ".join(f"{name + ', оп/с':>26}" for name in names))
+
+    for size in args.sizes:
+        timings = CryptoUtils.benchmark_aead(size, args.rounds)
+        print(f"{size:>8} " + " ".join(f"{1 / timings[name]:>26.0f}" for name in names))
+
+    print(f"Для новых записей: {CryptoUtils.preferred_aead()}")
+
+
+def bench_generate(args):
+    """Генерация паролей: по одному через generate и пакетом через generate_many"""
+    print(f"{'паролей':>9} {'generate, шт/с':>15} {'generate_many, шт/с':>20} {'ускорение':>10}")
+
+    for count in args.counts:
+        single = min(count, 10000)
+        elapsed = best_of(lambda: [PasswordGenerator.generate(args.length) for _ in range(single)],
+                          args.repeat)
+        one_by_one = single / elapsed
+
+        elapsed = best_of(lambda: PasswordGenerator.generate_many(count, args.length), args.repeat)
+        batch = count / elapsed
+        print(f"{count:>9} {one_by_one:>15.0f} {batch:>20.0f} {batch / one_by_one:>9.1f}x")
+
+    print(f"NumPy: {'да' if generator.np is not None else 'нет'}")
+
+
+def bench_strength(args):
+    """Оценка стойкости: время на нажатие клавиши и полный пересчёт"""
+    print(f"{'пароль':>28} {'нажатие, мс':>12} {'макс., мс':>10} {'полностью, мс':>14}  оценка")
+
+    dictionaries()  # Загрузка словарей не входит в замер
+    for password in args.passwords:
+        estimator = StrengthEstimator()
+        timings = []
+        for k in range(1, len(password) + 1):
+            start = time.perf_counter()
+            result = estimator.estimate(password[:k])
+            timings.append(time.perf_counter() - start)
+
+        full = best_of(lambda: StrengthEstimator().estimate(password), args.repeat)
+        print(f"{password:>28} {sum(timings) / len(timings) * 1000:>12.3f} "
+              f"{max(timings) * 1000:>10.3f} {full * 1000:>14.3f}  "
+              f"{result.level}, {result.entropy:.0f} бит")
+
+
+def bench_pwned(args):
+    """Поиск по офлайн-базе утечек: с фильтром Блума и без"""
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = os.path.join(tmp, "dump.txt")
+        with open(dump, "w") as f:
+            for i in range(args.records):
+                f.write(f"{hashlib.sha1(f'leaked-{i}'.encode()).hexdigest().upper()}:{i % 100 + 1}\n")
+
+        path = os.path.join(tmp, "bench.pmhibp")
+        with quiet():
+            convert(dump, path)
+        hits = [f"leaked-{i}" for i in range(0, args.records, max(1, args.records // args.lookups))]
+        misses = [f"missing-{i}" for i in range(len(hits))]
+
+        print(f"{'фильтр Блума':>13} {'найден, мкс':>12} {'не найден, мкс':>15}")
+        for bloom in (False, True):
+            if bloom:
+                with quiet():
+                    build_bloom(path, args.bloom_bits)
+            database = PwnedDatabase(path)
+            timings = [best_of(lambda: [database.count(p) for p in passwords], args.repeat)
+                       / len(passwords) * 1e6 for passwords in (hits, misses)]
+            database.close()
+            print(f"{'да' if bloom else 'нет':>13} {timings[0]:>12.1f} {timings[1]:>15.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности хранилища")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("decrypt", help="параллельная расшифровка get_all_passwords")
+    p.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_decrypt)
+
+    p = sub.add_parser("sqlite", help="профили соединения SQLite: чтение и запись")
+    p.add_argument("--rows", type=int, default=10000)
+    p.add_argument("--writes", type=int, default=500)
+    p.add_argument("--profiles", nargs="+", default=list(CONNECTION_PROFILES),
+                   choices=list(CONNECTION_PROFILES))
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_sqlite)
+
+    p = sub.add_parser("import", help="импорт CSV: строк в секунду")
+    p.add_argument("--rows", type=int, default=100000)
+    p.add_argument("--workers", type=int, default=4)
+    p.set_defaults(func=bench_import)
+
+    p = sub.add_parser("backup", help="горячая резервная копия при параллельной записи")
+    p.add_argument("--rows", type=int, default=100000)
+    p.add_argument("--pages", type=int, nargs="+", default=[64, 256, 1024, -1])
+    p.add_argument("--write-interval", type=float, default=0.05)
+    p.set_defaults(func=bench_backup)
+
+    p = sub.add_parser("kdf", help="калибровка KDF под целевое время разблокировки")
+    p.add_argument("--targets", type=float, nargs="+", default=[0.25, 0.5, 1.0])
+    p.add_argument("--algorithms", nargs="+", default=list(KdfParams.ALGORITHMS),
+                   choices=list(KdfParams.ALGORITHMS))
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_kdf)
+
+    p = sub.add_parser("aead", help="скорость AEAD и выбор шифра для новых записей")
+    p.add_argument("--sizes", type=int, nargs="+", default=[32, 256, 4096])
+    p.add_argument("--rounds", type=int, default=5000)
+    p.set_defaults(func=bench_aead)
+
+    p = sub.add_parser("generate", help="пакетная генерация паролей")
+    p.add_argument("--counts", type=int, nargs="+", default=[1000, 100000])
+    p.add_argument("--length", type=int, default=16)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_generate)
+
+    p = sub.add_parser("strength", help="оценка стойкости при вводе пароля")
+    p.add_argument("--passwords", nargs="+",
+                   default=["Password123!", "p@ssw0rd-qwerty-1990", "Xk9#mQ2!vL7@fR4$"])
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_strength)
+
+    p = sub.add_parser("pwned", help="поиск по офлайн-базе утечек HIBP")
+    p.add_argument("--records", type=int, default=1000000)
+    p.add_argument("--lookups", type=int, default=100000)
+    p.add_argument("--bloom-bits", type=int, default=10)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_pwned)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,99 @@
 # crypto_utils.py - Полностью исправленная криптография
+import json
 import os
 import secrets
+import time
+from dataclasses import dataclass, asdict, replace
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+
+@dataclass(frozen=True)
+class KdfParams:
+    """
+    Параметры вычисления ключа из мастер-пароля (хранятся в meta)
+
+    pbkdf2-sha256 использует iterations, scrypt - n/r/p
+    (память 128 * n * r байт, время ~ n * r * p).
+    """
+    algorithm: str = "pbkdf2-sha256"
+    iterations: int = 600000
+    salt_length: int = 32
+    n: int = 0
+    r: int = 0
+    p: int = 0
+
+    ALGORITHMS = ("pbkdf2-sha256", "scrypt")
+
+    def __post_init__(self):
+        if self.algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Неизвестный алгоритм KDF: {self.algorithm}")
+        if self.salt_length < 16:
+            raise ValueError("Недопустимые параметры KDF")
+        if self.algorithm == "scrypt":
+            if self.n < 2 or self.n & (self.n - 1) or self.r < 1 or self.p < 1:
+                raise ValueError("Недопустимые параметры scrypt")
+        elif self.iterations < 1:
+            raise ValueError("Недопустимые параметры KDF")
+
+    @classmethod
+    def scrypt(cls, n: int, r: int = 8, p: int = 1, salt_length: int = 32) -> "KdfParams":
+        return cls(algorithm="scrypt", iterations=0, salt_length=salt_length, n=n, r=r, p=p)
+
+    @property
+    def memory(self) -> int:
+        """Память на одно вычисление ключа, байт"""
+        return 128 * self.n * self.r if self.algorithm == "scrypt" else 0
+
+    def describe(self) -> str:
+        if self.algorithm == "scrypt":
+            return (f"scrypt N=2^{self.n.bit_length() - 1} r={self.r} p={self.p}, "
+                    f"{self.memory // (1024 * 1024)} МиБ")
+        return f"{self.algorithm}, {self.iterations} итераций"
+
+    def to_bytes(self) -> bytes:
+        data = asdict(self)
+        # Храним только поля своего алгоритма
+        for name in (("iterations",) if self.algorithm == "scrypt" else ("n", "r", "p")):
+            del data[name]
+        return json.dumps(data, sort_keys=True).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KdfParams":
+        data = json.loads(data)
+        if data.get("algorithm") == "scrypt":
+            data.setdefault("iterations", 0)
+        return cls(**data)
+
+    def weaker_than(self, other: "KdfParams") -> bool:
+        """Слабее ли параметры, чем other (для того же алгоритма)"""
+        if self.algorithm != other.algorithm:
+            return False
+        if self.salt_length < other.salt_length:
+            return True
+        if self.algorithm == "scrypt":
+            return self.n < other.n or self.r < other.r or self.p < other.p
+        return self.iterations < other.iterations
+
+
+@dataclass(frozen=True)
+class KdfCalibration:
+    """Результат подбора параметров KDF под целевое время разблокировки"""
+    params: KdfParams
+    target: float  # Целевое время, с
+    estimated: float  # Ожидаемое время на этой машине, с
+
+    def to_bytes(self) -> bytes:
+        return json.dumps({
+            "target_ms": round(self.target * 1000),
+            "estimated_ms": round(self.estimated * 1000),
+            "calibrated_at": datetime.now().isoformat(),
+        }).encode()
 
 
 class CryptoUtils:
@@ -11,14 +101,38 @@ class CryptoUtils:
 
     # Современные параметры безопасности (2024)
     ITERATIONS = 600000  # OWASP рекомендация
+    MIN_ITERATIONS = 100000  # Нижняя граница при калибровке под медленную машину
+    SCRYPT_N = 2 ** 16  # scrypt по умолчанию: N=2^16, r=8, p=2 (64 МиБ, OWASP)
+    SCRYPT_R = 8
+    SCRYPT_P = 2
+    SCRYPT_MIN_N = 2 ** 14  # Нижняя граница N при калибровке
+    SCRYPT_MAX_MEMORY = 64 * 1024 * 1024  # Верхняя граница памяти при калибровке
     KEY_LENGTH = 32  # AES-256
     SALT_LENGTH = 32  # 256 бит
     NONCE_LENGTH = 12  # AES-GCM стандарт
+    WRAP_AAD = b"PasswordManager data key"  # AAD при обёртывании ключа данных
+
+    # AEAD для записей: имя -> (id в заголовке блоба, класс). Оба с nonce 12 байт
+    AEAD_ALGORITHMS = {
+        "aes-256-gcm": (1, AESGCM),
+        "chacha20-poly1305": (2, ChaCha20Poly1305),
+    }
+    BLOB_MAGIC = 0xEC  # Первый байт заголовка блоба: magic | id алгоритма
+    _preferred_aead: Optional[str] = None
 
     @staticmethod
-    def generate_salt() -> bytes:
+    def default_kdf(algorithm: str = "pbkdf2-sha256") -> KdfParams:
+        """Параметры KDF для новых хранилищ и обновления старых"""
+        if algorithm == "scrypt":
+            return KdfParams.scrypt(CryptoUtils.SCRYPT_N, CryptoUtils.SCRYPT_R,
+                                    CryptoUtils.SCRYPT_P, CryptoUtils.SALT_LENGTH)
+        return KdfParams(algorithm=algorithm, iterations=CryptoUtils.ITERATIONS,
+                         salt_length=CryptoUtils.SALT_LENGTH)
+
+    @staticmethod
+    def generate_salt(length: int = None) -> bytes:
         """Генерация криптографически стойкой соли"""
-        return secrets.token_bytes(CryptoUtils.SALT_LENGTH)
+        return secrets.token_bytes(length or CryptoUtils.SALT_LENGTH)
 
     @staticmethod
     def generate_secure_token(length: int = 32) -> str:
@@ -26,13 +140,14 @@ class CryptoUtils:
         return secrets.token_urlsafe(length)
 
     @staticmethod
-    def derive_key(password: str, salt: bytes) -> bytes:
+    def derive_key(password: str, salt: bytes, iterations: int = None) -> bytes:
         """
         Создание ключа из пароля с помощью PBKDF2-HMAC-SHA256
 
         Args:
             password: Мастер-пароль пользователя
             salt: Соль (должна быть уникальной для каждой БД)
+            iterations: Число итераций (по умолчанию ITERATIONS)
 
         Returns:
             32-байтовый ключ для AES-256
@@ -44,63 +159,433 @@ class CryptoUtils:
             algorithm=hashes.SHA256(),
             length=CryptoUtils.KEY_LENGTH,
             salt=salt,
-            iterations=CryptoUtils.ITERATIONS,
+            iterations=iterations or CryptoUtils.ITERATIONS,
         )
         return kdf.derive(password.encode('utf-8'))
 
+    @staticmethod
+    def derive(password: str, salt: bytes, kdf: KdfParams) -> bytes:
+        """Ключ из пароля по сохранённым параметрам KDF"""
+        if kdf.algorithm != "scrypt":
+            return CryptoUtils.derive_key(password, salt, kdf.iterations)
+
+        if not password:
+            raise ValueError("Пароль не может быть пустым")
+
+        return Scrypt(
+            salt=salt,
+            length=CryptoUtils.KEY_LENGTH,
+            n=kdf.n,
+            r=kdf.r,
+            p=kdf.p,
+        ).derive(password.encode('utf-8'))
+
+    @staticmethod
+    def estimate_kdf_time(kdf: KdfParams) -> float:
+        """Оценка длительности derive() в секундах (для индикатора прогресса)"""
+        if kdf.algorithm != "scrypt":
+            return CryptoUtils.estimate_derive_time(kdf.iterations)
+
+        # Грубо: время линейно по N и p, замеряем N/16 и p=1, чтобы
+        # не выделять всю память ради оценки
+        sample = replace(kdf, n=max(2, kdf.n // 16), p=1)
+        return CryptoUtils._time_scrypt(sample) * (kdf.n // sample.n) * kdf.p
+
+    @staticmethod
+    def estimate_derive_time(iterations: int = None) -> float:
+        """
+        Оценка длительности derive_key в секундах
+
+        Замеряет 1% итераций и экстраполирует. Используется для
+        индикатора прогресса при разблокировке.
+        """
+        iterations = iterations or CryptoUtils.ITERATIONS
+        sample = max(1, iterations // 100)
+        return CryptoUtils._time_pbkdf2(sample) * iterations / sample
+
+    @staticmethod
+    def calibrate_kdf(target: float = 0.5, algorithm: str = "pbkdf2-sha256") -> KdfCalibration:
+        """
+        Подбор самых стойких параметров KDF, укладывающихся в target секунд
+
+        PBKDF2: размер замера удваивается, пока он не займёт ~50 мс, затем
+        берётся лучшее из трёх повторов (меньше всего помех от других
+        процессов). Результат не опускается ниже MIN_ITERATIONS.
+        """
+        if algorithm == "scrypt":
+            return CryptoUtils._calibrate_scrypt(target)
+
+        sample = 10000
+        while True:
+            elapsed = CryptoUtils._time_pbkdf2(sample)
+            if elapsed >= 0.05:
+                break
+            sample *= 2
+
+        per_iteration = min(
+            [elapsed] + [CryptoUtils._time_pbkdf2(sample) for _ in range(2)]
+        ) / sample
+
+        iterations = int(target / per_iteration) // 1000 * 1000
+        iterations = max(iterations, CryptoUtils.MIN_ITERATIONS)
+
+        params = KdfParams(iterations=iterations, salt_length=CryptoUtils.SALT_LENGTH)
+        return KdfCalibration(params, target, iterations * per_iteration)
+
+    @staticmethod
+    def _calibrate_scrypt(target: float) -> KdfCalibration:
+        """
+        scrypt: наибольшее N (степень двойки) в пределах SCRYPT_MAX_MEMORY и
+        target, затем p добирает оставшееся время без роста памяти
+
+        Время scrypt растёт скачком, когда память перестаёт помещаться в кэш,
+        поэтому каждое N замеряется, а не экстраполируется: после
+        прогревочного запуска берётся лучшее из трёх, как и для PBKDF2
+        (первый холодный запуск в разы медленнее).
+        """
+        r = CryptoUtils.SCRYPT_R
+        n = CryptoUtils.SCRYPT_MIN_N
+        CryptoUtils._time_scrypt(KdfParams.scrypt(n, r))  # Прогрев
+        elapsed = CryptoUtils._best_scrypt(KdfParams.scrypt(n, r))
+
+        while 128 * (n * 2) * r <= CryptoUtils.SCRYPT_MAX_MEMORY and elapsed * 2 <= target:
+            candidate = CryptoUtils._best_scrypt(KdfParams.scrypt(n * 2, r))
+            if candidate > target:
+                break
+            n, elapsed = n * 2, candidate
+
+        p = max(1, int(target / elapsed))
+        params = KdfParams.scrypt(n, r, p, CryptoUtils.SALT_LENGTH)
+        return KdfCalibration(params, target, elapsed * p)
+
+    @staticmethod
+    def _best_scrypt(kdf: KdfParams, repeats: int = 3) -> float:
+        return min(CryptoUtils._time_scrypt(kdf) for _ in range(repeats))
+
+    @staticmethod
+    def _time_scrypt(kdf: KdfParams) -> float:
+        start = time.perf_counter()
+        CryptoUtils.derive('calibration', bytes(CryptoUtils.SALT_LENGTH), kdf)
+        return time.perf_counter() - start
+
+    @staticmethod
+    def _time_pbkdf2(iterations: int) -> float:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=CryptoUtils.KEY_LENGTH,
+            salt=bytes(CryptoUtils.SALT_LENGTH),
+            iterations=iterations,
+        )
+        start = time.perf_counter()
+        kdf.derive(b'calibration')
+        return time.perf_counter() - start
+
+    @staticmethod
+    def benchmark_aead(payload: int = 64, rounds: int = 2000) -> Dict[str, float]:
+        """
+        Замер шифрования каждым AEAD
+
+        Returns:
+            Секунд на одну операцию для каждого алгоритма (лучшее из трёх)
+        """
+        key = CryptoUtils.generate_key()
+        nonce = bytes(CryptoUtils.NONCE_LENGTH)
+        data = bytes(payload)
+
+        result = {}
+        for name, (_, engine_class) in CryptoUtils.AEAD_ALGORITHMS.items():
+            engine = engine_class(key)
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    engine.encrypt(nonce, data, None)
+                timings.append(time.perf_counter() - start)
+            result[name] = min(timings) / rounds
+        return result
+
+    @staticmethod
+    def preferred_aead() -> str:
+        """
+        Самый быстрый AEAD на этой машине (замер при первом вызове)
+
+        Без AES-NI (часть ARM и виртуалок) ChaCha20-Poly1305 заметно быстрее
+        AES-GCM. Выбор влияет только на новые записи - алгоритм каждого
+        блоба записан в его заголовке.
+        """
+        if CryptoUtils._preferred_aead is None:
+            timings = CryptoUtils.benchmark_aead()
+            CryptoUtils._preferred_aead = min(timings, key=timings.get)
+            print(f"🔐 Шифр для новых записей: {CryptoUtils._preferred_aead}")
+        return CryptoUtils._preferred_aead
+
+    @staticmethod
+    def generate_key() -> bytes:
+        """Случайный ключ данных (AES-256)"""
+        return secrets.token_bytes(CryptoUtils.KEY_LENGTH)
+
+    @staticmethod
+    def wrap_key(master_key: bytes, data_key: bytes) -> bytes:
+        """
+        Шифрование ключа данных ключом из мастер-пароля (AES-256-GCM)
+
+        Returns:
+            nonce (12 байт) + ciphertext
+        """
+        nonce = secrets.token_bytes(CryptoUtils.NONCE_LENGTH)
+        return nonce + AESGCM(master_key).encrypt(nonce, data_key, CryptoUtils.WRAP_AAD)
+
+    @staticmethod
+    def unwrap_key(master_key: bytes, wrapped: bytes) -> bytes:
+        """
+        Расшифровка ключа данных
+
+        Raises:
+            RuntimeError: неверный мастер-пароль или повреждённые данные
+        """
+        nonce = wrapped[:CryptoUtils.NONCE_LENGTH]
+        try:
+            key = AESGCM(master_key).decrypt(
+                nonce, wrapped[CryptoUtils.NONCE_LENGTH:], CryptoUtils.WRAP_AAD)
+        except Exception:
+            raise RuntimeError("Ошибка расшифровки ключа: неверный пароль или повреждённые данные")
+
+        if len(key) != CryptoUtils.KEY_LENGTH:
+            raise RuntimeError("Повреждённый ключ данных")
+        return key
+
     @staticmethod
     def encrypt(key: bytes, plaintext: str) -> bytes:
         """
-        Шифрование текста с помощью AES-256-GCM
+        Шифрование текста (AEAD по CryptoUtils.preferred_aead())
 
         Args:
             key: 32-байтовый ключ шифрования
             plaintext: Текст для шифрования
 
         Returns:
-            nonce (12 байт) + ciphertext
+            Блоб в формате VaultCipher
+        """
+        return VaultCipher(key).encrypt(plaintext)
+
+    @staticmethod
+    def decrypt(key: bytes, data: bytes) -> str:
+        """
+        Расшифровка блоба (любой поддерживаемый AEAD)
+
+        Args:
+            key: 32-байтовый ключ шифрования
+            data: Блоб в формате VaultCipher
+
+        Returns:
+            Расшифрованный текст
+        """
+        return VaultCipher(key).decrypt(data)
+
+
+class VaultCipher:
+    """
+    Сессионный шифр, привязанный к ключу
+
+    Создаётся один раз при разблокировке: объекты AEAD и проверка длины
+    ключа не повторяются на каждой записи.
+
+    Формат блоба: заголовок (BLOB_MAGIC, id алгоритма) + nonce (12 байт)
+    + ciphertext, заголовок входит в AAD. Блобы без заголовка (записанные
+    до выбора алгоритма) - AES-GCM: nonce + ciphertext. Случайный nonce
+    старого блоба может совпасть с заголовком; тогда после неудачной
+    проверки тега блоб читается как старый.
+    """
+
+    def __init__(self, key: bytes, algorithm: str = None):
+        """
+        Args:
+            key: 32-байтовый ключ
+            algorithm: AEAD для новых записей (по умолчанию
+                CryptoUtils.preferred_aead()); читаются все
         """
         if len(key) != CryptoUtils.KEY_LENGTH:
             raise ValueError(f"Ключ должен быть {CryptoUtils.KEY_LENGTH} байт")
 
-        aesgcm = AESGCM(key)
+        algorithm = algorithm or CryptoUtils.preferred_aead()
+        if algorithm not in CryptoUtils.AEAD_ALGORITHMS:
+            raise ValueError(f"Неизвестный алгоритм шифрования: {algorithm}")
+
+        self._engines = {
+            algorithm_id: engine_class(key)
+            for algorithm_id, engine_class in CryptoUtils.AEAD_ALGORITHMS.values()
+        }
+        self._aesgcm = self._engines[CryptoUtils.AEAD_ALGORITHMS["aes-256-gcm"][0]]
+
+        self.algorithm = algorithm
+        algorithm_id = CryptoUtils.AEAD_ALGORITHMS[algorithm][0]
+        self._engine = self._engines[algorithm_id]
+        self._header = bytes((CryptoUtils.BLOB_MAGIC, algorithm_id))
+
+    def encrypt(self, plaintext: str) -> bytes:
+        """Шифрование одной строки"""
         nonce = secrets.token_bytes(CryptoUtils.NONCE_LENGTH)
 
         try:
-            ciphertext = aesgcm.encrypt(
+            ciphertext = self._engine.encrypt(
                 nonce,
                 plaintext.encode('utf-8'),
-                None  # AAD (дополнительные данные) не используем
+                self._header
             )
-            return nonce + ciphertext
+            return self._header + nonce + ciphertext
         except Exception as e:
             raise RuntimeError(f"Ошибка шифрования: {e}")
 
-    @staticmethod
-    def decrypt(key: bytes, data: bytes) -> str:
+    def decrypt(self, data: bytes) -> str:
+        """Расшифровка одного блоба"""
+        return self._decrypt_bytes(data).decode('utf-8')
+
+    def encrypt_many(self, plaintexts: Sequence[bytes]) -> List[memoryview]:
         """
-        Расшифровка данных AES-256-GCM
+        Пакетное шифрование
 
         Args:
-            key: 32-байтовый ключ шифрования
-            data: nonce + ciphertext
+            plaintexts: Список байтовых буферов
 
         Returns:
-            Расшифрованный текст
+            Список memoryview с заголовком + nonce + ciphertext для каждого элемента
         """
-        if len(key) != CryptoUtils.KEY_LENGTH:
-            raise ValueError(f"Ключ должен быть {CryptoUtils.KEY_LENGTH} байт")
+        nonce_len = CryptoUtils.NONCE_LENGTH
+        header = self._header
+        prefix = len(header) + nonce_len
+        # Все nonce берутся из ОС одним вызовом
+        nonces = memoryview(secrets.token_bytes(nonce_len * len(plaintexts)))
+
+        result = []
+        for i, plaintext in enumerate(plaintexts):
+            nonce = nonces[i * nonce_len:(i + 1) * nonce_len]
+            try:
+                ciphertext = self._engine.encrypt(nonce, plaintext, header)
+            except Exception as e:
+                raise RuntimeError(f"Ошибка шифрования: {e}")
+
+            blob = bytearray(prefix + len(ciphertext))
+            blob[:len(header)] = header
+            blob[len(header):prefix] = nonce
+            blob[prefix:] = ciphertext
+            result.append(memoryview(blob))
+
+        return result
+
+    def encrypt_many_optional(self, plaintexts: Sequence[Optional[bytes]]) -> List[Optional[memoryview]]:
+        """Пакетное шифрование, где пустые значения (None, b'') остаются None"""
+        present = [i for i, value in enumerate(plaintexts) if value]
+        encrypted = self.encrypt_many([plaintexts[i] for i in present])
+
+        result: List[Optional[memoryview]] = [None] * len(plaintexts)
+        for i, blob in zip(present, encrypted):
+            result[i] = blob
+        return result
+
+    def decrypt_many(self, blobs: Sequence[Optional[bytes]],
+                     strict: bool = True) -> List[Optional[memoryview]]:
+        """
+        Пакетная расшифровка
+
+        Args:
+            blobs: Список блобов; None пропускается
+            strict: Если False, повреждённые блобы дают None вместо исключения
+
+        Returns:
+            Список memoryview с открытым текстом (None для пустых/битых)
+        """
+        result = []
+        for blob in blobs:
+            if blob is None:
+                result.append(None)
+                continue
+            try:
+                result.append(memoryview(self._decrypt_bytes(blob)))
+            except (ValueError, RuntimeError):
+                if strict:
+                    raise
+                result.append(None)
 
-        if len(data) < CryptoUtils.NONCE_LENGTH:
+        return result
+
+    def _decrypt_bytes(self, data: bytes) -> bytes:
+        nonce_len = CryptoUtils.NONCE_LENGTH
+        if len(data) < nonce_len:
             raise ValueError("Данные повреждены: слишком короткие")
 
-        nonce = data[:CryptoUtils.NONCE_LENGTH]
-        ciphertext = data[CryptoUtils.NONCE_LENGTH:]
+        view = memoryview(data)
+        if view[0] == CryptoUtils.BLOB_MAGIC and len(data) > 2 + nonce_len:
+            engine = self._engines.get(view[1])
+            if engine:
+                try:
+                    return engine.decrypt(view[2:2 + nonce_len], view[2 + nonce_len:], view[:2])
+                except InvalidTag:
+                    pass  # Возможно, старый блоб, nonce которого похож на заголовок
+
+        try:
+            return self._aesgcm.decrypt(view[:nonce_len], view[nonce_len:], None)
+        except Exception:
+            raise RuntimeError("Ошибка расшифровки: неверный пароль или повреждённые данные")
+
+
+class QuickUnlock:
+    """
+    Быстрая повторная разблокировка по PIN после lock()
+
+    Ключ данных остаётся в памяти процесса, зашифрованный ключом из PIN
+    и случайной соли (соль хранится тут же, в объекте). Вычисление ключа
+    из PIN дешёвое: ограничение попыток и срок действия защищают только
+    ввод через интерфейс, после них ключ стирается и нужен мастер-пароль.
+    Тот, кто может прочитать память процесса, переберёт короткий PIN
+    офлайн.
+    """
+
+    ITERATIONS = 10000  # PBKDF2 для PIN: миллисекунды, не сотни
+    MAX_ATTEMPTS = 5
+    TTL = 15 * 60  # Срок действия, с
+
+    def __init__(self, data_key: bytes, pin: str,
+                 max_attempts: int = None, ttl: float = None):
+        if not pin:
+            raise ValueError("PIN не может быть пустым")
+
+        self.max_attempts = max_attempts or self.MAX_ATTEMPTS
+        self.attempts_left = self.max_attempts
+        self.expires_at = time.monotonic() + (ttl or self.TTL)
+        self._salt = CryptoUtils.generate_salt()
+        self._wrapped: Optional[bytes] = CryptoUtils.wrap_key(self._pin_key(pin), data_key)
 
-        aesgcm = AESGCM(key)
+    def _pin_key(self, pin: str) -> bytes:
+        return CryptoUtils.derive_key(pin, self._salt, self.ITERATIONS)
+
+    @property
+    def available(self) -> bool:
+        """Можно ли ещё разблокироваться по PIN (истёкший ключ стирается)"""
+        if self._wrapped is not None and time.monotonic() >= self.expires_at:
+            self.clear()
+        return self._wrapped is not None
+
+    def unlock(self, pin: str) -> Optional[bytes]:
+        """
+        Ключ данных по PIN
+
+        Returns:
+            Ключ или None (неверный PIN, попытки исчерпаны или срок истёк)
+        """
+        if not self.available or not pin:
+            return None
 
         try:
-            plaintext = aesgcm.decrypt(nonce, ciphertext, None)
-            return plaintext.decode('utf-8')
-        except Exception as e:
-            raise RuntimeError(f"Ошибка расшифровки: неверный пароль или повреждённые данные")
\ No newline at end of file
+            data_key = CryptoUtils.unwrap_key(self._pin_key(pin), self._wrapped)
+        except RuntimeError:
+            self.attempts_left -= 1
+            if self.attempts_left <= 0:
+                self.clear()
+            return None
+
+        self.clear()  # PIN одноразовый: при следующей блокировке задаётся заново
+        return data_key
+
+    def clear(self):
+        self._wrapped = None
+        self.attempts_left = 0
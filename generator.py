@@ -1,12 +1,32 @@
 # generator.py - Криптографически безопасный генератор паролей
+import json
+import os
 import secrets
 import string
+from dataclasses import dataclass, asdict
+from functools import cached_property, lru_cache
+from itertools import combinations
 import math
+from typing import Dict, List, Optional, Tuple
+
+from strength import estimate
+
+try:
+    import numpy as np  # Векторная выборка в generate_many (опционально)
+except ImportError:
+    np = None
+
+SYMBOLS = "!@#$%^&*()-_=+[]{};:,.<>?/"
 
 
 class PasswordGenerator:
     """Генератор криптографически стойких паролей"""
 
+    MIN_LENGTH = 8
+    MAX_LENGTH = 128
+    # С какого числа паролей выгоднее NumPy
+    NUMPY_THRESHOLD = 64
+
     @staticmethod
     def generate(
             length: int = 16,
@@ -30,69 +50,88 @@ class PasswordGenerator:
         Returns:
             Случайный пароль
         """
-        if length < 8:
-            length = 8
-        if length > 128:
-            length = 128
+        return PasswordGenerator.generate_many(
+            1, length, uppercase, lowercase, digits, symbols, exclude_ambiguous
+        )[0]
+
+    @staticmethod
+    def generate_many(
+            count: int,
+            length: int = 16,
+            uppercase: bool = True,
+            lowercase: bool = True,
+            digits: bool = True,
+            symbols: bool = True,
+            exclude_ambiguous: bool = False
+    ) -> List[str]:
+        """
+        Пакетная генерация паролей (параметры - как у generate)
+
+        Случайные байты берутся из os.urandom одним буфером на весь пакет.
+        Байт b принимается, только если b < 256 - 256 % m (m - размер
+        алфавита), и отображается в b % m - так выборка равномерна.
+        Для каждого набора символов в пароле выбирается своя позиция
+        (частичная перестановка Фишера-Йетса) и заменяется символом
+        этого набора. Распределение совпадает с прежним generate:
+        обязательные символы на случайных местах, остальные - из алфавита.
+
+        Returns:
+            Список из count паролей
+        """
+        length = min(max(length, PasswordGenerator.MIN_LENGTH), PasswordGenerator.MAX_LENGTH)
+        if count <= 0:
+            return []
+
+        classes = PasswordGenerator.character_classes(
+            uppercase, lowercase, digits, symbols, exclude_ambiguous
+        )
 
-        # Набор символов
-        chars = ""
-        required_chars = []
+        if np is not None and count >= PasswordGenerator.NUMPY_THRESHOLD:
+            return _generate_numpy(count, length, classes)
+        return _generate_bytes(count, length, classes)
+
+    @staticmethod
+    def character_classes(
+            uppercase: bool = True,
+            lowercase: bool = True,
+            digits: bool = True,
+            symbols: bool = True,
+            exclude_ambiguous: bool = False
+    ) -> List[str]:
+        """Выбранные наборы символов (из каждого в пароле будет хотя бы один)"""
+        classes = []
 
         if lowercase:
             lc = string.ascii_lowercase
             if exclude_ambiguous:
                 lc = lc.replace('l', '').replace('o', '')
-            chars += lc
-            if lc:
-                required_chars.append(secrets.choice(lc))
+            classes.append(lc)
 
         if uppercase:
             uc = string.ascii_uppercase
             if exclude_ambiguous:
                 uc = uc.replace('I', '').replace('O', '')
-            chars += uc
-            if uc:
-                required_chars.append(secrets.choice(uc))
+            classes.append(uc)
 
         if digits:
             dg = string.digits
             if exclude_ambiguous:
                 dg = dg.replace('0', '').replace('1', '')
-            chars += dg
-            if dg:
-                required_chars.append(secrets.choice(dg))
+            classes.append(dg)
 
         if symbols:
-            sym = "!@#$%^&*()-_=+[]{};:,.<>?/"
-            chars += sym
-            required_chars.append(secrets.choice(sym))
+            classes.append(SYMBOLS)
 
         # Минимум один набор должен быть выбран
-        if not chars:
-            chars = string.ascii_lowercase + string.digits
-            required_chars = [
-                secrets.choice(string.ascii_lowercase),
-                secrets.choice(string.digits)
-            ]
-
-        # Генерируем остальные символы
-        remaining_length = max(0, length - len(required_chars))
-        password_list = required_chars + [
-            secrets.choice(chars) for _ in range(remaining_length)
-        ]
-
-        # Перемешиваем криптографически стойким способом
-        for i in range(len(password_list) - 1, 0, -1):
-            j = secrets.randbelow(i + 1)
-            password_list[i], password_list[j] = password_list[j], password_list[i]
+        if not classes:
+            classes = [string.ascii_lowercase, string.digits]
 
-        return ''.join(password_list)
+        return classes
 
     @staticmethod
     def estimate_strength(password: str) -> tuple[str, int, float]:
         """
-        Оценка силы пароля
+        Оценка силы пароля (см. strength.estimate)
 
         Returns:
             (уровень, процент, энтропия в битах)
@@ -100,74 +139,485 @@ class PasswordGenerator:
         if not password:
             return "Нет пароля", 0, 0.0
 
-        score = 0
-        length = len(password)
-
-        # Длина
-        if length >= 8:
-            score += 1
-        if length >= 12:
-            score += 1
-        if length >= 16:
-            score += 1
-        if length >= 20:
-            score += 1
-
-        # Типы символов
-        has_lower = any(c.islower() for c in password)
-        has_upper = any(c.isupper() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_symbol = any(c in "!@#$%^&*()-_=+[]{};:,.<>?/" for c in password)
-
-        if has_lower:
-            score += 1
-        if has_upper:
-            score += 1
-        if has_digit:
-            score += 1
-        if has_symbol:
-            score += 1
-
-        # Бонус за разнообразие
-        char_set_size = 0
-        if has_lower:
-            char_set_size += 26
-        if has_upper:
-            char_set_size += 26
-        if has_digit:
-            char_set_size += 10
-        if has_symbol:
-            char_set_size += 32
-
-        # Рассчитываем энтропию (биты случайности)
-        entropy = 0.0
-        if char_set_size > 0:
-            entropy = length * math.log2(char_set_size)
-
-        # Бонус за высокую энтропию
-        if entropy >= 60:
-            score += 1
-        if entropy >= 80:
-            score += 1
-
-        # Ограничиваем score
-        score = min(score, 10)
-
-        # Уровни безопасности
-        if score <= 2:
-            level = "Очень слабый"
-            percent = 10
-        elif score <= 4:
-            level = "Слабый"
-            percent = 30
-        elif score <= 6:
-            level = "Средний"
-            percent = 50
-        elif score <= 8:
-            level = "Сильный"
-            percent = 75
-        else:
-            level = "Очень сильный"
-            percent = 100
-
-        return level, percent, entropy
\ No newline at end of file
+        result = estimate(password)
+        return result.level, result.percent, result.entropy
+
+
+@dataclass(frozen=True)
+class PasswordPolicy:
+    """
+    Правила сайта для генерации паролей (хранятся по сайту в БД)
+
+    Для каждого набора символов: None - запрещён, 0 - разрешён,
+    n > 0 - не меньше n символов. start_with - наборы, с которых может
+    начинаться пароль (пусто - любой), no_repeat - без одинаковых
+    символов подряд.
+
+    Число паролей политики считается точно (по составу пароля, см.
+    _PolicySpace), выборка - без перебора «сгенерировать и проверить»:
+    все пароли политики равновероятны, энтропия - log2 их числа.
+    """
+    min_length: int = 12
+    max_length: int = 20
+    lowercase: Optional[int] = 1
+    uppercase: Optional[int] = 1
+    digits: Optional[int] = 1
+    symbols: Optional[int] = 1
+    symbol_set: str = SYMBOLS
+    start_with: Tuple[str, ...] = ()
+    no_repeat: bool = False
+    exclude_ambiguous: bool = False
+
+    CLASSES = ("lowercase", "uppercase", "digits", "symbols")
+
+    def __post_init__(self):
+        # Кортеж после JSON приходит списком; повторы символов убираем
+        object.__setattr__(self, "start_with", tuple(self.start_with))
+        object.__setattr__(self, "symbol_set", "".join(dict.fromkeys(self.symbol_set)))
+
+        if not 1 <= self.min_length <= self.max_length <= PasswordGenerator.MAX_LENGTH:
+            raise ValueError("Недопустимые границы длины")
+        if any(c in string.ascii_letters + string.digits or c.isspace()
+               for c in self.symbol_set) or not self.symbol_set.isascii():
+            raise ValueError("Спецсимволы не должны включать буквы, цифры и пробелы")
+
+        names = [name for name, _, _ in self.classes()]
+        if not names:
+            raise ValueError("Не выбран ни один набор символов")
+        if any(name not in names for name in self.start_with):
+            raise ValueError("Начальный символ из запрещённого набора")
+        if sum(minimum for _, _, minimum in self.classes()) > self.max_length:
+            raise ValueError("Обязательных символов больше максимальной длины")
+        if self.count() == 0:
+            raise ValueError("Политике не соответствует ни один пароль")
+
+    def classes(self) -> List[Tuple[str, str, int]]:
+        """Разрешённые наборы: (имя, символы, минимум)"""
+        chars = {
+            "lowercase": string.ascii_lowercase,
+            "uppercase": string.ascii_uppercase,
+            "digits": string.digits,
+            "symbols": self.symbol_set,
+        }
+        if self.exclude_ambiguous:
+            for ambiguous in "lo" "IO" "01":
+                chars = {name: s.replace(ambiguous, "") for name, s in chars.items()}
+
+        result = []
+        for name in self.CLASSES:
+            minimum = getattr(self, name)
+            if minimum is not None and chars[name]:
+                result.append((name, chars[name], max(0, minimum)))
+        return result
+
+    def count(self, length: Optional[int] = None) -> int:
+        """Точное число паролей политики (всех длин или заданной)"""
+        if length is not None:
+            return self._space.count(length)
+        return sum(self._space.count(n) for n in range(self.min_length, self.max_length + 1))
+
+    @property
+    def entropy(self) -> float:
+        """Энтропия равномерного выбора из политики, бит"""
+        return math.log2(self.count())
+
+    def generate(self) -> str:
+        """Пароль, равновероятно выбранный среди всех паролей политики"""
+        lengths = range(self.min_length, self.max_length + 1)
+        length = lengths[_choose([self._space.count(n) for n in lengths])]
+        return self._space.sample(length)
+
+    def describe(self) -> str:
+        labels = {"lowercase": "a-z", "uppercase": "A-Z", "digits": "0-9",
+                  "symbols": self.symbol_set}
+        parts = [f"{self.min_length}-{self.max_length} символов"
+                 if self.min_length != self.max_length else f"{self.min_length} символов"]
+        for name, _, minimum in self.classes():
+            parts.append(f"{labels[name]} ≥{minimum}" if minimum else labels[name])
+        if self.start_with:
+            parts.append("начало: " + "/".join(labels[name] for name in self.start_with))
+        if self.no_repeat:
+            parts.append("без повторов подряд")
+        return ", ".join(parts)
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(asdict(self), sort_keys=True).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PasswordPolicy":
+        return cls(**json.loads(data))
+
+    @cached_property
+    def _space(self) -> "_PolicySpace":
+        return _PolicySpace(self)
+
+
+class _PolicySpace:
+    """
+    Подсчёт и выборка паролей политики
+
+    Подсчёт - по составу пароля (сколько символов каждого набора), а не
+    перебором состояний, поэтому не зависит от произведения минимумов:
+
+    - Запрет повторов - включение-исключение по «блокам»: блок из l
+      одинаковых символов подряд весит (-1)^(l-1), после чего блоки
+      разных наборов переставляются свободно (мультиномиальный
+      коэффициент). Без запрета блоки только единичные.
+    - Минимумы - включение-исключение по множеству T наборов, которые
+      минимум нарушили: их блоки (меньше m символов) перебираются явно,
+      остальные наборы сливаются в один алфавит размера S, и их вклад -
+      коэффициенты (1 - S*w)^-(J+1), где w = x/(1+x) (без запрета
+      повторов w = x), J - число блоков наборов из T.
+    - Начальный набор - по первому блоку: складываются пароли с первым
+      блоком из допустимых наборов или вычитаются с недопустимыми.
+
+    Выборка - за один проход, без повторных попыток. Без запрета повторов
+    состав и расстановка наборов выбираются точно по числу паролей. С
+    запретом - пошагово: каждый символ с весом числа допустимых
+    продолжений по состояниям (длина, счётчики до минимумов, предыдущий
+    набор); таблица состояний строится при первой выборке и растёт с
+    произведением минимумов.
+    """
+
+    def __init__(self, policy: PasswordPolicy):
+        classes = policy.classes()
+        self.chars = [chars for _, chars, _ in classes]
+        self.sizes = [len(chars) for chars in self.chars]
+        self.minimums = tuple(minimum for _, _, minimum in classes)
+        self.no_repeat = policy.no_repeat
+        self.max_length = policy.max_length
+        names = [name for name, _, _ in classes]
+        self.first = [names.index(name) for name in policy.start_with] or list(range(len(names)))
+        self._counts: Optional[List[int]] = None
+        self._tables: Dict[tuple, Dict[Tuple[int, int], int]] = {}
+        self._classes: Dict[int, Dict[Tuple[int, int], int]] = {}
+        self._plain: Dict[tuple, List[List[int]]] = {}
+        self._memo: Dict[tuple, int] = {}
+
+    def count(self, length: int) -> int:
+        if self._counts is None:
+            self._counts = self._count_all()
+        return self._counts[length]
+
+    def sample(self, length: int) -> str:
+        if self.no_repeat:
+            return self._sample_walk(length)
+        return self._sample_plain(length)
+
+    # ---------- Подсчёт ----------
+
+    def _count_all(self) -> List[int]:
+        """Число паролей каждой длины от 0 до max_length"""
+        k = len(self.sizes)
+        bounded = [c for c in range(k) if self.minimums[c] > 0]
+        total = [0] * (self.max_length + 1)
+
+        for size in range(len(bounded) + 1):
+            sign = -1 if size % 2 else 1
+            for group in combinations(bounded, size):
+                free = [c for c in range(k) if c not in group]
+                merged = sum(self.sizes[c] for c in free)
+                allowed = [c for c in group if c in self.first]
+                forbidden = [c for c in group if c not in self.first]
+
+                # Первый символ - из допустимого набора: складываем пароли,
+                # начинающиеся с допустимых наборов, или вычитаем начинающиеся
+                # с недопустимых - что дешевле
+                if len(allowed) < len(forbidden) + 1:
+                    series = [0] * (self.max_length + 1)
+                    for c in allowed:
+                        first = self._series(self._blocks(group, c), merged)
+                        series = [a + b for a, b in zip(series, first)]
+                    # Первый символ из слитого алфавита
+                    included = sum(self.sizes[c] for c in free if c in self.first)
+                    if included:
+                        shifted = _times_w(self._series(self._blocks(group), merged), self.no_repeat)
+                        series = [a + included * b for a, b in zip(series, shifted)]
+                else:
+                    series = self._series(self._blocks(group), merged)
+                    excluded = sum(self.sizes[c] for c in free if c not in self.first)
+                    if excluded:
+                        shifted = _times_w(series, self.no_repeat)
+                        series = [a - excluded * b for a, b in zip(series, shifted)]
+                    for c in forbidden:
+                        first = self._series(self._blocks(group, c), merged)
+                        series = [a - b for a, b in zip(series, first)]
+
+                for n, value in enumerate(series):
+                    total[n] += sign * value
+
+        return total
+
+    def _series(self, table: Dict[Tuple[int, int], int], merged: int) -> List[int]:
+        """
+        Сумма table[n, j] * x^n * (1 - merged*w)^-(j+1) до x^max_length
+
+        По схеме Горнера: умножение на 1/(1 - merged*w) - рекуррентность.
+        """
+        length = self.max_length
+        by_blocks: Dict[int, List[int]] = {}
+        for (n, j), value in table.items():
+            by_blocks.setdefault(j, [0] * (length + 1))[n] += value
+
+        series = [0] * (length + 1)
+        for j in range(max(by_blocks, default=-1), -1, -1):
+            if j in by_blocks:
+                series = [a + b for a, b in zip(series, by_blocks[j])]
+            series = _times_rho(series, merged, self.no_repeat)
+        return series
+
+    def _blocks(self, group: Tuple[int, ...], first: Optional[int] = None) -> Dict[Tuple[int, int], int]:
+        """
+        Блоки наборов group при нарушенных минимумах: {(символов, блоков): вес}
+
+        Вес включает число перестановок блоков между наборами. first - набор
+        первого блока: он исключается из перестановок, и число блоков
+        считается без него. Таблица группы строится из таблицы группы без
+        последнего набора (группы перебираются по возрастанию).
+        """
+        key = (group, first)
+        if key not in self._tables:
+            rest = [c for c in group if c != first]
+            if rest:
+                last = rest[-1]
+                previous = self._blocks(tuple(c for c in group if c != last), first)
+                table: Dict[Tuple[int, int], int] = {}
+                for (n, j), value in previous.items():
+                    for (a, b), weight in self._class_blocks(last).items():
+                        merged = (n + a, j + b)
+                        table[merged] = table.get(merged, 0) + value * weight * math.comb(j + b, b)
+            elif first is not None:
+                table = {(n, j - 1): value for (n, j), value in self._class_blocks(first).items() if j}
+            else:
+                table = {(0, 0): 1}
+            self._tables[key] = table
+        return self._tables[key]
+
+    def _class_blocks(self, c: int) -> Dict[Tuple[int, int], int]:
+        """Блоки одного набора, меньше минимума символов: {(символов, блоков): вес}"""
+        if c not in self._classes:
+            size = self.sizes[c]
+            table = {(0, 0): 1}
+            for n in range(1, self.minimums[c]):
+                if self.no_repeat:
+                    for j in range(1, n + 1):
+                        table[n, j] = size ** j * (-1) ** (n - j) * math.comb(n - 1, j - 1)
+                else:
+                    table[n, n] = size ** n
+            self._classes[c] = table
+        return self._classes[c]
+
+    # ---------- Выборка ----------
+
+    def _plain_tables(self, minimums: Tuple[int, ...]) -> List[List[int]]:
+        """
+        tables[i][n] - число паролей длины n из наборов 0..i с минимумами
+        (повторы разрешены, первый символ любой)
+        """
+        if minimums not in self._plain:
+            previous = [1] + [0] * self.max_length
+            tables = []
+            for size, minimum in zip(self.sizes, minimums):
+                previous = [
+                    sum(math.comb(n, a) * size ** a * previous[n - a] for a in range(minimum, n + 1))
+                    for n in range(self.max_length + 1)
+                ]
+                tables.append(previous)
+            self._plain[minimums] = tables
+        return self._plain[minimums]
+
+    def _first_weights(self, length: int) -> List[int]:
+        """Веса начального набора для паролей с повторами"""
+        return [self.sizes[c] * self._plain_tables(self._lowered(c))[-1][length - 1]
+                for c in self.first]
+
+    def _sample_plain(self, length: int) -> str:
+        """Равновероятный пароль политики без запрета повторов"""
+        first = self.first[_choose(self._first_weights(length))]
+        minimums = self._lowered(first)
+        tables = self._plain_tables(minimums)
+
+        labels = []
+        remaining = length - 1
+        for c in range(len(self.sizes) - 1, -1, -1):
+            previous = tables[c - 1] if c else [1] + [0] * self.max_length
+            options = range(minimums[c], remaining + 1)
+            taken = options[_choose([
+                math.comb(remaining, a) * self.sizes[c] ** a * previous[remaining - a]
+                for a in options
+            ])]
+            labels += [c] * taken
+            remaining -= taken
+
+        # Расстановка наборов - случайная перестановка (Фишер-Йетс)
+        for i in range(len(labels) - 1, 0, -1):
+            j = secrets.randbelow(i + 1)
+            labels[i], labels[j] = labels[j], labels[i]
+
+        return "".join(self.chars[c][secrets.randbelow(self.sizes[c])] for c in [first] + labels)
+
+    def _lowered(self, c: int) -> Tuple[int, ...]:
+        """Минимумы после символа набора c"""
+        return self.minimums[:c] + (max(0, self.minimums[c] - 1),) + self.minimums[c + 1:]
+
+    def _sample_walk(self, length: int) -> str:
+        """Пошаговая выборка: каждый символ - с весом числа допустимых продолжений"""
+        counts = (0,) * len(self.chars)
+        previous = None
+        password = []
+
+        for remaining in range(length - 1, -1, -1):
+            options = self.first if previous is None else range(len(self.chars))
+            weights = [self._weight(c, previous) * self._completions(remaining, self._add(counts, c), c)
+                       for c in options]
+            c = options[_choose(weights)]
+
+            chars = self.chars[c]
+            if c == previous and self.no_repeat:
+                # Равномерно среди символов набора, кроме предыдущего
+                skip = chars.index(password[-1])
+                index = secrets.randbelow(len(chars) - 1)
+                char = chars[index + (index >= skip)]
+            else:
+                char = chars[secrets.randbelow(len(chars))]
+
+            password.append(char)
+            counts = self._add(counts, c)
+            previous = c
+
+        return "".join(password)
+
+    def _weight(self, c: int, previous: Optional[int]) -> int:
+        """Сколько символов набора c можно поставить после набора previous"""
+        return len(self.chars[c]) - (self.no_repeat and c == previous)
+
+    def _add(self, counts: tuple, c: int) -> tuple:
+        # Счётчик выше минимума не важен - ограничиваем, чтобы состояний было мало
+        return counts[:c] + (min(counts[c] + 1, self.minimums[c]),) + counts[c + 1:]
+
+    def _completions(self, remaining: int, counts: tuple, previous: int) -> int:
+        """Число способов дописать remaining символов до выполнения минимумов"""
+        key = (remaining, counts, previous)
+        if key not in self._memo:
+            if remaining == 0:
+                result = int(counts == self.minimums)
+            elif sum(max(0, m - n) for m, n in zip(self.minimums, counts)) > remaining:
+                result = 0
+            else:
+                result = sum(self._weight(c, previous) *
+                             self._completions(remaining - 1, self._add(counts, c), c)
+                             for c in range(len(self.chars)))
+            self._memo[key] = result
+        return self._memo[key]
+
+
+def _times_rho(series: List[int], size: int, no_repeat: bool) -> List[int]:
+    """
+    Ряд, умноженный на 1/(1 - size*w), той же длины
+
+    С запретом повторов w = x/(1+x) и дробь равна (1+x)/(1 - (size-1)x),
+    без запрета w = x и дробь 1/(1 - size*x).
+    """
+    shift = int(no_repeat)
+    ratio = size - shift
+    result = []
+    for n, value in enumerate(series):
+        if n:
+            value += shift * series[n - 1] + ratio * result[n - 1]
+        result.append(value)
+    return result
+
+
+def _times_w(series: List[int], no_repeat: bool) -> List[int]:
+    """Ряд, умноженный на w (x/(1+x) или x), той же длины"""
+    if not no_repeat:
+        return [0] + series[:-1]
+    result = [0]
+    for n in range(1, len(series)):
+        result.append(series[n - 1] - result[-1])
+    return result
+
+
+def _choose(weights: List[int]) -> int:
+    """Индекс с вероятностью, пропорциональной весу (точные целые веса)"""
+    point = secrets.randbelow(sum(weights))
+    for index, weight in enumerate(weights):
+        if point < weight:
+            return index
+        point -= weight
+    raise AssertionError("unreachable")
+
+
+@lru_cache(maxsize=None)
+def _translation(alphabet: bytes):
+    """Таблица bytes.translate: принятый байт -> символ, остальные удаляются"""
+    m = len(alphabet)
+    limit = 256 - 256 % m
+    table = bytes(alphabet[b % m] if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256))
+
+
+def _sample_bytes(alphabet: bytes, count: int) -> bytes:
+    """count равномерно выбранных байт алфавита (отбраковка + bytes.translate)"""
+    table, rejected = _translation(alphabet)
+    limit = 256 - len(rejected)
+
+    result = b""
+    while len(result) < count:
+        need = count - len(result)
+        # Запас на отбракованные байты (доля 1 - limit / 256)
+        buffer = os.urandom(need * 256 // limit + 64)
+        result += buffer.translate(table, rejected)
+    return result[:count]
+
+
+def _generate_bytes(count: int, length: int, classes: List[str]) -> List[str]:
+    """Пакетная генерация без NumPy"""
+    body = bytearray(_sample_bytes("".join(classes).encode("ascii"), count * length))
+    # offsets[i][j] - шаг i перестановки для пароля j, в диапазоне [0, length - i)
+    offsets = [_sample_bytes(bytes(range(length - i)), count) for i in range(len(classes))]
+    required = [_sample_bytes(cls.encode("ascii"), count) for cls in classes]
+
+    for j in range(count):
+        base = j * length
+        order = list(range(length))
+        for i in range(len(classes)):
+            r = i + offsets[i][j]
+            order[i], order[r] = order[r], order[i]
+            body[base + order[i]] = required[i][j]
+
+    text = body.decode("ascii")
+    return [text[j * length:(j + 1) * length] for j in range(count)]
+
+
+def _sample_indices(m: int, count: int) -> "np.ndarray":
+    """count равномерных индексов в [0, m) (m <= 256)"""
+    limit = 256 - 256 % m
+    parts, total = [], 0
+    while total < count:
+        need = count - total
+        buffer = np.frombuffer(os.urandom(need * 256 // limit + 64), dtype=np.uint8)
+        accepted = buffer[buffer < limit] % m
+        parts.append(accepted)
+        total += len(accepted)
+    return np.concatenate(parts)[:count]
+
+
+def _generate_numpy(count: int, length: int, classes: List[str]) -> List[str]:
+    """Пакетная генерация с векторной выборкой NumPy"""
+    alphabet = np.frombuffer("".join(classes).encode("ascii"), dtype=np.uint8)
+    body = alphabet[_sample_indices(len(alphabet), count * length)].reshape(count, length)
+
+    rows = np.arange(count)
+    order = np.tile(np.arange(length, dtype=np.intp), (count, 1))
+    for i, cls in enumerate(classes):
+        r = i + _sample_indices(length - i, count).astype(np.intp)
+        picked = order[rows, r]
+        order[rows, r] = order[:, i]
+        order[:, i] = picked
+
+        chars = np.frombuffer(cls.encode("ascii"), dtype=np.uint8)
+        body[rows, picked] = chars[_sample_indices(len(chars), count)]
+
+    text = body.tobytes().decode("ascii")
+    return [text[j * length:(j + 1) * length] for j in range(count)]
@@ -1,12 +1,25 @@
 # gui.py - ИДЕАЛЬНЫЙ GUI БЕЗ ЕБУЧИХ ВЫДЕЛЕНИЙ
+import os
 import sys
+import bisect
+import threading
+import time
 from PyQt6.QtWidgets import *
-from PyQt6.QtCore import Qt, QTimer, QSize, QEvent
-from PyQt6.QtGui import QFont, QPalette, QColor
+from typing import List, Optional
+from PyQt6.QtCore import (Qt, QTimer, QSize, QEvent, QObject, pyqtSignal, QRect, QRectF, QSettings,
+                          QAbstractListModel, QModelIndex)
+from PyQt6.QtGui import QFont, QPalette, QColor, QPainter, QPen, QFontMetrics
 
 from storage import StorageManager
-from generator import PasswordGenerator
-from models import PasswordEntry
+from crypto_utils import CryptoUtils, KdfCalibration, KdfParams, QuickUnlock
+from generator import PasswordGenerator, PasswordPolicy
+from strength import estimate
+from passphrase import (PassphraseGenerator, Wordlist, WordlistError, WORDLIST_EXTENSION,
+                        WORDLIST_PATH, build_wordlist, open_wordlist)
+from models import PasswordEntry, PasswordMeta
+from importer import import_file
+from archive import ARCHIVE_EXTENSION, export_vault, import_archive
+from pwned import PWNED_EXTENSION, PWNED_PATH, PwnedDatabase, PwnedError, audit_vault, open_database
 
 # ============= ИДЕАЛЬНАЯ ТЁМНАЯ ТЕМА (GitHub Style) =============
 PERFECT_THEME = """
@@ -324,6 +337,15 @@ QFrame[frameShape="4"] {
 """
 
 
+def open_pwned_database() -> Optional[PwnedDatabase]:
+    """База утечек из настроек или None, если она не задана или не читается"""
+    path = QSettings("PasswordManager", "PasswordManager").value("pwned/path", PWNED_PATH)
+    try:
+        return open_database(path)
+    except (OSError, ValueError, PwnedError):
+        return None
+
+
 class NoFocusCheckBox(QCheckBox):
     """Чекбокс без фокуса и без выделения"""
 
@@ -341,15 +363,474 @@ class NoFocusSlider(QSlider):
         self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
 
 
+class PassphraseOptions(QWidget):
+    """Параметры парольной фразы (диалог добавления и страница генератора)"""
+
+    SEPARATORS = {
+        "Дефис (-)": "-",
+        "Пробел": " ",
+        "Точка (.)": ".",
+        "Подчёркивание (_)": "_",
+    }
+    CAPITALIZATION = {
+        "строчные": "lower",
+        "С Заглавной": "title",
+        "ПРОПИСНЫЕ": "upper",
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = QSettings("PasswordManager", "PasswordManager")
+
+        layout = QVBoxLayout()
+        layout.setSpacing(8)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # Число слов
+        words_container = QHBoxLayout()
+        words_container.setSpacing(12)
+
+        words_label = QLabel("Слов:")
+        words_label.setStyleSheet("color: #7d8590; min-width: 50px;")
+        words_container.addWidget(words_label)
+
+        self.words_slider = NoFocusSlider(Qt.Orientation.Horizontal)
+        self.words_slider.setRange(PassphraseGenerator.MIN_WORDS, 12)
+        self.words_slider.setValue(6)
+        words_container.addWidget(self.words_slider)
+
+        self.words_label = QLabel("6")
+        self.words_label.setStyleSheet("font-weight: 600; min-width: 25px;")
+        self.words_slider.valueChanged.connect(lambda val: self.words_label.setText(str(val)))
+        words_container.addWidget(self.words_label)
+
+        layout.addLayout(words_container)
+
+        # Разделитель и регистр
+        style_container = QHBoxLayout()
+        style_container.setSpacing(8)
+
+        self.separator_combo = QComboBox()
+        self.separator_combo.setMinimumHeight(32)
+        for text, separator in self.SEPARATORS.items():
+            self.separator_combo.addItem(text, separator)
+        style_container.addWidget(self.separator_combo)
+
+        self.capitalization_combo = QComboBox()
+        self.capitalization_combo.setMinimumHeight(32)
+        for text, capitalization in self.CAPITALIZATION.items():
+            self.capitalization_combo.addItem(text, capitalization)
+        style_container.addWidget(self.capitalization_combo)
+
+        layout.addLayout(style_container)
+
+        # Словарь
+        wordlist_container = QHBoxLayout()
+        wordlist_container.setSpacing(8)
+
+        self.wordlist_label = QLabel("")
+        self.wordlist_label.setObjectName("subtitle")
+        self.wordlist_label.setStyleSheet("font-size: 12px;")
+        wordlist_container.addWidget(self.wordlist_label, 1)
+
+        browse_btn = QPushButton("📂 Словарь")
+        browse_btn.setObjectName("secondary")
+        browse_btn.setMinimumHeight(32)
+        browse_btn.clicked.connect(self.choose_wordlist)
+        wordlist_container.addWidget(browse_btn)
+
+        layout.addLayout(wordlist_container)
+        self.setLayout(layout)
+
+        self.update_wordlist_label()
+
+    def wordlist(self) -> Optional[Wordlist]:
+        """Выбранный словарь или None, если он не задан или не читается"""
+        path = self.settings.value("passphrase/wordlist", WORDLIST_PATH)
+        try:
+            return open_wordlist(path)
+        except (OSError, ValueError, WordlistError):
+            return None
+
+    def update_wordlist_label(self):
+        wordlist = self.wordlist()
+        if wordlist is None:
+            self.wordlist_label.setText("⚠️ Словарь не выбран")
+        else:
+            self.wordlist_label.setText(
+                f"📖 {os.path.basename(wordlist.path)} • {len(wordlist)} слов • "
+                f"{wordlist.bits_per_word:.1f} бит/слово"
+            )
+
+    def choose_wordlist(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Словарь для парольных фраз", "",
+            f"Словарь (*{WORDLIST_EXTENSION} *.txt)"
+        )
+        if not path:
+            return
+
+        try:
+            # Текстовый словарь конвертируется один раз, рядом с исходным
+            if not path.endswith(WORDLIST_EXTENSION):
+                dest = os.path.splitext(path)[0] + WORDLIST_EXTENSION
+                build_wordlist(path, dest)
+                path = dest
+            open_wordlist(path)
+        except (OSError, ValueError, WordlistError) as e:
+            QMessageBox.critical(self, "Ошибка", f"❌ Не удалось загрузить словарь\n\n{e}")
+            return
+
+        self.settings.setValue("passphrase/wordlist", path)
+        self.update_wordlist_label()
+
+    def generate(self) -> Optional[tuple]:
+        """(фраза, энтропия в битах) или None, если словарь не выбран"""
+        wordlist = self.wordlist()
+        if wordlist is None:
+            QMessageBox.warning(self, "Словарь",
+                                "Выберите словарь для парольных фраз: .txt по слову "
+                                "на строку (например, EFF wordlist) или .pmwords")
+            return None
+
+        words = self.words_slider.value()
+        phrase = PassphraseGenerator.generate(
+            wordlist, words,
+            self.separator_combo.currentData(),
+            self.capitalization_combo.currentData()
+        )
+        return phrase, PassphraseGenerator.entropy(wordlist, words)
+
+
+# ============= ФОНОВЫЕ ЗАДАЧИ =============
+
+class KeyDerivationTask(QObject):
+    """
+    Вычисление ключа по KdfParams (PBKDF2 или scrypt) в фоновом потоке
+
+    Оба KDF отпускают GIL, поэтому event loop остаётся отзывчивым.
+    Прогресс оценивается по времени: длительность замеряется заранее
+    через CryptoUtils.estimate_kdf_time(). Вычисление нельзя прервать,
+    поэтому отмена просто отбрасывает результат.
+    """
+
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    # Внутренний сигнал из рабочего потока в GUI-поток
+    _done = pyqtSignal(object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancelled = False
+        self._started_at = 0.0
+        self._expected = 1.0
+        self._timer = QTimer(self)
+        self._timer.setInterval(50)
+        self._timer.timeout.connect(self._tick)
+        self._done.connect(self._on_done)
+
+    def start(self, password: str, salt: bytes, kdf: KdfParams = None):
+        kdf = kdf or CryptoUtils.default_kdf()
+        self._cancelled = False
+        self._expected = max(CryptoUtils.estimate_kdf_time(kdf), 0.05)
+        self._started_at = time.perf_counter()
+        self.progress.emit(0)
+        self._timer.start()
+
+        thread = threading.Thread(target=self._run, args=(password, salt, kdf), daemon=True)
+        thread.start()
+
+    def cancel(self):
+        self._cancelled = True
+        self._timer.stop()
+
+    def _run(self, password: str, salt: bytes, kdf: KdfParams):
+        try:
+            start = time.perf_counter()
+            key = CryptoUtils.derive(password, salt, kdf)
+            print(f"⏱ Ключ вычислен за {(time.perf_counter() - start) * 1000:.0f} мс "
+                  f"({kdf.describe()})")
+            self._done.emit(key, "")
+        except Exception as e:
+            self._done.emit(None, str(e))
+
+    def _tick(self):
+        elapsed = time.perf_counter() - self._started_at
+        self.progress.emit(min(99, int(elapsed / self._expected * 100)))
+
+    def _on_done(self, key, error):
+        self._timer.stop()
+        if self._cancelled:
+            return
+        if key is None:
+            self.failed.emit(error)
+        else:
+            self.progress.emit(100)
+            self.finished.emit(key)
+
+
+class KdfCalibrationTask(QObject):
+    """
+    Подбор параметров KDF (CryptoUtils.calibrate_kdf) в фоновом потоке
+
+    Замеры занимают от долей секунды до пары секунд (scrypt), поэтому
+    не выполняются в GUI-потоке. Прервать замер нельзя, отмена просто
+    отбрасывает результат.
+    """
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    # Внутренний сигнал из рабочего потока в GUI-поток
+    _done = pyqtSignal(object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancelled = False
+        self._done.connect(self._on_done)
+
+    def start(self, target: float, algorithm: str):
+        self._cancelled = False
+        thread = threading.Thread(target=self._run, args=(target, algorithm), daemon=True)
+        thread.start()
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _run(self, target: float, algorithm: str):
+        try:
+            self._done.emit(CryptoUtils.calibrate_kdf(target, algorithm), "")
+        except Exception as e:
+            self._done.emit(None, str(e))
+
+    def _on_done(self, calibration, error):
+        if self._cancelled:
+            return
+        if calibration is None:
+            self.failed.emit(error)
+        else:
+            self.finished.emit(calibration)
+
+
+class SearchTask(QObject):
+    """
+    Поиск по индексу PasswordListModel в фоновом потоке
+
+    Каждый запуск получает номер поколения; новый запуск отменяет
+    предыдущий - старый поток прекращает проход на ближайшей порции,
+    а его результат не доставляется.
+    """
+
+    results = pyqtSignal(str, object, int)
+
+    CHUNK = 8192
+
+    # Внутренний сигнал из рабочего потока в GUI-поток
+    _done = pyqtSignal(int, str, object, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generation = 0
+        self._done.connect(self._on_done)
+
+    def start(self, query: str, keys: List[str], version: int):
+        self._generation += 1
+        thread = threading.Thread(
+            target=self._run, args=(self._generation, query, keys, version), daemon=True
+        )
+        thread.start()
+
+    def cancel(self):
+        self._generation += 1
+
+    def _run(self, generation: int, query: str, keys: List[str], version: int):
+        rows = []
+        for start in range(0, len(keys), self.CHUNK):
+            if generation != self._generation:
+                return
+            chunk = keys[start:start + self.CHUNK]
+            rows.extend(start + i for i, key in enumerate(chunk) if query in key)
+        self._done.emit(generation, query, rows, version)
+
+    def _on_done(self, generation: int, query: str, rows, version: int):
+        if generation == self._generation:
+            self.results.emit(query, rows, version)
+
+
+class BackupTask(QObject):
+    """
+    Резервное копирование БД в фоновом потоке
+
+    StorageManager.backup() открывает собственное соединение и делает
+    паузы между шагами, поэтому ни интерфейс, ни запись в БД не ждут
+    окончания копии. Одновременно выполняется не больше одной копии.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal()
+
+    # Внутренний сигнал из рабочего потока в GUI-поток
+    _done = pyqtSignal(object)
+
+    def __init__(self, storage: StorageManager, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        self.running = False
+        self._done.connect(self._on_done)
+
+    def start(self, directory: str, keep: int) -> bool:
+        if self.running:
+            return False
+        self.running = True
+        thread = threading.Thread(target=self._run, args=(directory, keep), daemon=True)
+        thread.start()
+        return True
+
+    def _run(self, directory: str, keep: int):
+        try:
+            path = self.storage.create_backup(directory, keep, progress=self.progress.emit)
+        except Exception as e:
+            print(f"❌ Ошибка резервного копирования: {e}")
+            path = None
+        self._done.emit(path)
+
+    def _on_done(self, path):
+        self.running = False
+        if path:
+            self.finished.emit(path)
+        else:
+            self.failed.emit()
+
+
+class TaskCancelled(Exception):
+    """Операция StorageTask отменена пользователем"""
+
+
+class StorageTask(QObject):
+    """
+    Длительная операция над хранилищем в фоновом потоке
+
+    Окно на это время закрыто модальным диалогом прогресса, поэтому
+    соединением с БД пользуется только рабочий поток. Прогресс приходит
+    сигналом; отмена срабатывает на ближайшем отчёте о прогрессе -
+    операция прерывается исключением TaskCancelled.
+    """
+
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    # Внутренний сигнал из рабочего потока в GUI-поток
+    _done = pyqtSignal(object, str)
+
+    def __init__(self, storage: StorageManager, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        self.running = False
+        self._cancelled = False
+        self._done.connect(self._on_done)
+
+    def start(self, *args) -> bool:
+        if self.running:
+            return False
+        self.running = True
+        self._cancelled = False
+        thread = threading.Thread(target=self._run, args=args, daemon=True)
+        thread.start()
+        return True
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _work(self, *args):
+        raise NotImplementedError
+
+    def _report(self, count: int):
+        """Колбэк прогресса для рабочего потока"""
+        if self._cancelled:
+            raise TaskCancelled()
+        self.progress.emit(count)
+
+    def _run(self, *args):
+        try:
+            self._done.emit(self._work(*args), "")
+        except TaskCancelled:
+            self._done.emit(None, "")
+        except Exception as e:
+            self._done.emit(None, str(e) or type(e).__name__)
+
+    def _on_done(self, result, error):
+        self.running = False
+        if error:
+            self.failed.emit(error)
+        elif result is None:
+            self.cancelled.emit()
+        else:
+            self.finished.emit(result)
+
+
+class ImportTask(StorageTask):
+    """Импорт файла экспорта или архива (start(path, passphrase, policy))"""
+
+    def _work(self, path: str, passphrase: Optional[str], policy: str):
+        def progress(report):
+            self._report(report.processed)
+
+        if passphrase:
+            return import_archive(self.storage, path, passphrase, policy=policy, progress=progress)
+        return import_file(self.storage, path, policy=policy, progress=progress)
+
+
+class ExportTask(StorageTask):
+    """Экспорт хранилища в архив (start(path, passphrase))"""
+
+    def _work(self, path: str, passphrase: str):
+        return export_vault(self.storage, path, passphrase, progress=self._report)
+
+
+class AuditTask(StorageTask):
+    """Проверка паролей по базе утечек (start(database))"""
+
+    def _work(self, database: PwnedDatabase):
+        return audit_vault(self.storage, database, progress=self._report)
+
+
 # ============= ДИАЛОГИ =============
 
 class MasterPasswordDialog(QDialog):
-    """Диалог мастер-пароля"""
-
-    def __init__(self, is_new: bool = False, parent=None):
+    """
+    Диалог мастер-пароля
+
+    Если передана соль, ключ вычисляется в фоне прямо в диалоге
+    (с прогрессом и отменой) с параметрами kdf, а результат доступен в self.key.
+    kdf_target - для нового хранилища: пользователь выбирает алгоритм KDF,
+    параметры подбираются в фоне под это время только для выбранного
+    алгоритма и доступны в self.calibration.
+    """
+
+    KDF_LABELS = {
+        "pbkdf2-sha256": "PBKDF2-SHA256",
+        "scrypt": "scrypt (требует памяти, стойче к GPU)",
+    }
+
+    def __init__(self, is_new: bool = False, parent=None, salt: bytes = None,
+                 title: str = None, description: str = None, kdf: KdfParams = None,
+                 kdf_target: Optional[float] = None):
         super().__init__(parent)
         self.is_new = is_new
+        self.salt = salt
+        self.kdf = kdf
+        self.kdf_target = kdf_target
+        self.calibration: Optional[KdfCalibration] = None
+        self.title = title
+        self.description = description
         self.password = None
+        self.key = None
+        self.task = None
         self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.init_ui()
 
@@ -370,6 +851,11 @@ class MasterPasswordDialog(QDialog):
             title = QLabel("🔓 Вход")
             desc = QLabel("Введите мастер-пароль для доступа")
 
+        if self.title:
+            title.setText(self.title)
+        if self.description:
+            desc.setText(self.description)
+
         title.setObjectName("title")
         title.setStyleSheet("font-size: 24px; font-weight: 600;")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -395,6 +881,26 @@ class MasterPasswordDialog(QDialog):
             self.confirm_input.setMinimumHeight(40)
             layout.addWidget(self.confirm_input)
 
+        if self.kdf_target:
+            self.kdf_combo = QComboBox()
+            self.kdf_combo.setMinimumHeight(36)
+            for algorithm in KdfParams.ALGORITHMS:
+                self.kdf_combo.addItem(self.KDF_LABELS.get(algorithm, algorithm), algorithm)
+            layout.addWidget(self.kdf_combo)
+
+        # Прогресс вычисления ключа
+        self.kdf_progress = QProgressBar()
+        self.kdf_progress.setMaximum(100)
+        self.kdf_progress.setFixedHeight(4)
+        self.kdf_progress.setVisible(False)
+        layout.addWidget(self.kdf_progress)
+
+        self.kdf_status = QLabel("")
+        self.kdf_status.setObjectName("subtitle")
+        self.kdf_status.setStyleSheet("font-size: 12px;")
+        self.kdf_status.setVisible(False)
+        layout.addWidget(self.kdf_status)
+
         layout.addSpacing(8)
 
         btn_layout = QHBoxLayout()
@@ -403,14 +909,14 @@ class MasterPasswordDialog(QDialog):
         cancel_btn = QPushButton("Отмена")
         cancel_btn.setObjectName("secondary")
         cancel_btn.setMinimumHeight(40)
-        cancel_btn.clicked.connect(self.reject)
+        cancel_btn.clicked.connect(self.on_cancel)
         btn_layout.addWidget(cancel_btn)
 
-        ok_btn = QPushButton("Продолжить" if self.is_new else "Войти")
-        ok_btn.setMinimumHeight(40)
-        ok_btn.clicked.connect(self.validate)
-        ok_btn.setDefault(True)
-        btn_layout.addWidget(ok_btn)
+        self.ok_btn = QPushButton("Продолжить" if self.is_new else "Войти")
+        self.ok_btn.setMinimumHeight(40)
+        self.ok_btn.clicked.connect(self.validate)
+        self.ok_btn.setDefault(True)
+        btn_layout.addWidget(self.ok_btn)
 
         layout.addLayout(btn_layout)
         self.setLayout(layout)
@@ -433,22 +939,107 @@ class MasterPasswordDialog(QDialog):
                 return
 
         self.password = pwd
+
+        if self.kdf_target:
+            self.start_calibration()
+            return
+
+        if self.salt is None:
+            self.accept()
+            return
+
+        self.start_derivation()
+
+    def start_calibration(self):
+        self.set_busy(True)
+        self.kdf_progress.setRange(0, 0)  # Длительность замера заранее неизвестна
+        self.kdf_status.setText("⏳ Подбор параметров KDF под этот компьютер...")
+
+        self.task = KdfCalibrationTask()
+        self.task.finished.connect(self.on_calibrated)
+        self.task.failed.connect(self.on_key_failed)
+        self.task.start(self.kdf_target, self.kdf_combo.currentData())
+
+    def on_calibrated(self, calibration: KdfCalibration):
+        self.calibration = calibration
+        self.kdf = calibration.params
+        self.kdf_progress.setRange(0, 100)
+        print(f"⏱ KDF: {self.kdf.describe()}, ~{calibration.estimated * 1000:.0f} мс")
+
+        if self.salt is None:
+            self.task = None
+            self.accept()
+            return
+
+        self.start_derivation()
+
+    def start_derivation(self):
+        self.set_busy(True)
+
+        # Без родителя: задача должна пережить диалог, пока поток не завершится
+        self.task = KeyDerivationTask()
+        self.task.progress.connect(self.kdf_progress.setValue)
+        self.task.finished.connect(self.on_key_ready)
+        self.task.failed.connect(self.on_key_failed)
+        self.task.start(self.password, self.salt, self.kdf)
+
+    def set_busy(self, busy: bool):
+        self.password_input.setEnabled(not busy)
+        if self.is_new:
+            self.confirm_input.setEnabled(not busy)
+        self.ok_btn.setEnabled(not busy)
+        self.kdf_progress.setVisible(busy)
+        self.kdf_progress.setRange(0, 100)
+        self.kdf_progress.setValue(0)
+        self.kdf_status.setVisible(busy)
+        if self.kdf_target:
+            self.kdf_combo.setEnabled(not busy)
+        self.kdf_status.setText("⏳ Вычисление ключа..." if busy else "")
+
+    def on_key_ready(self, key: bytes):
+        self.key = key
+        self.task = None
         self.accept()
 
+    def on_key_failed(self, error: str):
+        self.task = None
+        self.set_busy(False)
+        QMessageBox.warning(self, "Ошибка", f"Не удалось вычислить ключ:\n\n{error}")
+
+    def on_cancel(self):
+        # Первая отмена прерывает вычисление ключа, вторая закрывает диалог
+        if self.task:
+            self.task.cancel()
+            self.task = None
+            self.password = None
+            self.set_busy(False)
+            return
+        self.reject()
+
+    def reject(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        super().reject()
+
 
 class AddPasswordDialog(QDialog):
     """Диалог добавления пароля"""
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, storage: StorageManager = None):
         super().__init__(parent)
         self.result = None
+        self.storage = storage
+        self.policy: Optional[PasswordPolicy] = None
+        self.policy_changed = False
+        self.pwned = open_pwned_database()
         self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.init_ui()
 
     def init_ui(self):
         self.setWindowTitle("Добавить пароль")
         self.setModal(True)
-        self.setFixedSize(560, 680)
+        self.setFixedSize(560, 720)
         self.setStyleSheet(PERFECT_THEME)
 
         layout = QVBoxLayout()
@@ -471,6 +1062,7 @@ class AddPasswordDialog(QDialog):
         self.site_input = QLineEdit()
         self.site_input.setPlaceholderText("example.com")
         self.site_input.setMinimumHeight(36)
+        self.site_input.editingFinished.connect(self.load_policy)
         layout.addWidget(self.site_input)
 
         # Логин
@@ -526,9 +1118,40 @@ class AddPasswordDialog(QDialog):
         gen_layout = QVBoxLayout()
         gen_layout.setSpacing(12)
 
+        gen_header = QHBoxLayout()
         gen_title = QLabel("⚡ Генератор паролей")
         gen_title.setStyleSheet("font-size: 14px; font-weight: 600; color: #58a6ff;")
-        gen_layout.addWidget(gen_title)
+        gen_header.addWidget(gen_title)
+        gen_header.addStretch()
+
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["Пароль", "Фраза"])
+        self.mode_combo.currentIndexChanged.connect(self.toggle_mode)
+        gen_header.addWidget(self.mode_combo)
+        gen_layout.addLayout(gen_header)
+
+        # Правила сайта
+        policy_container = QHBoxLayout()
+        policy_container.setSpacing(8)
+
+        self.policy_label = QLabel("")
+        self.policy_label.setObjectName("subtitle")
+        self.policy_label.setStyleSheet("font-size: 12px;")
+        self.policy_label.setWordWrap(True)
+        policy_container.addWidget(self.policy_label, 1)
+
+        policy_btn = QPushButton("📐 Правила сайта")
+        policy_btn.setObjectName("secondary")
+        policy_btn.setMinimumHeight(32)
+        policy_btn.clicked.connect(self.edit_policy)
+        policy_container.addWidget(policy_btn)
+
+        gen_layout.addLayout(policy_container)
+
+        self.char_options = QWidget()
+        char_layout = QVBoxLayout()
+        char_layout.setSpacing(12)
+        char_layout.setContentsMargins(0, 0, 0, 0)
 
         # Длина
         len_container = QHBoxLayout()
@@ -548,7 +1171,7 @@ class AddPasswordDialog(QDialog):
         self.length_label.setStyleSheet("font-weight: 600; min-width: 25px;")
         len_container.addWidget(self.length_label)
 
-        gen_layout.addLayout(len_container)
+        char_layout.addLayout(len_container)
 
         # Опции
         opt_container = QVBoxLayout()
@@ -570,7 +1193,14 @@ class AddPasswordDialog(QDialog):
         self.cb_symbols.setChecked(True)
         opt_container.addWidget(self.cb_symbols)
 
-        gen_layout.addLayout(opt_container)
+        char_layout.addLayout(opt_container)
+        self.char_options.setLayout(char_layout)
+        gen_layout.addWidget(self.char_options)
+
+        # Парольная фраза
+        self.passphrase_options = PassphraseOptions()
+        self.passphrase_options.setVisible(False)
+        gen_layout.addWidget(self.passphrase_options)
 
         gen_btn = QPushButton("🎲 Сгенерировать пароль")
         gen_btn.setMinimumHeight(36)
@@ -611,9 +1241,38 @@ class AddPasswordDialog(QDialog):
         layout.addLayout(btn_layout)
         self.setLayout(layout)
 
+        self.update_policy_label()
+
     def update_length(self, val):
         self.length_label.setText(str(val))
 
+    def load_policy(self):
+        """Правила сохранённого сайта подставляются при вводе сайта"""
+        site = self.site_input.text().strip()
+        if self.policy_changed or not self.storage or not site:
+            return
+        self.policy = self.storage.get_policy(site)
+        self.update_policy_label()
+
+    def edit_policy(self):
+        dialog = PolicyDialog(self.policy, self)
+        if dialog.exec():
+            self.policy = dialog.policy
+            self.policy_changed = True
+            self.update_policy_label()
+
+    def update_policy_label(self):
+        # Параметры из символов не действуют, пока заданы правила сайта
+        self.char_options.setEnabled(self.policy is None)
+        if self.policy is None:
+            self.policy_label.setText("Правила сайта не заданы")
+        else:
+            self.policy_label.setText(f"📐 {self.policy.describe()}")
+
+    def toggle_mode(self, index):
+        self.char_options.setVisible(index == 0)
+        self.passphrase_options.setVisible(index == 1)
+
     def toggle_visibility(self):
         if self.password_input.echoMode() == QLineEdit.EchoMode.Password:
             self.password_input.setEchoMode(QLineEdit.EchoMode.Normal)
@@ -625,6 +1284,22 @@ class AddPasswordDialog(QDialog):
             self.show_btn.setToolTip("Показать пароль")
 
     def generate_pwd(self):
+        if self.mode_combo.currentIndex() == 1:
+            result = self.passphrase_options.generate()
+            if result:
+                phrase, entropy = result
+                self.password_input.setText(phrase)
+                # Для фразы энтропия известна точно
+                self.strength_label.setText(f"Парольная фраза • {entropy:.1f} бит энтропии")
+            return
+
+        if self.policy is not None:
+            self.password_input.setText(self.policy.generate())
+            self.strength_label.setText(
+                f"По правилам сайта • {self.policy.entropy:.1f} бит энтропии"
+            )
+            return
+
         pwd = PasswordGenerator.generate(
             length=self.length_slider.value(),
             uppercase=self.cb_upper.isChecked(),
@@ -641,9 +1316,21 @@ class AddPasswordDialog(QDialog):
             self.strength_label.setText("")
             return
 
-        level, percent, entropy = PasswordGenerator.estimate_strength(pwd)
+        # Инкрементальная оценка: пересчитываются только фрагменты с новым символом
+        result = estimate(pwd)
+        percent = result.percent
         self.strength_bar.setValue(percent)
-        self.strength_label.setText(f"{level} • {entropy:.0f} бит энтропии")
+        text = f"{result.level} • {result.entropy:.0f} бит энтропии"
+        if result.warning:
+            text += f"\n⚠️ {result.warning}"
+
+        # Поиск по отображённой в память базе - микросекунды, можно на каждый символ
+        breached = self.pwned.count(pwd) if self.pwned else 0
+        if breached:
+            percent = min(percent, 10)
+            self.strength_bar.setValue(percent)
+            text += f"\n🚨 Найден в утечках: {breached} раз"
+        self.strength_label.setText(text)
 
         if percent < 40:
             color = "#da3633"
@@ -671,74 +1358,573 @@ class AddPasswordDialog(QDialog):
             password=password,
             notes=notes
         )
+        if self.policy_changed and self.storage:
+            self.storage.set_policy(site, self.policy)
         self.accept()
 
 
-class PasswordCard(QFrame):
-    """Карточка пароля"""
+class PolicyDialog(QDialog):
+    """Правила сайта для генерации паролей"""
+
+    CLASS_LABELS = {
+        "lowercase": "Строчные буквы (a-z)",
+        "uppercase": "Заглавные буквы (A-Z)",
+        "digits": "Цифры (0-9)",
+        "symbols": "Спецсимволы",
+    }
+    START_OPTIONS = {
+        "Любой символ": (),
+        "Буква": ("lowercase", "uppercase"),
+        "Буква или цифра": ("lowercase", "uppercase", "digits"),
+    }
+    SUMMARY_DEBOUNCE_MS = 200
 
-    def __init__(self, entry: PasswordEntry, parent=None):
+    def __init__(self, policy: Optional[PasswordPolicy] = None, parent=None):
         super().__init__(parent)
-        self.entry = entry
-        self.parent_window = parent
+        self.policy = policy
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.init_ui(policy or PasswordPolicy())
+
+    def init_ui(self, policy: PasswordPolicy):
+        self.setWindowTitle("Правила сайта")
+        self.setModal(True)
+        self.setFixedSize(520, 560)
+        self.setStyleSheet(PERFECT_THEME)
+
+        layout = QVBoxLayout()
+        layout.setSpacing(16)
+        layout.setContentsMargins(24, 24, 24, 24)
+
+        title = QLabel("Правила сайта")
+        title.setObjectName("title")
+        title.setStyleSheet("font-size: 24px; font-weight: 600;")
+        layout.addWidget(title)
+
+        form = QFormLayout()
+        form.setSpacing(12)
+
+        # Длина
+        length_layout = QHBoxLayout()
+        self.min_spin = QSpinBox()
+        self.min_spin.setRange(1, PasswordGenerator.MAX_LENGTH)
+        self.min_spin.setValue(policy.min_length)
+        length_layout.addWidget(self.min_spin)
+        length_layout.addWidget(QLabel("—"))
+        self.max_spin = QSpinBox()
+        self.max_spin.setRange(1, PasswordGenerator.MAX_LENGTH)
+        self.max_spin.setValue(policy.max_length)
+        length_layout.addWidget(self.max_spin)
+        form.addRow("Длина:", length_layout)
+
+        # Наборы символов: разрешён ли и сколько минимум
+        self.class_checks = {}
+        self.class_spins = {}
+        for name, label in self.CLASS_LABELS.items():
+            minimum = getattr(policy, name)
+
+            row = QHBoxLayout()
+            check = NoFocusCheckBox(label)
+            check.setChecked(minimum is not None)
+            row.addWidget(check, 1)
+
+            spin = QSpinBox()
+            spin.setRange(0, PasswordGenerator.MAX_LENGTH)
+            spin.setPrefix("не меньше ")
+            spin.setValue(minimum or 0)
+            spin.setEnabled(minimum is not None)
+            check.toggled.connect(spin.setEnabled)
+            row.addWidget(spin)
+
+            self.class_checks[name] = check
+            self.class_spins[name] = spin
+            form.addRow(row)
+
+        self.symbols_input = QLineEdit(policy.symbol_set)
+        self.symbols_input.setMinimumHeight(32)
+        form.addRow("Спецсимволы:", self.symbols_input)
+
+        self.start_combo = QComboBox()
+        self.start_combo.setMinimumHeight(32)
+        self.start_combo.addItems(list(self.START_OPTIONS))
+        starts = list(self.START_OPTIONS.values())
+        if policy.start_with in starts:
+            self.start_combo.setCurrentIndex(starts.index(policy.start_with))
+        form.addRow("Первый символ:", self.start_combo)
+
+        layout.addLayout(form)
+
+        self.no_repeat_cb = NoFocusCheckBox("Без одинаковых символов подряд")
+        self.no_repeat_cb.setChecked(policy.no_repeat)
+        layout.addWidget(self.no_repeat_cb)
+
+        self.ambiguous_cb = NoFocusCheckBox("Исключить похожие символы (0OIl1)")
+        self.ambiguous_cb.setChecked(policy.exclude_ambiguous)
+        layout.addWidget(self.ambiguous_cb)
+
+        self.summary = QLabel("")
+        self.summary.setObjectName("subtitle")
+        self.summary.setWordWrap(True)
+        layout.addWidget(self.summary)
+
+        layout.addStretch()
+
+        # Кнопки
+        btn_layout = QHBoxLayout()
+        btn_layout.setSpacing(8)
+
+        clear_btn = QPushButton("Без правил")
+        clear_btn.setObjectName("secondary")
+        clear_btn.setMinimumHeight(40)
+        clear_btn.clicked.connect(self.clear)
+        btn_layout.addWidget(clear_btn)
+
+        btn_layout.addStretch()
+
+        cancel_btn = QPushButton("Отмена")
+        cancel_btn.setObjectName("secondary")
+        cancel_btn.setMinimumHeight(40)
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+
+        self.save_btn = QPushButton("Сохранить")
+        self.save_btn.setMinimumHeight(40)
+        self.save_btn.clicked.connect(self.save)
+        self.save_btn.setDefault(True)
+        btn_layout.addWidget(self.save_btn)
+
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+        # Энтропия пересчитывается после паузы в изменениях (подсчёт для
+        # длинных паролей с большими минимумами не мгновенный)
+        self.summary_timer = QTimer(self)
+        self.summary_timer.setSingleShot(True)
+        self.summary_timer.setInterval(self.SUMMARY_DEBOUNCE_MS)
+        self.summary_timer.timeout.connect(self.update_summary)
+
+        for spin in [self.min_spin, self.max_spin, *self.class_spins.values()]:
+            spin.valueChanged.connect(self.schedule_summary)
+        for check in [self.no_repeat_cb, self.ambiguous_cb, *self.class_checks.values()]:
+            check.toggled.connect(self.schedule_summary)
+        self.symbols_input.textChanged.connect(self.schedule_summary)
+        self.start_combo.currentIndexChanged.connect(self.schedule_summary)
+        self.update_summary()
+
+    def build(self) -> PasswordPolicy:
+        """Политика из полей диалога (ValueError, если правила противоречивы)"""
+        minimums = {
+            name: self.class_spins[name].value() if check.isChecked() else None
+            for name, check in self.class_checks.items()
+        }
+        # "Буква" при запрещённых заглавных означает строчную
+        start = self.START_OPTIONS[self.start_combo.currentText()]
+        allowed = tuple(name for name in start if minimums[name] is not None)
+
+        return PasswordPolicy(
+            min_length=self.min_spin.value(),
+            max_length=self.max_spin.value(),
+            symbol_set=self.symbols_input.text(),
+            start_with=allowed or start,
+            no_repeat=self.no_repeat_cb.isChecked(),
+            exclude_ambiguous=self.ambiguous_cb.isChecked(),
+            **minimums
+        )
+
+    def schedule_summary(self, *_):
+        self.summary_timer.start()
+
+    def update_summary(self):
+        try:
+            policy = self.build()
+        except ValueError as e:
+            self.summary.setText(f"⚠️ {e}")
+            self.save_btn.setEnabled(False)
+            return
+
+        self.summary.setText(f"🎲 {policy.entropy:.1f} бит энтропии при генерации по этим правилам")
+        self.save_btn.setEnabled(True)
+
+    def save(self):
+        try:
+            self.policy = self.build()
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", str(e))
+            return
+        self.accept()
+
+    def clear(self):
+        self.policy = None
+        self.accept()
+
+
+class BackupSettingsDialog(QDialog):
+    """Настройки резервного копирования по расписанию"""
+
+    def __init__(self, settings: QSettings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.backup_now = False
         self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.init_ui()
 
     def init_ui(self):
-        self.setObjectName("password_card")
-        self.setMinimumHeight(80)
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.setWindowTitle("Резервные копии")
+        self.setModal(True)
+        self.setFixedSize(520, 420)
+        self.setStyleSheet(PERFECT_THEME)
 
-        layout = QHBoxLayout()
-        layout.setContentsMargins(16, 12, 16, 12)
+        layout = QVBoxLayout()
         layout.setSpacing(16)
+        layout.setContentsMargins(24, 24, 24, 24)
+
+        title = QLabel("Резервные копии")
+        title.setObjectName("title")
+        title.setStyleSheet("font-size: 24px; font-weight: 600;")
+        layout.addWidget(title)
+
+        self.enabled_cb = NoFocusCheckBox("Создавать копии по расписанию")
+        self.enabled_cb.setChecked(self.settings.value("backup/enabled", False, type=bool))
+        layout.addWidget(self.enabled_cb)
 
-        # Инфо
-        info = QVBoxLayout()
-        info.setSpacing(4)
+        # Каталог
+        dir_label = QLabel("📁 Каталог")
+        dir_label.setObjectName("section_title")
+        layout.addWidget(dir_label)
 
-        site = QLabel(self.entry.site)
-        site.setStyleSheet("font-size: 16px; font-weight: 600; color: #58a6ff;")
-        info.addWidget(site)
+        dir_layout = QHBoxLayout()
+        dir_layout.setSpacing(8)
 
-        user = QLabel(f"👤 {self.entry.username}")
-        user.setStyleSheet("font-size: 13px; color: #7d8590;")
-        info.addWidget(user)
+        self.dir_input = QLineEdit(self.settings.value("backup/directory", "", type=str))
+        self.dir_input.setPlaceholderText("Каталог для копий")
+        self.dir_input.setMinimumHeight(36)
+        dir_layout.addWidget(self.dir_input)
 
-        pwd = QLabel("●●●●●●●●●●●●")
-        pwd.setStyleSheet("font-size: 13px; color: #7d8590; letter-spacing: 2px;")
-        info.addWidget(pwd)
+        browse_btn = QPushButton("...")
+        browse_btn.setObjectName("secondary")
+        browse_btn.setFixedSize(36, 36)
+        browse_btn.clicked.connect(self.browse)
+        dir_layout.addWidget(browse_btn)
 
-        layout.addLayout(info, stretch=1)
+        layout.addLayout(dir_layout)
+
+        # Интервал и ротация
+        form = QFormLayout()
+        form.setSpacing(12)
+
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(1, 24 * 7)
+        self.interval_spin.setSuffix(" ч")
+        self.interval_spin.setValue(self.settings.value("backup/interval_hours", 24, type=int))
+        form.addRow("Интервал:", self.interval_spin)
+
+        self.keep_spin = QSpinBox()
+        self.keep_spin.setRange(1, 100)
+        self.keep_spin.setValue(self.settings.value("backup/keep", 7, type=int))
+        form.addRow("Хранить копий:", self.keep_spin)
+
+        layout.addLayout(form)
+        layout.addStretch()
 
         # Кнопки
         btn_layout = QHBoxLayout()
         btn_layout.setSpacing(8)
 
-        copy_btn = QPushButton("📋 Копировать")
-        copy_btn.setObjectName("secondary")
-        copy_btn.setFixedWidth(120)
-        copy_btn.setMinimumHeight(32)
-        copy_btn.clicked.connect(self.on_copy)
-        btn_layout.addWidget(copy_btn)
-
-        del_btn = QPushButton("🗑")
-        del_btn.setObjectName("danger")
-        del_btn.setFixedSize(32, 32)
-        del_btn.setToolTip("Удалить")
-        del_btn.clicked.connect(self.on_delete)
-        btn_layout.addWidget(del_btn)
+        now_btn = QPushButton("💾 Создать сейчас")
+        now_btn.setObjectName("secondary")
+        now_btn.setMinimumHeight(40)
+        now_btn.clicked.connect(self.save_and_backup)
+        btn_layout.addWidget(now_btn)
+
+        btn_layout.addStretch()
+
+        cancel_btn = QPushButton("Отмена")
+        cancel_btn.setObjectName("secondary")
+        cancel_btn.setMinimumHeight(40)
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+
+        save_btn = QPushButton("Сохранить")
+        save_btn.setMinimumHeight(40)
+        save_btn.clicked.connect(self.save)
+        save_btn.setDefault(True)
+        btn_layout.addWidget(save_btn)
 
         layout.addLayout(btn_layout)
         self.setLayout(layout)
 
-    def on_copy(self):
-        if self.parent_window:
-            self.parent_window.copy_password(self.entry.password, self.entry.site)
+    def browse(self):
+        directory = QFileDialog.getExistingDirectory(self, "Каталог для копий",
+                                                     self.dir_input.text())
+        if directory:
+            self.dir_input.setText(directory)
+
+    def save(self):
+        directory = self.dir_input.text().strip()
+        if not directory and (self.enabled_cb.isChecked() or self.backup_now):
+            QMessageBox.warning(self, "Ошибка", "Укажите каталог для копий!")
+            self.backup_now = False
+            return
+
+        self.settings.setValue("backup/enabled", self.enabled_cb.isChecked())
+        self.settings.setValue("backup/directory", directory)
+        self.settings.setValue("backup/interval_hours", self.interval_spin.value())
+        self.settings.setValue("backup/keep", self.keep_spin.value())
+        self.accept()
+
+    def save_and_backup(self):
+        self.backup_now = True
+        self.save()
+
+
+# ============= СПИСОК ПАРОЛЕЙ (MODEL/VIEW) =============
 
-    def on_delete(self):
-        if self.parent_window:
-            self.parent_window.delete_password(self.entry.site, self.entry.username)
+class PasswordListModel(QAbstractListModel):
+    """
+    Модель списка паролей
+
+    Хранит только метаданные (PasswordMeta); пароли расшифровываются
+    по запросу. Виджеты на строки не создаются - их рисует делегат.
+
+    Для поиска хранится индекс строк в нижнем регистре (один раз на
+    загрузку). Фильтр задаётся готовым списком номеров строк, который
+    считает SearchTask в фоне; version меняется при каждом изменении
+    данных, чтобы отбрасывать устаревшие результаты.
+    """
+
+    EntryRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries: List[PasswordMeta] = []
+        self._search_keys: List[str] = []
+        self._query = ""
+        self._visible: Optional[List[int]] = None
+        self.version = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._visible is not None:
+            return len(self._visible)
+        return len(self._entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if self._visible is not None:
+            row = self._visible[row]
+
+        entry = self._entries[row]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry.site
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{entry.site}\n👤 {entry.username}"
+        if role == self.EntryRole:
+            return entry
+        return None
+
+    def total_count(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def search_key(entry: PasswordMeta) -> str:
+        return f"{entry.site.lower()}\0{entry.username.lower()}"
+
+    def search_snapshot(self) -> List[str]:
+        """Копия индекса для фонового поиска"""
+        return list(self._search_keys)
+
+    def set_entries(self, entries: List[PasswordMeta]):
+        self.beginResetModel()
+        self._entries = list(entries)
+        self._search_keys = [self.search_key(e) for e in self._entries]
+        self._query = ""
+        self._visible = None
+        self.version += 1
+        self.endResetModel()
+
+    def apply_filter(self, query: str, rows: Optional[List[int]]):
+        """Показать только строки rows (None - все записи)"""
+        self.beginResetModel()
+        self._query = query
+        self._visible = rows
+        self.endResetModel()
+
+    # Точечные изменения: порядок (site, username) как в list_entries
+
+    @staticmethod
+    def _sort_key(entry: PasswordMeta):
+        return entry.site, entry.username
+
+    def _find(self, entry: PasswordMeta) -> int:
+        row = bisect.bisect_left(self._entries, self._sort_key(entry), key=self._sort_key)
+        if row < len(self._entries) and self._entries[row].id == entry.id:
+            return row
+        return -1
+
+    def insert_entry(self, entry: PasswordMeta):
+        row = bisect.bisect_left(self._entries, self._sort_key(entry), key=self._sort_key)
+        key = self.search_key(entry)
+        self.version += 1
+
+        if self._visible is None:
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._entries.insert(row, entry)
+            self._search_keys.insert(row, key)
+            self.endInsertRows()
+            return
+
+        # Сдвигаем номера видимых строк; сама запись видна, если подходит под запрос
+        self._entries.insert(row, entry)
+        self._search_keys.insert(row, key)
+        self._visible = [i + 1 if i >= row else i for i in self._visible]
+        if self._query in key:
+            pos = bisect.bisect_left(self._visible, row)
+            self.beginInsertRows(QModelIndex(), pos, pos)
+            self._visible.insert(pos, row)
+            self.endInsertRows()
+
+    def remove_entry(self, entry: PasswordMeta):
+        row = self._find(entry)
+        if row < 0:
+            return
+        self.version += 1
+
+        if self._visible is None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._entries[row]
+            del self._search_keys[row]
+            self.endRemoveRows()
+            return
+
+        pos = bisect.bisect_left(self._visible, row)
+        shown = pos < len(self._visible) and self._visible[pos] == row
+        if shown:
+            self.beginRemoveRows(QModelIndex(), pos, pos)
+        del self._entries[row]
+        del self._search_keys[row]
+        self._visible = [i - 1 if i > row else i for i in self._visible if i != row]
+        if shown:
+            self.endRemoveRows()
+
+    def update_entry(self, entry: PasswordMeta):
+        row = self._find(entry)
+        if row < 0:
+            return
+        self._entries[row] = entry
+
+        if self._visible is not None:
+            pos = bisect.bisect_left(self._visible, row)
+            if pos >= len(self._visible) or self._visible[pos] != row:
+                return
+            row = pos
+
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index)
+
+
+class PasswordCardDelegate(QStyledItemDelegate):
+    """
+    Отрисовка записи в виде карточки
+
+    Рисует то же, что раньше собиралось из QFrame/QLabel/QPushButton:
+    сайт, логин, маску пароля и кнопки «Копировать»/«Удалить».
+    Клики по кнопкам определяются по координатам в editorEvent.
+    """
+
+    copy_clicked = pyqtSignal(object)
+    delete_clicked = pyqtSignal(object)
+
+    CARD_HEIGHT = 80
+    SPACING = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.site_font = QFont()
+        self.site_font.setPixelSize(16)
+        self.site_font.setWeight(QFont.Weight.DemiBold)
+        self.small_font = QFont()
+        self.small_font.setPixelSize(13)
+        self.button_font = QFont()
+        self.button_font.setPixelSize(14)
+        self.button_font.setWeight(QFont.Weight.Medium)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT + self.SPACING)
+
+    def _layout(self, rect: QRect):
+        """Прямоугольники карточки, кнопки копирования и кнопки удаления"""
+        card = QRect(rect.left(), rect.top(), rect.width(), self.CARD_HEIGHT)
+        del_rect = QRect(card.right() - 16 - 32, card.center().y() - 16, 32, 32)
+        copy_rect = QRect(del_rect.left() - 8 - 120, card.center().y() - 16, 120, 32)
+        return card, copy_rect, del_rect
+
+    def paint(self, painter, option, index):
+        entry = index.data(PasswordListModel.EntryRole)
+        card, copy_rect, del_rect = self._layout(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Фон карточки
+        painter.setPen(QPen(QColor("#58a6ff" if hovered else "#30363d"), 1))
+        painter.setBrush(QColor("#1c2128" if hovered else "#161b22"))
+        painter.drawRoundedRect(QRectF(card).adjusted(0.5, 0.5, -0.5, -0.5), 6, 6)
+
+        # Текст
+        text_left = card.left() + 16
+        text_width = copy_rect.left() - 16 - text_left
+
+        painter.setFont(self.site_font)
+        painter.setPen(QColor("#58a6ff"))
+        site = QFontMetrics(self.site_font).elidedText(
+            entry.site, Qt.TextElideMode.ElideRight, text_width)
+        painter.drawText(QRect(text_left, card.top() + 10, text_width, 22),
+                         Qt.AlignmentFlag.AlignVCenter, site)
+
+        painter.setFont(self.small_font)
+        painter.setPen(QColor("#7d8590"))
+        user = QFontMetrics(self.small_font).elidedText(
+            f"👤 {entry.username}", Qt.TextElideMode.ElideRight, text_width)
+        painter.drawText(QRect(text_left, card.top() + 33, text_width, 18),
+                         Qt.AlignmentFlag.AlignVCenter, user)
+        painter.drawText(QRect(text_left, card.top() + 52, text_width, 18),
+                         Qt.AlignmentFlag.AlignVCenter, "●●●●●●●●●●●●")
+
+        # Кнопки
+        painter.setFont(self.button_font)
+        painter.setPen(QPen(QColor("#30363d"), 1))
+        painter.setBrush(QColor("#21262d"))
+        painter.drawRoundedRect(QRectF(copy_rect).adjusted(0.5, 0.5, -0.5, -0.5), 6, 6)
+        painter.setPen(QColor("#c9d1d9"))
+        painter.drawText(copy_rect, Qt.AlignmentFlag.AlignCenter, "📋 Копировать")
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#da3633"))
+        painter.drawRoundedRect(QRectF(del_rect), 6, 6)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(del_rect, Qt.AlignmentFlag.AlignCenter, "🗑")
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            _, copy_rect, del_rect = self._layout(option.rect)
+            pos = event.position().toPoint()
+            entry = index.data(PasswordListModel.EntryRole)
+
+            if copy_rect.contains(pos):
+                self.copy_clicked.emit(entry)
+                return True
+            if del_rect.contains(pos):
+                self.delete_clicked.emit(entry)
+                return True
+
+        return super().editorEvent(event, model, option, index)
 
 
 # ============= ГЛАВНОЕ ОКНО =============
@@ -746,12 +1932,19 @@ class PasswordCard(QFrame):
 class PasswordManagerWindow(QMainWindow):
     """Главное окно"""
 
+    SEARCH_DEBOUNCE_MS = 150
+    BACKUP_CHECK_MS = 10 * 60 * 1000  # Как часто проверять, не пора ли делать копию
+    PIN_MIN_LENGTH = 4
+
     def __init__(self, storage: StorageManager):
         super().__init__()
         self.storage = storage
         self.clipboard_timer = None
+        self.storage_task: Optional[StorageTask] = None  # Текущая фоновая операция над хранилищем
+        self.settings = QSettings("PasswordManager", "PasswordManager")
         self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.init_ui()
+        self.init_backup()
         self.load_passwords()
 
     def init_ui(self):
@@ -807,6 +2000,24 @@ class PasswordManagerWindow(QMainWindow):
 
         nav_layout.addStretch()
 
+        password_btn = QPushButton("  🔑 Мастер-пароль")
+        password_btn.setObjectName("nav_button")
+        password_btn.setMinimumHeight(40)
+        password_btn.clicked.connect(self.change_master_password)
+        nav_layout.addWidget(password_btn)
+
+        backup_btn = QPushButton("  💾 Резервные копии")
+        backup_btn.setObjectName("nav_button")
+        backup_btn.setMinimumHeight(40)
+        backup_btn.clicked.connect(self.open_backup_settings)
+        nav_layout.addWidget(backup_btn)
+
+        audit_btn = QPushButton("  🛡 Проверка утечек")
+        audit_btn.setObjectName("nav_button")
+        audit_btn.setMinimumHeight(40)
+        audit_btn.clicked.connect(self.audit_passwords)
+        nav_layout.addWidget(audit_btn)
+
         # Статистика
         stats_frame = QFrame()
         stats_frame.setStyleSheet("background-color: #0d1117; border-radius: 6px; padding: 8px;")
@@ -841,6 +2052,63 @@ class PasswordManagerWindow(QMainWindow):
         main.addWidget(self.content, stretch=1)
         central.setLayout(main)
 
+    def init_backup(self):
+        self.backup_task = BackupTask(self.storage, self)
+        self.backup_task.finished.connect(self.on_backup_finished)
+        self.backup_task.failed.connect(self.on_backup_failed)
+        self.backup_task.progress.connect(self.on_backup_progress)
+        self.backup_interactive = False
+
+        self.backup_timer = QTimer(self)
+        self.backup_timer.setInterval(self.BACKUP_CHECK_MS)
+        self.backup_timer.timeout.connect(self.check_scheduled_backup)
+        self.backup_timer.start()
+        # Первая проверка - после отрисовки окна
+        QTimer.singleShot(5000, self.check_scheduled_backup)
+
+    def check_scheduled_backup(self):
+        if not self.settings.value("backup/enabled", False, type=bool):
+            return
+
+        last = self.settings.value("backup/last", 0.0, type=float)
+        interval = self.settings.value("backup/interval_hours", 24, type=int) * 3600
+        if time.time() - last >= interval:
+            self.start_backup(interactive=False)
+
+    def start_backup(self, interactive: bool):
+        directory = self.settings.value("backup/directory", "", type=str)
+        if not directory:
+            return
+
+        keep = self.settings.value("backup/keep", 7, type=int)
+        if self.backup_task.start(directory, keep):
+            self.backup_interactive = interactive
+            self.stats_label.setText("💾 Резервная копия...")
+
+    def open_backup_settings(self):
+        dialog = BackupSettingsDialog(self.settings, self)
+        if dialog.exec():
+            if dialog.backup_now:
+                self.start_backup(interactive=True)
+            else:
+                self.check_scheduled_backup()
+
+    def on_backup_progress(self, done, total):
+        if total:
+            self.stats_label.setText(f"💾 Резервная копия: {done * 100 // total}%")
+
+    def on_backup_finished(self, path):
+        self.settings.setValue("backup/last", time.time())
+        self.update_list_state()
+        if self.backup_interactive:
+            QMessageBox.information(self, "Резервная копия",
+                                    f"✅ Резервная копия создана\n\n{path}")
+
+    def on_backup_failed(self):
+        self.update_list_state()
+        if self.backup_interactive:
+            QMessageBox.critical(self, "Ошибка", "❌ Не удалось создать резервную копию")
+
     def create_passwords_page(self):
         page = QWidget()
         layout = QVBoxLayout()
@@ -857,6 +2125,18 @@ class PasswordManagerWindow(QMainWindow):
         header.addWidget(title)
         header.addStretch()
 
+        import_btn = QPushButton("📥 Импорт")
+        import_btn.setObjectName("secondary")
+        import_btn.setMinimumHeight(40)
+        import_btn.clicked.connect(self.import_passwords)
+        header.addWidget(import_btn)
+
+        export_btn = QPushButton("📤 Экспорт")
+        export_btn.setObjectName("secondary")
+        export_btn.setMinimumHeight(40)
+        export_btn.clicked.connect(self.export_passwords)
+        header.addWidget(export_btn)
+
         add_btn = QPushButton("➕ Добавить пароль")
         add_btn.setMinimumHeight(40)
         add_btn.clicked.connect(self.add_password)
@@ -868,27 +2148,80 @@ class PasswordManagerWindow(QMainWindow):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Поиск по сайту или логину...")
         self.search_input.setMinimumHeight(40)
-        self.search_input.textChanged.connect(self.filter_passwords)
+        self.search_input.textChanged.connect(self.on_search_changed)
         layout.addWidget(self.search_input)
 
-        # Список паролей
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setFrameShape(QFrame.Shape.NoFrame)
-
-        self.cards_container = QWidget()
-        self.cards_layout = QVBoxLayout()
-        self.cards_layout.setSpacing(8)
-        self.cards_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.cards_layout.setContentsMargins(0, 0, 0, 0)
-        self.cards_container.setLayout(self.cards_layout)
-
-        scroll.setWidget(self.cards_container)
-        layout.addWidget(scroll)
+        # Поиск: задержка после последнего нажатия, затем фоновый проход
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+        self.search_task = SearchTask(self)
+        self.search_task.results.connect(self.on_search_results)
+
+        # Список паролей: рисуются только видимые строки
+        self.password_model = PasswordListModel(self)
+
+        self.password_delegate = PasswordCardDelegate(self)
+        self.password_delegate.copy_clicked.connect(self.copy_entry_password)
+        self.password_delegate.delete_clicked.connect(
+            lambda entry: self.delete_password(entry.site, entry.username))
+
+        self.password_view = QListView()
+        self.password_view.setModel(self.password_model)
+        self.password_view.setItemDelegate(self.password_delegate)
+        self.password_view.setUniformItemSizes(True)
+        self.password_view.setMouseTracking(True)
+        self.password_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.password_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.password_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.password_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.password_view.setFrameShape(QFrame.Shape.NoFrame)
+        self.password_view.setStyleSheet("QListView { background-color: transparent; }")
+
+        self.list_stack = QStackedWidget()
+        self.list_stack.addWidget(self.create_empty_state())
+        self.list_stack.addWidget(self.password_view)
+        layout.addWidget(self.list_stack)
 
         page.setLayout(layout)
         return page
 
+    def create_empty_state(self):
+        empty = QFrame()
+        empty.setObjectName("card")
+        empty.setMinimumHeight(200)
+
+        empty_layout = QVBoxLayout()
+        empty_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        empty_icon = QLabel("📭")
+        empty_icon.setFont(QFont("Segoe UI", 48))
+        empty_icon.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        empty_layout.addWidget(empty_icon)
+
+        empty_text = QLabel("Нет паролей")
+        empty_text.setStyleSheet("font-size: 18px; font-weight: 600; color: #f0f6fc;")
+        empty_text.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        empty_layout.addWidget(empty_text)
+
+        empty_hint = QLabel("Нажмите '➕ Добавить пароль' для создания первой записи")
+        empty_hint.setObjectName("subtitle")
+        empty_hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        empty_layout.addWidget(empty_hint)
+
+        empty.setLayout(empty_layout)
+
+        # Карточка прижата к верху, как раньше в списке
+        container = QWidget()
+        container_layout = QVBoxLayout()
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        container_layout.addWidget(empty)
+        container_layout.addStretch()
+        container.setLayout(container_layout)
+        return container
+
     def create_generator_page(self):
         page = QWidget()
         layout = QVBoxLayout()
@@ -931,6 +2264,24 @@ class PasswordManagerWindow(QMainWindow):
 
         result_layout.addLayout(res_container)
 
+        # Режим
+        mode_container = QHBoxLayout()
+        mode_label = QLabel("Режим:")
+        mode_label.setStyleSheet("color: #7d8590; min-width: 100px;")
+        mode_container.addWidget(mode_label)
+
+        self.gen_mode = QComboBox()
+        self.gen_mode.setMinimumHeight(32)
+        self.gen_mode.addItems(["Пароль из символов", "Парольная фраза"])
+        self.gen_mode.currentIndexChanged.connect(self.toggle_gen_mode)
+        mode_container.addWidget(self.gen_mode, 1)
+        result_layout.addLayout(mode_container)
+
+        self.gen_char_options = QWidget()
+        char_layout = QVBoxLayout()
+        char_layout.setSpacing(12)
+        char_layout.setContentsMargins(0, 0, 0, 0)
+
         # Длина
         len_container = QHBoxLayout()
         len_container.setSpacing(12)
@@ -949,28 +2300,35 @@ class PasswordManagerWindow(QMainWindow):
         self.gen_length_label.setStyleSheet("font-weight: 600; font-size: 16px; min-width: 35px;")
         len_container.addWidget(self.gen_length_label)
 
-        result_layout.addLayout(len_container)
+        char_layout.addLayout(len_container)
 
         # Опции
         opt_label = QLabel("Использовать символы:")
         opt_label.setObjectName("section_title")
-        result_layout.addWidget(opt_label)
+        char_layout.addWidget(opt_label)
 
         self.gen_upper = NoFocusCheckBox("Заглавные буквы (A-Z)")
         self.gen_upper.setChecked(True)
-        result_layout.addWidget(self.gen_upper)
+        char_layout.addWidget(self.gen_upper)
 
         self.gen_lower = NoFocusCheckBox("Строчные буквы (a-z)")
         self.gen_lower.setChecked(True)
-        result_layout.addWidget(self.gen_lower)
+        char_layout.addWidget(self.gen_lower)
 
         self.gen_digits = NoFocusCheckBox("Цифры (0-9)")
         self.gen_digits.setChecked(True)
-        result_layout.addWidget(self.gen_digits)
+        char_layout.addWidget(self.gen_digits)
 
         self.gen_symbols = NoFocusCheckBox("Символы (!@#$%^&*)")
         self.gen_symbols.setChecked(True)
-        result_layout.addWidget(self.gen_symbols)
+        char_layout.addWidget(self.gen_symbols)
+
+        self.gen_char_options.setLayout(char_layout)
+        result_layout.addWidget(self.gen_char_options)
+
+        self.gen_passphrase = PassphraseOptions()
+        self.gen_passphrase.setVisible(False)
+        result_layout.addWidget(self.gen_passphrase)
 
         result_layout.addSpacing(8)
 
@@ -996,72 +2354,252 @@ class PasswordManagerWindow(QMainWindow):
         self.nav_passwords.setChecked(index == 0)
         self.nav_generator.setChecked(index == 1)
         self.content.setCurrentIndex(index)
-        if index == 0:
-            self.load_passwords()
 
     def load_passwords(self):
-        # Очистка
-        while self.cards_layout.count():
-            item = self.cards_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        passwords = self.storage.get_all_passwords()
-
-        if not passwords:
-            empty = QFrame()
-            empty.setObjectName("card")
-            empty.setMinimumHeight(200)
-
-            empty_layout = QVBoxLayout()
-            empty_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-            empty_icon = QLabel("📭")
-            empty_icon.setFont(QFont("Segoe UI", 48))
-            empty_icon.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            empty_layout.addWidget(empty_icon)
-
-            empty_text = QLabel("Нет паролей")
-            empty_text.setStyleSheet("font-size: 18px; font-weight: 600; color: #f0f6fc;")
-            empty_text.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            empty_layout.addWidget(empty_text)
-
-            empty_hint = QLabel("Нажмите '➕ Добавить пароль' для создания первой записи")
-            empty_hint.setObjectName("subtitle")
-            empty_hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            empty_layout.addWidget(empty_hint)
-
-            empty.setLayout(empty_layout)
-            self.cards_layout.addWidget(empty)
+        passwords = self.storage.list_entries()
+        self.password_model.set_entries(passwords)
+        self.update_list_state()
+
+        if self.search_input.text():
+            self.run_search()
+
+    def update_list_state(self):
+        """Пустое состояние и статистика по текущей модели (без запросов к БД)"""
+        total = self.password_model.total_count()
+
+        if total:
+            self.list_stack.setCurrentWidget(self.password_view)
         else:
-            for entry in passwords:
-                card = PasswordCard(entry, self)
-                self.cards_layout.addWidget(card)
+            self.list_stack.setCurrentIndex(0)
 
-        # Статистика
-        stats = self.storage.get_stats()
-        self.stats_label.setText(f"Всего паролей: {stats['total']}")
+        self.stats_label.setText(f"Всего паролей: {total}")
+
+    def on_search_changed(self, _text):
+        # Каждое нажатие перезапускает таймер и отменяет идущий поиск
+        self.search_task.cancel()
+        self.search_timer.start()
+
+    def run_search(self):
+        self.filter_passwords(self.search_input.text())
 
     def filter_passwords(self, query):
         query = query.lower()
-        for i in range(self.cards_layout.count()):
-            widget = self.cards_layout.itemAt(i).widget()
-            if isinstance(widget, PasswordCard):
-                visible = (query in widget.entry.site.lower() or
-                           query in widget.entry.username.lower())
-                widget.setVisible(visible)
+        if not query:
+            self.search_task.cancel()
+            self.password_model.apply_filter("", None)
+            return
+
+        self.search_task.start(query, self.password_model.search_snapshot(),
+                               self.password_model.version)
+
+    def on_search_results(self, query, rows, version):
+        if version != self.password_model.version:
+            # Данные изменились, пока шёл поиск - повторяем
+            self.run_search()
+            return
+        self.password_model.apply_filter(query, rows)
 
     def add_password(self):
-        dialog = AddPasswordDialog(self)
+        dialog = AddPasswordDialog(self, self.storage)
         if dialog.exec() and dialog.result:
-            if self.storage.add_password(dialog.result):
+            entry = self.storage.add_password(dialog.result)
+            if entry:
+                self.password_model.insert_entry(entry)
+                self.update_list_state()
                 QMessageBox.information(self, "Успех",
                                         "✅ Пароль успешно сохранён!")
-                self.load_passwords()
             else:
                 QMessageBox.critical(self, "Ошибка",
                                      "❌ Не удалось сохранить пароль\n\nВозможно такая запись уже существует.")
 
+    def import_passwords(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Импорт паролей", "",
+            f"Экспорт браузера, Bitwarden, KeePass (*.csv *.json);;"
+            f"Архив PasswordManager (*{ARCHIVE_EXTENSION})"
+        )
+        if not path:
+            return
+
+        passphrase = None
+        if path.lower().endswith(ARCHIVE_EXTENSION):
+            passphrase, ok = QInputDialog.getText(
+                self, "Импорт", "Пароль архива:", QLineEdit.EchoMode.Password
+            )
+            if not ok or not passphrase:
+                return
+
+        policies = {
+            "Пропустить": "skip",
+            "Перезаписать": "overwrite",
+            "Оставить более новую": "keep-newer",
+        }
+        choice, ok = QInputDialog.getItem(
+            self, "Импорт", "Если запись уже существует:", list(policies), 0, False
+        )
+        if not ok:
+            return
+
+        # Файл пишется порциями (своя транзакция на каждую), архив - одной
+        kept = ("Архив импортируется одной транзакцией - ничего не записано."
+                if passphrase else "Порции, записанные до отмены, сохранены.")
+        self.run_storage_task(
+            ImportTask(self.storage, self), "Импорт", "Обработано записей: {}",
+            (path, passphrase, policies[choice]),
+            on_finished=self.on_import_finished,
+            on_failed=lambda error: self.on_import_stopped(
+                f"❌ Не удалось импортировать файл\n\n{error}"),
+            on_cancelled=lambda: self.on_import_stopped(f"Импорт отменён.\n\n{kept}"),
+        )
+
+    def on_import_finished(self, report):
+        self.load_passwords()
+        QMessageBox.information(
+            self, "Импорт завершён",
+            f"✅ Новых записей: {report.imported}\n"
+            f"Обновлено: {report.updated}\n"
+            f"Пропущено: {report.skipped}\n"
+            f"Некорректных строк: {report.invalid}"
+        )
+
+    def on_import_stopped(self, message: str):
+        # Импорт файла мог успеть записать часть порций
+        self.load_passwords()
+        QMessageBox.warning(self, "Импорт", message)
+
+    def export_passwords(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Экспорт паролей", f"passwords{ARCHIVE_EXTENSION}",
+            f"Архив PasswordManager (*{ARCHIVE_EXTENSION})"
+        )
+        if not path:
+            return
+        if not path.lower().endswith(ARCHIVE_EXTENSION):
+            path += ARCHIVE_EXTENSION
+
+        passphrase, ok = QInputDialog.getText(
+            self, "Экспорт", "Пароль для архива:", QLineEdit.EchoMode.Password
+        )
+        if not ok or not passphrase:
+            return
+        confirm, ok = QInputDialog.getText(
+            self, "Экспорт", "Повторите пароль:", QLineEdit.EchoMode.Password
+        )
+        if not ok:
+            return
+        if confirm != passphrase:
+            QMessageBox.warning(self, "Ошибка", "❌ Пароли не совпадают")
+            return
+
+        self.run_storage_task(
+            ExportTask(self.storage, self), "Экспорт", "Экспортировано записей: {}",
+            (path, passphrase),
+            on_finished=lambda count: QMessageBox.information(
+                self, "Экспорт завершён", f"✅ Экспортировано записей: {count}\n\n{path}"),
+            on_failed=lambda error: QMessageBox.critical(
+                self, "Ошибка", f"❌ Не удалось экспортировать\n\n{error}"),
+            on_cancelled=lambda: QMessageBox.information(
+                self, "Экспорт", "Экспорт отменён, архив не создан."),
+        )
+
+    def audit_passwords(self):
+        database = open_pwned_database()
+        if database is None:
+            QMessageBox.information(
+                self, "Проверка утечек",
+                "Проверка идёт офлайн по базе Have I Been Pwned.\n\n"
+                "Скачайте дамп SHA-1 (ordered by hash) и сконвертируйте его один раз:\n"
+                f"python pwned.py convert <дамп>.txt --bloom-bits 10\n\n"
+                f"Затем выберите получившийся файл {PWNED_EXTENSION}."
+            )
+            path, _ = QFileDialog.getOpenFileName(
+                self, "База утечек", "", f"База утечек (*{PWNED_EXTENSION})"
+            )
+            if not path:
+                return
+            try:
+                database = open_database(path)
+            except (OSError, ValueError, PwnedError) as e:
+                QMessageBox.critical(self, "Ошибка", f"❌ Не удалось открыть базу утечек\n\n{e}")
+                return
+            self.settings.setValue("pwned/path", path)
+
+        self.run_storage_task(
+            AuditTask(self.storage, self), "Проверка утечек", "Проверено паролей: {}",
+            (database,),
+            on_finished=lambda found: self.on_audit_finished(found, database),
+            on_failed=lambda error: QMessageBox.critical(
+                self, "Ошибка", f"❌ Не удалось проверить пароли\n\n{error}"),
+            on_cancelled=lambda: None,
+        )
+
+    def on_audit_finished(self, found, database: PwnedDatabase):
+        if not found:
+            QMessageBox.information(self, "Проверка утечек",
+                                    f"✅ Ни один пароль не найден в утечках\n\n"
+                                    f"Хешей в базе: {len(database)}")
+            return
+
+        lines = [f"• {site} ({username}) — {count} раз" for site, username, count in found[:30]]
+        if len(found) > 30:
+            lines.append(f"... и ещё {len(found) - 30}")
+        QMessageBox.warning(self, "Проверка утечек",
+                            f"🚨 Найдено в утечках: {len(found)}\n\n" + "\n".join(lines) +
+                            "\n\nСмените эти пароли.")
+
+    def run_storage_task(self, task: StorageTask, title: str, label: str, args: tuple,
+                         on_finished, on_failed, on_cancelled):
+        """
+        Запуск StorageTask под модальным диалогом прогресса
+
+        Диалог закрывается только по завершении потока: после «Отмена»
+        операция доходит до ближайшего отчёта о прогрессе, и всё это время
+        окно должно оставаться недоступным.
+        """
+        if self.storage_task and self.storage_task.running:
+            return
+
+        progress = QProgressDialog(f"{title}...", "Отмена", 0, 0, self)
+        progress.setWindowTitle(title)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+
+        def on_cancel():
+            if not task.running:
+                return  # closeEvent тоже шлёт canceled
+            task.cancel()
+            # QProgressDialog прячется при отмене - показываем снова до конца потока
+            progress.setCancelButton(None)
+            progress.setLabelText("Отмена...")
+            progress.show()
+
+        def finish(handler):
+            def slot(*result):
+                progress.hide()
+                progress.deleteLater()
+                task.deleteLater()
+                handler(*result)
+            return slot
+
+        progress.canceled.connect(on_cancel)
+        task.progress.connect(lambda count: progress.setLabelText(label.format(count)))
+        task.finished.connect(finish(on_finished))
+        task.failed.connect(finish(on_failed))
+        task.cancelled.connect(finish(on_cancelled))
+
+        self.storage_task = task
+        progress.show()
+        task.start(*args)
+
+    def copy_entry_password(self, entry: PasswordMeta):
+        # Пароль расшифровывается только в момент копирования
+        password = self.storage.reveal(entry.id)
+        if password is None:
+            QMessageBox.critical(self, "Ошибка",
+                                 "❌ Не удалось расшифровать пароль")
+            return
+        self.copy_password(password, entry.site)
+
     def copy_password(self, password, site):
         clipboard = QApplication.clipboard()
         clipboard.setText(password)
@@ -1095,14 +2633,24 @@ class PasswordManagerWindow(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            if self.storage.delete_password(site, username):
+            entry = self.storage.delete_password(site, username)
+            if entry:
+                self.password_model.remove_entry(entry)
+                self.update_list_state()
                 QMessageBox.information(self, "Успех", "✅ Пароль удалён!")
-                self.load_passwords()
             else:
                 QMessageBox.critical(self, "Ошибка",
                                      "❌ Не удалось удалить пароль")
 
     def generate_password(self):
+        if self.gen_mode.currentIndex() == 1:
+            result = self.gen_passphrase.generate()
+            if result:
+                phrase, entropy = result
+                self.gen_result.setText(phrase)
+                self.gen_strength.setText(f"Парольная фраза • {entropy:.1f} бит энтропии")
+            return
+
         pwd = PasswordGenerator.generate(
             length=self.gen_length.value(),
             uppercase=self.gen_upper.isChecked(),
@@ -1119,6 +2667,10 @@ class PasswordManagerWindow(QMainWindow):
     def update_gen_length(self, val):
         self.gen_length_label.setText(str(val))
 
+    def toggle_gen_mode(self, index):
+        self.gen_char_options.setVisible(index == 0)
+        self.gen_passphrase.setVisible(index == 1)
+
     def copy_generated(self):
         pwd = self.gen_result.text()
         if pwd:
@@ -1127,21 +2679,103 @@ class PasswordManagerWindow(QMainWindow):
             QMessageBox.information(self, "Скопировано",
                                     "✅ Пароль скопирован в буфер обмена!")
 
+    def change_master_password(self):
+        salt, kdf = self.storage.kdf_params()
+        current = MasterPasswordDialog(parent=self, salt=salt, kdf=kdf,
+                                       title="🔑 Смена пароля",
+                                       description="Введите текущий мастер-пароль")
+        if not current.exec() or not current.key:
+            return
+        if not self.storage.verify_master_key(current.key):
+            QMessageBox.warning(self, "Ошибка", "❌ Неверный мастер-пароль")
+            return
+
+        kdf = self.storage.recommended_kdf()
+        salt = CryptoUtils.generate_salt(kdf.salt_length)
+        new = MasterPasswordDialog(is_new=True, parent=self, salt=salt, kdf=kdf,
+                                   title="🔑 Смена пароля",
+                                   description="Придумайте новый мастер-пароль\n"
+                                               "⚠️ Восстановление невозможно!")
+        if not new.exec() or not new.key:
+            return
+
+        # Перешифровывается только ключ данных - мгновенно при любом числе записей
+        if self.storage.change_master_key(current.key, salt, new.key, kdf):
+            QMessageBox.information(self, "Готово", "✅ Мастер-пароль изменён")
+        else:
+            QMessageBox.critical(self, "Ошибка", "❌ Не удалось изменить мастер-пароль")
+
+    def unlock_with_pin(self) -> bool:
+        """Разблокировка по PIN; False - нужен мастер-пароль"""
+        while self.storage.quick_unlock_available():
+            pin, ok = QInputDialog.getText(
+                self, "🔓 Быстрая разблокировка",
+                f"Введите PIN (осталось попыток: {self.storage.quick_unlock_attempts()})\n"
+                f"Отмена - вход по мастер-паролю",
+                QLineEdit.EchoMode.Password
+            )
+            if not ok:
+                return False
+            if self.storage.quick_unlock(pin):
+                return True
+
+        QMessageBox.warning(self, "Быстрая разблокировка",
+                            "PIN больше недействителен.\n\nВведите мастер-пароль.")
+        return False
+
     def lock_app(self):
-        reply = QMessageBox.question(
-            self, "Блокировка",
+        box = QMessageBox(
+            QMessageBox.Icon.Question, "Блокировка",
             "Заблокировать базу данных?\n\n"
             "Потребуется повторный ввод мастер-пароля.",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, self
         )
+        quick_cb = QCheckBox(f"Быстрая разблокировка по PIN "
+                             f"({QuickUnlock.TTL // 60} мин, {QuickUnlock.MAX_ATTEMPTS} попыток)")
+        quick_cb.setChecked(self.settings.value("quick_unlock/enabled", False, type=bool))
+        box.setCheckBox(quick_cb)
+        reply = box.exec()
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.storage.lock()
+            self.settings.setValue("quick_unlock/enabled", quick_cb.isChecked())
+
+            pin = None
+            if quick_cb.isChecked():
+                pin, ok = QInputDialog.getText(
+                    self, "Быстрая разблокировка",
+                    f"PIN для разблокировки (не короче {self.PIN_MIN_LENGTH} символов):",
+                    QLineEdit.EchoMode.Password
+                )
+                if not ok:
+                    return
+                if len(pin) < self.PIN_MIN_LENGTH:
+                    QMessageBox.warning(self, "Ошибка",
+                                        f"PIN должен содержать минимум {self.PIN_MIN_LENGTH} символа!")
+                    return
+
+            self.storage.lock(pin)
             self.hide()
 
-            dialog = MasterPasswordDialog(parent=self)
-            if dialog.exec() and dialog.password:
-                if self.storage.unlock(dialog.password):
+            if self.storage.quick_unlock_available():
+                # Ключ в памяти стирается по истечении срока, даже если PIN не вводили
+                QTimer.singleShot(QuickUnlock.TTL * 1000, self.storage.quick_unlock_available)
+                if self.unlock_with_pin():
+                    self.show()
+                    return
+
+            if self.storage.salt is None:
+                self.storage.load_salt()
+            salt, kdf = self.storage.kdf_params()
+            if salt is None:
+                QMessageBox.critical(None, "Ошибка",
+                                     "❌ Не удалось открыть базу!\n\nПриложение будет закрыто.")
+                QApplication.quit()
+                return
+
+            dialog = MasterPasswordDialog(parent=self, salt=salt, kdf=kdf)
+            if dialog.exec() and dialog.key:
+                if self.storage.unlock_with_key(dialog.key):
+                    self.storage.start_kdf_upgrade(dialog.password)
                     self.show()
                     self.load_passwords()
                 else:
@@ -0,0 +1,277 @@
+# importer.py - Потоковый импорт паролей из экспортов других менеджеров
+"""
+Поддерживаемые форматы:
+    browser        - CSV браузеров (Chrome/Edge: name,url,username,password,note;
+                     Firefox: url,username,password,...,timePasswordChanged)
+    bitwarden_csv  - CSV Bitwarden (login_uri, login_username, login_password, ...)
+    bitwarden_json - JSON Bitwarden ({"items": [...]})
+    keepass        - CSV KeePassXC (Title, Username, Password, URL, Notes)
+                     и KeePass 2 (Account, Login Name, Password, Web Site, Comments)
+
+Файл читается потоково, порциями по chunk_size строк. Порции шифруются
+в пуле потоков (AES-GCM отпускает GIL) и записываются по одной транзакции
+на порцию, так что в памяти находится не больше workers + 1 порций.
+"""
+import csv
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from models import PasswordEntry, ImportReport
+from storage import StorageManager
+
+try:
+    import ijson  # Потоковый разбор JSON (опционально)
+except ImportError:
+    ijson = None
+
+FORMATS = ("browser", "bitwarden_csv", "bitwarden_json", "keepass")
+
+
+def detect_format(path: str) -> str:
+    """Определение формата по расширению и заголовку CSV"""
+    if path.lower().endswith(".json"):
+        return "bitwarden_json"
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = {name.strip().lower() for name in next(csv.reader(f), [])}
+
+    if "login_password" in header:
+        return "bitwarden_csv"
+    if {"title", "password"} <= header or {"account", "login name"} <= header:
+        return "keepass"
+    if {"url", "password"} <= header:
+        return "browser"
+
+    raise ValueError(f"Не удалось определить формат файла: {path}")
+
+
+def iter_records(path: str, fmt: str = "auto") -> Iterator[Optional[PasswordEntry]]:
+    """
+    Потоковое чтение записей из файла экспорта
+
+    Для строк без сайта или пароля выдаётся None (учитываются как invalid).
+    """
+    if fmt == "auto":
+        fmt = detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+
+    if fmt == "bitwarden_json":
+        yield from _iter_bitwarden_json(path)
+        return
+
+    parse = {
+        "browser": _parse_browser,
+        "bitwarden_csv": _parse_bitwarden_csv,
+        "keepass": _parse_keepass,
+    }[fmt]
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            # Ключи заголовка без учёта регистра и пробелов
+            row = {(k or "").strip().lower(): (v or "") for k, v in row.items()}
+            yield _make_entry(*parse(row))
+
+
+def import_file(
+        storage: StorageManager,
+        path: str,
+        fmt: str = "auto",
+        policy: str = "skip",
+        chunk_size: int = 2000,
+        workers: int = 4,
+        progress: Optional[Callable[[ImportReport], None]] = None
+) -> ImportReport:
+    """
+    Импорт файла экспорта в хранилище
+
+    Args:
+        storage: Разблокированное хранилище
+        path: Путь к файлу
+        fmt: Формат из FORMATS или "auto"
+        Остальные аргументы - см. import_records
+    """
+    return import_records(storage, iter_records(path, fmt), policy,
+                          chunk_size, workers, progress)
+
+
+def import_records(
+        storage: StorageManager,
+        records: Iterable[Optional[PasswordEntry]],
+        policy: str = "skip",
+        chunk_size: int = 2000,
+        workers: int = 4,
+        progress: Optional[Callable[[ImportReport], None]] = None
+) -> ImportReport:
+    """
+    Импорт потока записей в хранилище
+
+    Args:
+        storage: Разблокированное хранилище
+        records: Записи (None - некорректная строка источника)
+        policy: Политика конфликтов (StorageManager.IMPORT_POLICIES)
+        chunk_size: Строк в одной порции (и одной транзакции)
+        workers: Потоков шифрования
+        progress: Вызывается после записи каждой порции с текущим итогом
+
+    Строки без даты изменения получают время импорта, поэтому для них
+    keep-newer работает как overwrite.
+
+    Returns:
+        ImportReport
+    """
+    if storage.is_locked() or not storage.cipher:
+        raise RuntimeError("БД заблокирована")
+    if policy not in StorageManager.IMPORT_POLICIES:
+        raise ValueError(f"Неизвестная политика конфликтов: {policy}")
+
+    cipher = storage.cipher
+    report = ImportReport()
+    records = iter(records)
+
+    def write(rows: List[tuple]):
+        counts = storage.write_encrypted(rows, policy)
+        if counts is None:
+            raise RuntimeError("Ошибка записи в БД")
+        report.imported += counts[0]
+        report.updated += counts[1]
+        report.skipped += counts[2]
+        if progress:
+            progress(report)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="import") as pool:
+        pending = deque()
+
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+
+            entries = [entry for entry in chunk if entry is not None]
+            report.invalid += len(chunk) - len(entries)
+            pending.append(pool.submit(_encrypt_chunk, cipher, entries))
+
+            # Ограничиваем число порций в памяти
+            if len(pending) > workers:
+                write(pending.popleft().result())
+
+        while pending:
+            write(pending.popleft().result())
+
+    print(f"✅ Импорт: новых {report.imported}, обновлено {report.updated}, "
+          f"пропущено {report.skipped}, некорректных {report.invalid}")
+    return report
+
+
+def _encrypt_chunk(cipher, entries: List[PasswordEntry]) -> List[tuple]:
+    passwords = cipher.encrypt_many([e.password.encode("utf-8") for e in entries])
+    notes = cipher.encrypt_many_optional(
+        [e.notes.encode("utf-8") if e.notes else None for e in entries])
+
+    return [
+        (e.site, e.username, password, note, e.created_at, e.updated_at)
+        for e, password, note in zip(entries, passwords, notes)
+    ]
+
+
+def _make_entry(site: str, username: str, password: str, notes: str,
+                updated_at: Optional[str]) -> Optional[PasswordEntry]:
+    site = site.strip()
+    if not site or not password.strip():  # Пароль из одних пробелов - пустой
+        return None
+
+    return PasswordEntry(
+        site=site,
+        username=username.strip(),
+        password=password,
+        notes=notes.strip() or None,
+        created_at=updated_at,
+        updated_at=updated_at
+    )
+
+
+def _site_from(url: str, fallback: str) -> str:
+    """Хост из URL (как в записях, созданных вручную), иначе название"""
+    url = url.strip()
+    if url:
+        host = urlparse(url if "://" in url else f"https://{url}").hostname
+        if host:
+            return host
+    return fallback or url
+
+
+def _normalize_time(value) -> Optional[str]:
+    """ISO-строка или метка в миллисекундах -> локальное время в isoformat"""
+    if value in (None, ""):
+        return None
+    try:
+        if isinstance(value, (int, float)) or str(value).isdigit():
+            moment = datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+        else:
+            moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        if moment.tzinfo:
+            moment = moment.astimezone().replace(tzinfo=None)
+        return moment.isoformat()
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def _parse_browser(row: dict):
+    return (
+        _site_from(row.get("url", ""), row.get("name", "")),
+        row.get("username", ""),
+        row.get("password", ""),
+        row.get("note", "") or row.get("notes", ""),
+        _normalize_time(row.get("timepasswordchanged")),
+    )
+
+
+def _parse_bitwarden_csv(row: dict):
+    return (
+        _site_from(row.get("login_uri", "").split(",")[0], row.get("name", "")),
+        row.get("login_username", ""),
+        row.get("login_password", ""),
+        row.get("notes", ""),
+        None,
+    )
+
+
+def _parse_keepass(row: dict):
+    return (
+        _site_from(row.get("url", "") or row.get("web site", ""),
+                   row.get("title", "") or row.get("account", "")),
+        row.get("username", "") or row.get("login name", ""),
+        row.get("password", ""),
+        row.get("notes", "") or row.get("comments", ""),
+        _normalize_time(row.get("last modified")),
+    )
+
+
+def _iter_bitwarden_json(path: str) -> Iterator[Optional[PasswordEntry]]:
+    with open(path, "rb") as f:
+        if ijson:
+            items = ijson.items(f, "items.item")
+        else:
+            # Без ijson документ разбирается целиком
+            items = json.load(f).get("items", [])
+
+        for item in items:
+            login = item.get("login") or {}
+            if item.get("type", 1) != 1 or not login:
+                yield None
+                continue
+
+            uris = login.get("uris") or []
+            uri = (uris[0].get("uri") or "") if uris else ""
+            yield _make_entry(
+                _site_from(uri, item.get("name") or ""),
+                login.get("username") or "",
+                login.get("password") or "",
+                item.get("notes") or "",
+                _normalize_time(item.get("revisionDate")),
+            )
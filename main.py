@@ -36,27 +36,39 @@ def main():
         print("📦 Загрузка модулей...")
         from gui import PasswordManagerWindow, MasterPasswordDialog
         from storage import StorageManager
+        from crypto_utils import CryptoUtils
         print("✅ Модули загружены\n")
 
         # Создаём хранилище
         storage = StorageManager(DB_PATH)
 
+        # Окно строится и отрисовывается сразу (пока заблокировано),
+        # параллельно с вводом пароля и вычислением ключа в фоне
+        print("🎨 Загрузка интерфейса...\n")
+        window = PasswordManagerWindow(storage)
+        window.show()
+
         if not storage.exists():
             # ========== СОЗДАНИЕ НОВОЙ БД ==========
             print("📦 Создание новой базы данных...\n")
 
+            # Алгоритм KDF выбирается в диалоге, его параметры подбираются
+            # под эту машину (~0.5 с на разблокировку) в фоне
+            salt = CryptoUtils.generate_salt()
+
             attempts = 0
             while attempts < MAX_ATTEMPTS:
                 attempts += 1
                 print(f"🔐 Попытка создания {attempts}/{MAX_ATTEMPTS}")
 
-                dialog = MasterPasswordDialog(is_new=True)
+                dialog = MasterPasswordDialog(is_new=True, parent=window, salt=salt,
+                                              kdf_target=StorageManager.KDF_TARGET_SECONDS)
                 result = dialog.exec()
 
-                if result and dialog.password:
+                if result and dialog.key:
                     print(f"   Пароль введён (длина: {len(dialog.password)} символов)")
 
-                    if storage.initialize(dialog.password):
+                    if storage.initialize_with_key(salt, dialog.key, dialog.kdf, dialog.calibration):
                         print("   ✅ База создана успешно!\n")
                         break
                     else:
@@ -94,19 +106,28 @@ def main():
             # ========== ОТКРЫТИЕ СУЩЕСТВУЮЩЕЙ БД ==========
             print("🔓 Открытие существующей базы...\n")
 
+            salt = storage.load_salt()
+            if salt is None:
+                QMessageBox.critical(None, "Ошибка",
+                                     "❌ Не удалось открыть базу!\n\nФайл повреждён или недоступен.")
+                return 1
+
             attempts = 0
             while attempts < MAX_ATTEMPTS:
                 attempts += 1
                 print(f"🔐 Попытка входа {attempts}/{MAX_ATTEMPTS}")
 
-                dialog = MasterPasswordDialog(is_new=False)
+                dialog = MasterPasswordDialog(is_new=False, parent=window, salt=salt,
+                                              kdf=storage.kdf)
                 result = dialog.exec()
 
-                if result and dialog.password:
+                if result and dialog.key:
                     print(f"   Попытка разблокировки (длина: {len(dialog.password)} символов)")
 
-                    if storage.unlock(dialog.password):
+                    if storage.unlock_with_key(dialog.key):
                         print("   ✅ Пароль верный!\n")
+                        # Устаревшие параметры KDF обновляются в фоне
+                        storage.start_kdf_upgrade(dialog.password)
                         break
                     else:
                         print("   ❌ Неверный пароль")
@@ -153,10 +174,7 @@ def main():
                 return 0
 
         # ========== ЗАПУСК ГЛАВНОГО ОКНА ==========
-        print("🎨 Загрузка интерфейса...\n")
-
-        window = PasswordManagerWindow(storage)
-        window.show()
+        window.load_passwords()
 
         print("✅ Приложение запущено успешно!\n")
         print("=" * 50)
@@ -1,6 +1,6 @@
 # models.py - Модели данных
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple
 from datetime import datetime
 
 
@@ -19,4 +19,35 @@ class PasswordEntry:
         if self.created_at is None:
             self.created_at = datetime.now().isoformat()
         if self.updated_at is None:
-            self.updated_at = datetime.now().isoformat()
\ No newline at end of file
+            self.updated_at = datetime.now().isoformat()
+
+
+@dataclass
+class PasswordMeta:
+    """Открытые метаданные записи (без расшифровки секретов)"""
+    id: int
+    site: str
+    username: str
+    created_at: str
+    updated_at: str
+    has_notes: bool = False
+
+
+@dataclass
+class BatchResult:
+    """Итог пакетной операции (add_many/update_many/delete_many)"""
+    processed: int = 0
+    conflicts: List[Tuple[str, str]] = field(default_factory=list)  # (site, username)
+
+
+@dataclass
+class ImportReport:
+    """Итог импорта"""
+    imported: int = 0  # Новые записи
+    updated: int = 0  # Перезаписаны по политике конфликтов
+    skipped: int = 0  # Конфликты, оставленные как есть
+    invalid: int = 0  # Строки без сайта или пароля
+
+    @property
+    def processed(self) -> int:
+        return self.imported + self.updated + self.skipped + self.invalid
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# passphrase.py - Парольные фразы по словарю (diceware)
+"""
+Формат словаря (.pmwords):
+
+    Заголовок:  magic "PMWORDS1" | число слов (4)
+    Смещения:   (число слов + 1) x 4 байта от начала области слов
+    Слова:      UTF-8 подряд, без разделителей
+
+Файл отображается в память (mmap): при открытии читается только
+заголовок, слово i - срез между смещениями i и i + 1. Большой словарь
+(EFF, список на миллион слов) не разбирается в список Python при запуске.
+
+Текстовый словарь конвертируется один раз:
+    python passphrase.py build eff_large_wordlist.txt
+    python passphrase.py sample eff_large_wordlist.pmwords --words 6
+"""
+import argparse
+import math
+import mmap
+import os
+import secrets
+import struct
+from functools import lru_cache
+from typing import Iterator
+
+WORDLIST_EXTENSION = ".pmwords"
+WORDLIST_PATH = "wordlist" + WORDLIST_EXTENSION
+MAGIC = b"PMWORDS1"
+
+HEADER = struct.Struct(">8sI")
+OFFSET = struct.Struct(">I")
+OFFSET_PAIR = struct.Struct(">II")
+
+CAPITALIZATION = ("lower", "title", "upper")
+# Пустого разделителя нет: словарь не префиксный, и разные наборы слов
+# склеиваются в одну строку - энтропия words * log2(N) была бы завышена
+SEPARATORS = ("-", " ", ".", "_")
+
+
+class WordlistError(Exception):
+    """Файл словаря повреждён или имеет неизвестный формат"""
+
+
+class Wordlist:
+    """Словарь .pmwords, отображённый в память"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(self._mm) < HEADER.size:
+                raise WordlistError("Файл слишком короткий")
+            magic, count = HEADER.unpack_from(self._mm)
+            if magic != MAGIC:
+                raise WordlistError("Неизвестный формат словаря")
+
+            self._count = count
+            self._data = HEADER.size + OFFSET.size * (count + 1)
+            if count < 2 or len(self._mm) < self._data:
+                raise WordlistError("Словарь пуст или обрезан")
+
+            # Последнее смещение - размер области слов
+            end, = OFFSET.unpack_from(self._mm, self._data - OFFSET.size)
+            if self._data + end != len(self._mm):
+                raise WordlistError("Словарь обрезан")
+        except BaseException:
+            self._mm.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        start, end = OFFSET_PAIR.unpack_from(self._mm, HEADER.size + OFFSET.size * index)
+        return self._mm[self._data + start:self._data + end].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(self._count))
+
+    @property
+    def bits_per_word(self) -> float:
+        return math.log2(self._count)
+
+    def close(self):
+        self._mm.close()
+
+
+@lru_cache(maxsize=4)
+def open_wordlist(path: str) -> Wordlist:
+    """Открытие словаря (отображение переиспользуется между вызовами)"""
+    return Wordlist(path)
+
+
+def build_wordlist(source: str, dest: str = None) -> int:
+    """
+    Конвертация текстового словаря в .pmwords
+
+    Строка - одно слово или "номер_кубиков<TAB>слово" (формат EFF);
+    пустые строки и комментарии (#) пропускаются. Повторы без учёта
+    регистра удаляются, иначе с заглавными буквами энтропия была бы
+    завышена.
+
+    Returns:
+        Число слов в словаре
+    """
+    if dest is None:
+        dest = os.path.splitext(source)[0] + WORDLIST_EXTENSION
+
+    words, seen = [], set()
+    with open(source, encoding="utf-8-sig") as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            word = parts[1] if len(parts) > 1 and parts[0].isdigit() else parts[0]
+            if word.lower() not in seen:
+                seen.add(word.lower())
+                words.append(word.lower())
+
+    if len(words) < 2:
+        raise WordlistError(f"В словаре меньше двух слов: {source}")
+
+    encoded = [word.encode("utf-8") for word in words]
+    offsets, position = [0], 0
+    for word in encoded:
+        position += len(word)
+        offsets.append(position)
+
+    tmp_path = dest + ".part"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(encoded)))
+            f.write(struct.pack(f">{len(offsets)}I", *offsets))
+            f.write(b"".join(encoded))
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    open_wordlist.cache_clear()
+    print(f"✅ Словарь: {len(encoded)} слов → {dest}")
+    return len(encoded)
+
+
+class PassphraseGenerator:
+    """Генератор парольных фраз из случайных слов словаря"""
+
+    MIN_WORDS = 3
+    MAX_WORDS = 20
+
+    @staticmethod
+    def generate(
+            wordlist: Wordlist,
+            words: int = 6,
+            separator: str = "-",
+            capitalization: str = "lower"
+    ) -> str:
+        """
+        Генерация парольной фразы
+
+        Args:
+            wordlist: Словарь (open_wordlist)
+            words: Число слов (3-20)
+            separator: Разделитель слов (непустой)
+            capitalization: "lower", "title" (с заглавной) или "upper"
+
+        Returns:
+            Фраза из равновероятно выбранных слов
+        """
+        if capitalization not in CAPITALIZATION:
+            raise ValueError(f"Неизвестный регистр: {capitalization}")
+        if not separator:
+            raise ValueError("Нужен непустой разделитель: без него фраза неоднозначна")
+        words = min(max(words, PassphraseGenerator.MIN_WORDS), PassphraseGenerator.MAX_WORDS)
+
+        chosen = [wordlist[secrets.randbelow(len(wordlist))] for _ in range(words)]
+        if capitalization == "title":
+            chosen = [word.capitalize() for word in chosen]
+        elif capitalization == "upper":
+            chosen = [word.upper() for word in chosen]
+
+        return separator.join(chosen)
+
+    @staticmethod
+    def entropy(wordlist: Wordlist, words: int = 6) -> float:
+        """
+        Энтропия фразы в битах: words * log2(размер словаря)
+
+        Регистр и разделитель фиксированы и энтропию не добавляют.
+        """
+        words = min(max(words, PassphraseGenerator.MIN_WORDS), PassphraseGenerator.MAX_WORDS)
+        return words * wordlist.bits_per_word
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Словари для парольных фраз")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="конвертация текстового словаря в .pmwords")
+    p.add_argument("source")
+    p.add_argument("dest", nargs="?")
+
+    p = sub.add_parser("sample", help="примеры фраз")
+    p.add_argument("wordlist")
+    p.add_argument("--words", type=int, default=6)
+    p.add_argument("--separator", default="-")
+    p.add_argument("--capitalization", choices=CAPITALIZATION, default="lower")
+    p.add_argument("--count", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        build_wordlist(args.source, args.dest)
+        return
+
+    wordlist = open_wordlist(args.wordlist)
+    for _ in range(args.count):
+        print(PassphraseGenerator.generate(wordlist, args.words, args.separator,
+                                           args.capitalization))
+    print(f"Энтропия: {PassphraseGenerator.entropy(wordlist, args.words):.1f} бит "
+          f"({len(wordlist)} слов)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# pwned.py - Офлайн-проверка паролей по базе утечек Have I Been Pwned
+"""
+Формат базы (.pmhibp):
+
+    Заголовок:  magic "PMHIBP01" | число записей (8)
+    Записи:     SHA-1 (20) | сколько раз встречался (4), по возрастанию хеша
+
+Записи фиксированной длины, файл отображается в память (mmap). Поиск -
+интерполяционный (хеши распределены равномерно, обычно хватает 3-4
+обращений к файлу), в конце - бинарный. База в память не загружается.
+
+Фильтр Блума (.pmbloom, необязательный): magic "PMBLOOM2" | бит (8) |
+число хешей (1) | отпечаток базы: число записей (8), первый и последний
+хеш (20 + 20) | биты. Индексы берутся из самого SHA-1 (двойное
+хеширование), для отсутствующих паролей большой файл не читается.
+Фильтр, отпечаток которого не совпадает с базой, не используется -
+иначе после пересборки базы он давал бы ложные «не найдено».
+
+Текстовый дамп HIBP (HASH:COUNT, версия ordered-by-hash) конвертируется
+один раз; дамп в другом порядке сортируется внешней сортировкой:
+    python pwned.py convert pwned-passwords-sha1-ordered-by-hash-v8.txt --bloom-bits 10
+    python pwned.py check "Password123!"
+
+Во время работы сеть не используется.
+"""
+import argparse
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import tempfile
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from storage import StorageManager
+
+try:
+    import numpy as np  # Векторное построение фильтра Блума (опционально)
+except ImportError:
+    np = None
+
+PWNED_EXTENSION = ".pmhibp"
+BLOOM_EXTENSION = ".pmbloom"
+PWNED_PATH = "pwned-passwords" + PWNED_EXTENSION
+MAGIC = b"PMHIBP01"
+BLOOM_MAGIC = b"PMBLOOM2"
+
+HEADER = struct.Struct(">8sQ")
+RECORD = struct.Struct(">20sI")
+BLOOM_HEADER = struct.Struct(">8sQBQ20s20s")
+HASH_LENGTH = 20
+
+RUN_RECORDS = 4 * 1024 * 1024  # Записей в одном отрезке внешней сортировки
+BLOOM_CHUNK = 1024 * 1024  # Записей за шаг при построении фильтра
+MASK64 = (1 << 64) - 1
+
+
+class PwnedError(Exception):
+    """Файл базы утечек повреждён или имеет неизвестный формат"""
+
+
+class BloomFilter:
+    """Фильтр Блума по SHA-1, отображённый в память"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            # Пустой файл mmap не отображает - проверяем длину до него
+            if os.fstat(f.fileno()).st_size < BLOOM_HEADER.size:
+                raise PwnedError("Фильтр Блума слишком короткий")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, self.bits, self.hashes, *fingerprint = BLOOM_HEADER.unpack_from(self._mm)
+            self.fingerprint = tuple(fingerprint)
+            if magic != BLOOM_MAGIC or len(self._mm) != BLOOM_HEADER.size + (self.bits + 7) // 8:
+                raise PwnedError("Повреждённый фильтр Блума")
+        except BaseException:
+            self._mm.close()
+            raise
+
+    def might_contain(self, digest: bytes) -> bool:
+        for index in _bloom_indices(digest, self.bits, self.hashes):
+            if not self._mm[BLOOM_HEADER.size + (index >> 3)] & (1 << (index & 7)):
+                return False
+        return True
+
+    def close(self):
+        self._mm.close()
+
+
+class PwnedDatabase:
+    """База хешей утечек HIBP (.pmhibp) с необязательным фильтром Блума"""
+
+    def __init__(self, path: str, bloom_path: Optional[str] = None):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise PwnedError("Файл слишком короткий")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, self._count = HEADER.unpack_from(self._mm)
+            if magic != MAGIC:
+                raise PwnedError("Неизвестный формат базы утечек")
+            if len(self._mm) != HEADER.size + RECORD.size * self._count:
+                raise PwnedError("База утечек обрезана")
+        except BaseException:
+            self._mm.close()
+            raise
+
+        if bloom_path is None:
+            bloom_path = os.path.splitext(path)[0] + BLOOM_EXTENSION
+        try:
+            self.bloom = BloomFilter(bloom_path) if os.path.exists(bloom_path) else None
+        except BaseException:
+            self._mm.close()
+            raise
+
+        if self.bloom and self.bloom.fingerprint != self.fingerprint():
+            print(f"⚠️ Фильтр Блума {bloom_path} построен для другой базы - не используется")
+            self.bloom.close()
+            self.bloom = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def fingerprint(self) -> Tuple[int, bytes, bytes]:
+        """Число записей, первый и последний хеш (сверка с фильтром Блума)"""
+        if not self._count:
+            return 0, bytes(HASH_LENGTH), bytes(HASH_LENGTH)
+        return self._count, self._hash(0), self._hash(self._count - 1)
+
+    def lookup(self, digest: bytes) -> int:
+        """Сколько раз SHA-1 встречался в утечках (0 - не встречался)"""
+        if self.bloom and not self.bloom.might_contain(digest):
+            return 0
+
+        key = int.from_bytes(digest[:8], "big")
+        lo, hi = 0, self._count  # Искомая запись, если есть, в [lo, hi)
+        lo_key, hi_key = 0, MASK64 + 1
+        steps = 0
+
+        while hi - lo > 8:
+            steps += 1
+            if steps <= 8 and hi_key > lo_key:
+                # Позиция по равномерному распределению хешей
+                mid = lo + (key - lo_key) * (hi - lo) // (hi_key - lo_key)
+                mid = min(max(mid, lo), hi - 1)
+            else:
+                mid = (lo + hi) // 2
+
+            record = self._hash(mid)
+            if record < digest:
+                lo, lo_key = mid + 1, int.from_bytes(record[:8], "big")
+            elif record > digest:
+                hi, hi_key = mid, int.from_bytes(record[:8], "big")
+            else:
+                return self._occurrences(mid)
+
+        for index in range(lo, hi):
+            if self._hash(index) == digest:
+                return self._occurrences(index)
+        return 0
+
+    def count(self, password: str) -> int:
+        """Сколько раз пароль встречался в утечках"""
+        return self.lookup(hashlib.sha1(password.encode("utf-8")).digest())
+
+    def _hash(self, index: int) -> bytes:
+        offset = HEADER.size + RECORD.size * index
+        return self._mm[offset:offset + HASH_LENGTH]
+
+    def _occurrences(self, index: int) -> int:
+        return RECORD.unpack_from(self._mm, HEADER.size + RECORD.size * index)[1]
+
+    def close(self):
+        self._mm.close()
+        if self.bloom:
+            self.bloom.close()
+
+
+@lru_cache(maxsize=2)
+def open_database(path: str) -> PwnedDatabase:
+    """Открытие базы (отображение переиспользуется между вызовами)"""
+    return PwnedDatabase(path)
+
+
+def convert(source: str, dest: str = None, bloom_bits: int = 0,
+            progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Конвертация текстового дампа HIBP (HASH или HASH:COUNT по строкам)
+
+    Первый проход пишет записи в порядке дампа и проверяет сортировку;
+    для дампа ordered-by-hash он же и последний. Иначе записи
+    сортируются внешней сортировкой (отрезки по RUN_RECORDS + слияние).
+
+    Args:
+        bloom_bits: Бит фильтра Блума на запись (0 - без фильтра; 10 - ~1% ложных)
+
+    Returns:
+        Число записей
+    """
+    if dest is None:
+        dest = os.path.splitext(source)[0] + PWNED_EXTENSION
+
+    tmp_path = dest + ".part"
+    count, ordered, previous = 0, True, b""
+    try:
+        with open(source, "rb") as src, open(tmp_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, 0))
+            for line in src:
+                digest, _, occurrences = line.strip().partition(b":")
+                if not digest:
+                    continue
+                try:
+                    if len(digest) != HASH_LENGTH * 2:
+                        raise ValueError(digest)
+                    record = RECORD.pack(bytes.fromhex(digest.decode("ascii")),
+                                         min(int(occurrences or 1), 0xFFFFFFFF))
+                except (ValueError, struct.error):
+                    raise PwnedError(f"Некорректная строка {count + 1}: {line[:60]!r}")
+
+                if record[:HASH_LENGTH] <= previous:
+                    ordered = False
+                previous = record[:HASH_LENGTH]
+                out.write(record)
+                count += 1
+                if progress and count % RUN_RECORDS == 0:
+                    progress(count)
+
+        if not ordered:
+            print("⚠️ Дамп не отсортирован по хешу - внешняя сортировка...")
+            count = _sort_records(tmp_path)
+
+        with open(tmp_path, "r+b") as f:
+            f.write(HEADER.pack(MAGIC, count))
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Фильтр от прежней базы с тем же именем был бы ей чужим
+        bloom_path = os.path.splitext(dest)[0] + BLOOM_EXTENSION
+        if os.path.exists(bloom_path):
+            os.remove(bloom_path)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    open_database.cache_clear()
+    print(f"✅ База утечек: {count} хешей → {dest}")
+
+    if bloom_bits:
+        build_bloom(dest, bloom_bits)
+    return count
+
+
+def _sort_records(path: str) -> int:
+    """Внешняя сортировка записей файла с удалением повторов хешей"""
+    runs = []
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        with open(path, "rb") as f:
+            f.seek(HEADER.size)
+            while True:
+                chunk = f.read(RECORD.size * RUN_RECORDS)
+                if not chunk:
+                    break
+                records = sorted(chunk[i:i + RECORD.size] for i in range(0, len(chunk), RECORD.size))
+                run = tempfile.NamedTemporaryFile(dir=directory, suffix=".run", delete=False)
+                runs.append(run.name)
+                with run:
+                    run.write(b"".join(records))
+
+        count, previous = 0, None
+        with open(path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, 0))
+            files = [open(name, "rb") for name in runs]
+            try:
+                streams = [iter(lambda f=f: f.read(RECORD.size), b"") for f in files]
+                for record in heapq.merge(*streams):
+                    if record[:HASH_LENGTH] == previous:
+                        continue
+                    previous = record[:HASH_LENGTH]
+                    out.write(record)
+                    count += 1
+            finally:
+                for f in files:
+                    f.close()
+        return count
+    finally:
+        for name in runs:
+            os.remove(name)
+
+
+def build_bloom(path: str, bits_per_record: int = 10) -> str:
+    """
+    Фильтр Блума для базы path (рядом, с расширением .pmbloom)
+
+    При bits_per_record бит на запись и оптимальном числе хешей
+    доля ложных срабатываний ~ 0.6185 ** bits_per_record.
+    """
+    database = PwnedDatabase(path, bloom_path="")
+    fingerprint = database.fingerprint()
+    bits = max(64, len(database) * bits_per_record)
+    hashes = max(1, round(bits_per_record * math.log(2)))
+    array = bytearray((bits + 7) // 8)
+
+    if np is not None:
+        _fill_bloom_numpy(database, array, bits, hashes)
+    else:
+        for index in range(len(database)):
+            for bit in _bloom_indices(database._hash(index), bits, hashes):
+                array[bit >> 3] |= 1 << (bit & 7)
+    database.close()
+
+    dest = os.path.splitext(path)[0] + BLOOM_EXTENSION
+    tmp_path = dest + ".part"
+    with open(tmp_path, "wb") as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes, *fingerprint))
+        f.write(array)
+    os.replace(tmp_path, dest)
+
+    open_database.cache_clear()
+    print(f"✅ Фильтр Блума: {len(array) / (1024 * 1024):.1f} МиБ, {hashes} хешей → {dest}")
+    return dest
+
+
+def _fill_bloom_numpy(database: PwnedDatabase, array: bytearray, bits: int, hashes: int):
+    """Те же индексы, что _bloom_indices, порциями по BLOOM_CHUNK записей"""
+    view = np.frombuffer(array, dtype=np.uint8)
+    for start in range(0, len(database), BLOOM_CHUNK):
+        end = min(start + BLOOM_CHUNK, len(database))
+        records = np.frombuffer(database._mm, dtype=np.uint8, count=(end - start) * RECORD.size,
+                                offset=HEADER.size + RECORD.size * start).reshape(-1, RECORD.size)
+        h1 = records[:, :8].copy().view(">u8").ravel().astype(np.uint64)
+        h2 = records[:, 8:16].copy().view(">u8").ravel().astype(np.uint64) | np.uint64(1)
+        for i in range(hashes):
+            # Переполнение uint64 - то же, что & MASK64 в _bloom_indices
+            index = (h1 + np.uint64(i) * h2) % np.uint64(bits)
+            np.bitwise_or.at(view, index >> np.uint64(3),
+                             np.uint8(1) << (index & np.uint64(7)).astype(np.uint8))
+
+
+def _bloom_indices(digest: bytes, bits: int, hashes: int):
+    """Индексы битов: двойное хеширование по двум 64-битным частям SHA-1"""
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:16], "big") | 1
+    return [((h1 + i * h2) & MASK64) % bits for i in range(hashes)]
+
+
+def audit_vault(
+        storage: StorageManager,
+        database: PwnedDatabase,
+        progress: Optional[Callable[[int], None]] = None
+) -> List[Tuple[str, str, int]]:
+    """
+    Проверка всех паролей хранилища по базе утечек
+
+    Хеши проверяются по возрастанию: обращения к файлу идут в одну
+    сторону, а повторно использованный пароль проверяется один раз.
+
+    Returns:
+        [(сайт, логин, сколько раз встречался)] по убыванию частоты
+    """
+    if storage.is_locked():
+        raise RuntimeError("БД заблокирована")
+
+    hashed = []
+    for entry in storage.iter_entries():
+        hashed.append((hashlib.sha1(entry.password.encode("utf-8")).digest(),
+                       entry.site, entry.username))
+        if progress and len(hashed) % storage.ITER_BATCH_SIZE == 0:
+            progress(len(hashed))
+    hashed.sort()
+
+    found, previous, occurrences = [], None, 0
+    for digest, site, username in hashed:
+        if digest != previous:
+            previous, occurrences = digest, database.lookup(digest)
+        if occurrences:
+            found.append((site, username, occurrences))
+
+    found.sort(key=lambda item: -item[2])
+    print(f"✅ Проверка утечек: {len(hashed)} паролей, найдено в утечках {len(found)}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Офлайн-база утечек Have I Been Pwned")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("convert", help="конвертация текстового дампа в .pmhibp")
+    p.add_argument("source")
+    p.add_argument("dest", nargs="?", default=PWNED_PATH)
+    p.add_argument("--bloom-bits", type=int, default=0,
+                   help="бит фильтра Блума на запись (0 - без фильтра)")
+
+    p = sub.add_parser("bloom", help="фильтр Блума для готовой базы")
+    p.add_argument("database", nargs="?", default=PWNED_PATH)
+    p.add_argument("--bits", type=int, default=10)
+
+    p = sub.add_parser("check", help="проверка паролей")
+    p.add_argument("passwords", nargs="+")
+    p.add_argument("--database", default=PWNED_PATH)
+
+    args = parser.parse_args()
+    if args.command == "convert":
+        convert(args.source, args.dest, args.bloom_bits,
+                progress=lambda n: print(f"  {n} записей..."))
+    elif args.command == "bloom":
+        build_bloom(args.database, args.bits)
+    else:
+        database = open_database(args.database)
+        for password in args.passwords:
+            print(f"{password}: {database.count(password)}")
+
+
+if __name__ == "__main__":
+    main()
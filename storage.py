@@ -1,40 +1,152 @@
 # storage.py - Безопасное хранилище паролей
 import sqlite3
 import os
-from typing import Optional, List
+import glob
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Callable, Optional, List, Iterator, Tuple
 from datetime import datetime
-from models import PasswordEntry
-from crypto_utils import CryptoUtils
+from models import PasswordEntry, PasswordMeta, BatchResult
+from crypto_utils import CryptoUtils, KdfCalibration, KdfParams, QuickUnlock, VaultCipher
+from generator import PasswordPolicy
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """Настройки соединения SQLite (PRAGMA), применяются при каждом открытии БД"""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kib: int = 16384  # Кэш страниц, КиБ
+    mmap_size: int = 64 * 1024 * 1024  # Байт, 0 - без mmap
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5000
+
+    def __post_init__(self):
+        # Значения подставляются в PRAGMA напрямую - проверяем заранее
+        if self.journal_mode.upper() not in ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL"):
+            raise ValueError(f"Недопустимый journal_mode: {self.journal_mode}")
+        if self.synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Недопустимый synchronous: {self.synchronous}")
+        if self.temp_store.upper() not in ("DEFAULT", "FILE", "MEMORY"):
+            raise ValueError(f"Недопустимый temp_store: {self.temp_store}")
+
+    def apply(self, conn: sqlite3.Connection):
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+
+
+CONNECTION_PROFILES = {
+    # WAL + synchronous=NORMAL: читатели не блокируют запись, fsync только на checkpoint
+    "default": ConnectionProfile(),
+    # WAL, но fsync на каждый коммит
+    "durable": ConnectionProfile(synchronous="FULL"),
+    # Поведение SQLite по умолчанию (как до появления профилей)
+    "legacy": ConnectionProfile(journal_mode="DELETE", synchronous="FULL",
+                                cache_size_kib=2000, mmap_size=0,
+                                temp_store="DEFAULT", busy_timeout_ms=0),
+}
 
 
 class StorageManager:
     """Менеджер хранилища с шифрованием"""
 
-    DB_VERSION = 2  # Версия схемы БД
+    DB_VERSION = 5  # Версия схемы БД (3: индекс vault_fts, 4: ключ данных в meta, 5: site_policies)
+    DECRYPT_CHUNK_SIZE = 1024  # Строк на задачу при параллельной расшифровке
+    ITER_BATCH_SIZE = 500  # Строк на один fetchmany в потоковых выборках
+    IMPORT_POLICIES = ("skip", "overwrite", "keep-newer")
+    BACKUP_PAGES_PER_STEP = 256  # Страниц за один шаг резервного копирования
+    BACKUP_PAUSE = 0.005  # Пауза между шагами, с (окно для записи в БД)
+    # Параметры хранилищ, созданных до записи KDF в meta
+    LEGACY_KDF = KdfParams(iterations=600000, salt_length=32)
+    KDF_TARGET_SECONDS = 0.5  # Целевое время разблокировки при калибровке
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, decrypt_workers: int = 1,
+                 profile: Optional[ConnectionProfile] = None):
+        """
+        Args:
+            db_path: Путь к файлу БД
+            decrypt_workers: Число потоков для расшифровки больших выборок
+                (1 - последовательно). AES-GCM отпускает GIL.
+            profile: Настройки соединения (по умолчанию CONNECTION_PROFILES["default"])
+        """
         self.db_path = db_path
+        self.profile = profile or CONNECTION_PROFILES["default"]
+        self.decrypt_workers = max(1, decrypt_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
         self.conn: Optional[sqlite3.Connection] = None
-        self.key: Optional[bytes] = None
+        self.key: Optional[bytes] = None  # Ключ данных (не ключ из мастер-пароля)
+        self.cipher: Optional[VaultCipher] = None
         self.salt: Optional[bytes] = None
+        self.kdf: Optional[KdfParams] = None
+        # salt и kdf меняются парой, в том числе потоком обновления KDF
+        self._kdf_lock = threading.RLock()
+        self.kdf_calibrated = False  # Параметры подобраны под машину при создании
+        self._quick_unlock: Optional[QuickUnlock] = None
         self._is_locked = True
+        self._search_index = False
+        self._batch_depth = 0
 
     def exists(self) -> bool:
         """Проверка существования БД"""
         return os.path.exists(self.db_path)
 
-    def initialize(self, master_password: str) -> bool:
-        """Создание новой зашифрованной БД"""
+    def initialize(self, master_password: str,
+                   kdf_target: Optional[float] = KDF_TARGET_SECONDS,
+                   kdf_algorithm: str = "pbkdf2-sha256",
+                   kdf: Optional[KdfParams] = None) -> bool:
+        """
+        Создание новой зашифрованной БД
+
+        Args:
+            master_password: Мастер-пароль
+            kdf_target: Целевое время разблокировки, с - параметры KDF
+                подбираются под эту машину (None - CryptoUtils.default_kdf())
+            kdf_algorithm: Алгоритм KDF (KdfParams.ALGORITHMS)
+            kdf: Явные параметры KDF (без калибровки)
+        """
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-            cur = self.conn.cursor()
+            calibration = None
+            if kdf is None and kdf_target:
+                calibration = CryptoUtils.calibrate_kdf(kdf_target, kdf_algorithm)
+                kdf = calibration.params
+            kdf = kdf or CryptoUtils.default_kdf(kdf_algorithm)
+            salt = CryptoUtils.generate_salt(kdf.salt_length)
+            key = CryptoUtils.derive(master_password, salt, kdf)
+        except Exception as e:
+            print(f"❌ Ошибка создания ключа: {e}")
+            return False
 
-            # Генерируем соль
-            self.salt = CryptoUtils.generate_salt()
+        return self.initialize_with_key(salt, key, kdf, calibration)
 
-            # Создаём ключ
-            self.key = CryptoUtils.derive_key(master_password, self.salt)
+    def initialize_with_key(self, salt: bytes, key: bytes,
+                            kdf: Optional[KdfParams] = None,
+                            calibration: Optional[KdfCalibration] = None) -> bool:
+        """
+        Создание новой БД с заранее вычисленным ключом
+
+        Позволяет выполнить derive_key в фоновом потоке, не блокируя GUI.
+        kdf - параметры, с которыми вычислен ключ (по умолчанию параметры
+        из calibration или CryptoUtils.default_kdf()); сохраняются в meta
+        вместе с результатом калибровки.
+        Записи шифруются случайным ключом данных, который хранится в meta
+        зашифрованным ключом из мастер-пароля (wrapped_key).
+        """
+        try:
+            self.conn = self._connect()
+            cur = self.conn.cursor()
+
+            self.salt = salt
+            self.kdf = kdf or (calibration.params if calibration else CryptoUtils.default_kdf())
+            self.kdf_calibrated = calibration is not None
+            self.key = CryptoUtils.generate_key()
+            self.cipher = VaultCipher(self.key)
 
             # Создаём таблицы
             cur.execute("""
@@ -60,20 +172,31 @@ class StorageManager:
             # Индексы для быстрого поиска
             cur.execute("CREATE INDEX idx_site ON vault(site)")
             cur.execute("CREATE INDEX idx_username ON vault(username)")
+            self._create_search_index(cur)
+            self._create_policy_table(cur)
 
             # Сохраняем метаданные
             cur.execute("INSERT INTO meta VALUES ('salt', ?)", (self.salt,))
+            cur.execute("INSERT INTO meta VALUES ('kdf', ?)", (self.kdf.to_bytes(),))
+            if calibration:
+                cur.execute("INSERT INTO meta VALUES ('kdf_calibration', ?)",
+                            (calibration.to_bytes(),))
+                print(f"⏱ KDF: {self.kdf.describe()}, "
+                      f"~{calibration.estimated * 1000:.0f} мс на разблокировку")
+            cur.execute("INSERT INTO meta VALUES ('wrapped_key', ?)",
+                        (CryptoUtils.wrap_key(key, self.key),))
             cur.execute("INSERT INTO meta VALUES ('version', ?)",
                         (str(self.DB_VERSION).encode(),))
 
             # Создаём проверочную запись для валидации пароля
             verification = CryptoUtils.generate_secure_token(16)
-            encrypted_verification = CryptoUtils.encrypt(self.key, verification)
+            encrypted_verification = self.cipher.encrypt(verification)
             cur.execute("INSERT INTO meta VALUES ('verification', ?)",
                         (encrypted_verification,))
 
             self.conn.commit()
             self._is_locked = False
+            self._migrate(key)
 
             print(f"✅ База данных создана: {self.db_path}")
             return True
@@ -84,61 +207,507 @@ class StorageManager:
                 self.conn.close()
             self.conn = None
             self.key = None
+            self.cipher = None
             return False
 
-    def unlock(self, master_password: str) -> bool:
-        """Разблокировка существующей БД"""
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Открытие соединения с применением профиля
+
+        Соединение не привязано к потоку: длительные операции GUI
+        выполняет в рабочем потоке (StorageTask), окно в это время
+        заблокировано, так что обращения к нему не пересекаются.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        self.profile.apply(conn)
+        return conn
+
+    def load_salt(self) -> Optional[bytes]:
+        """
+        Открытие БД и загрузка соли и параметров KDF (без вычисления ключа)
+
+        Параметры доступны в self.kdf; ключ вычисляется через
+        CryptoUtils.derive(password, salt, self.kdf).
+        """
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-            cur = self.conn.cursor()
+            if not self.conn:
+                self.conn = self._connect()
 
-            # Загружаем соль
+            cur = self.conn.cursor()
             cur.execute("SELECT value FROM meta WHERE key = 'salt'")
             row = cur.fetchone()
             if not row:
                 raise ValueError("Повреждённая БД: нет соли")
 
-            self.salt = row['value']
+            salt = row['value']
+            cur.execute("SELECT value FROM meta WHERE key = 'kdf'")
+            row = cur.fetchone()
+            kdf = KdfParams.from_bytes(row['value']) if row else self.LEGACY_KDF
+            cur.execute("SELECT 1 FROM meta WHERE key = 'kdf_calibration'")
+            self.kdf_calibrated = cur.fetchone() is not None
+            with self._kdf_lock:
+                self.salt, self.kdf = salt, kdf
+            return salt
 
-            # Создаём ключ
-            self.key = CryptoUtils.derive_key(master_password, self.salt)
+        except Exception as e:
+            print(f"❌ Ошибка открытия БД: {e}")
+            if self.conn:
+                self.conn.close()
+            self.conn = None
+            return None
 
-            # Проверяем правильность пароля через verification
-            cur.execute("SELECT value FROM meta WHERE key = 'verification'")
-            row = cur.fetchone()
-            if not row:
-                raise ValueError("Повреждённая БД: нет верификации")
+    def unlock(self, master_password: str) -> bool:
+        """Разблокировка существующей БД"""
+        salt = self.load_salt()
+        if salt is None:
+            return False
+
+        try:
+            start = time.perf_counter()
+            key = CryptoUtils.derive(master_password, salt, self.kdf)
+            print(f"⏱ Ключ вычислен за {(time.perf_counter() - start) * 1000:.0f} мс "
+                  f"({self.kdf.describe()})")
+        except Exception as e:
+            print(f"❌ Ошибка создания ключа: {e}")
+            return False
+
+        if not self.unlock_with_key(key):
+            return False
+
+        self.start_kdf_upgrade(master_password)
+        return True
+
+    def unlock_with_key(self, key: bytes) -> bool:
+        """
+        Разблокировка заранее вычисленным ключом
+
+        Ключ получают через CryptoUtils.derive(password, load_salt(), kdf),
+        обычно в фоновом потоке. Обновить устаревшие параметры KDF можно
+        после входа через start_kdf_upgrade(password).
+        """
+        try:
+            if not self.conn and self.load_salt() is None:
+                return False
 
             try:
-                CryptoUtils.decrypt(self.key, row['value'])
-                self._is_locked = False
-                print("✅ База данных разблокирована")
-                return True
-            except:
+                data_key = self._unwrap_data_key(key)
+            except RuntimeError:
                 self.key = None
+                self.cipher = None
                 print("❌ Неверный пароль")
                 return False
 
+            self.key = data_key
+            self.cipher = VaultCipher(data_key)
+            self._is_locked = False
+            self._quick_unlock = None
+            self._migrate(key)
+            print("✅ База данных разблокирована")
+            return True
+
         except Exception as e:
             print(f"❌ Ошибка открытия БД: {e}")
             if self.conn:
                 self.conn.close()
             self.conn = None
             self.key = None
+            self.cipher = None
             return False
 
-    def add_password(self, entry: PasswordEntry) -> bool:
-        """Добавление нового пароля"""
+    def _unwrap_data_key(self, master_key: bytes) -> bytes:
+        """
+        Ключ данных по ключу из мастер-пароля
+
+        В БД до v4 ключа данных нет: записи зашифрованы самим ключом из
+        мастер-пароля, он проверяется по verification и возвращается как есть.
+
+        Raises:
+            RuntimeError: неверный мастер-пароль
+        """
+        cur = self.conn.cursor()
+        cur.execute("SELECT value FROM meta WHERE key = 'wrapped_key'")
+        row = cur.fetchone()
+        if row:
+            return CryptoUtils.unwrap_key(master_key, row['value'])
+
+        cur.execute("SELECT value FROM meta WHERE key = 'verification'")
+        row = cur.fetchone()
+        if not row:
+            raise ValueError("Повреждённая БД: нет верификации")
+
+        VaultCipher(master_key).decrypt(row['value'])
+        return master_key
+
+    def _migrate(self, master_key: bytes):
+        """Обновление схемы БД до DB_VERSION (каждый шаг - своя транзакция)"""
+        cur = self.conn.cursor()
+        cur.execute("SELECT value FROM meta WHERE key = 'version'")
+        row = cur.fetchone()
+        version = current = int(row['value']) if row else 1
+
+        if current < 3:
+            if self._create_search_index(cur):
+                cur.execute("INSERT INTO vault_fts(vault_fts) VALUES ('rebuild')")
+            current = self._set_version(cur, 3)
+
+        if current < 4:
+            key, cipher = self.key, self.cipher
+            try:
+                self._migrate_to_data_key(cur, master_key)
+                current = self._set_version(cur, 4)
+            except Exception as e:
+                # БД остаётся рабочей на прежнем ключе, попытка повторится при входе
+                self.conn.rollback()
+                self.key, self.cipher = key, cipher
+                print(f"⚠️ Не удалось перейти на ключ данных: {e}")
+
+        # Таблица правил от ключа данных не зависит - создаётся, даже если
+        # v4 не удался; номер версии поднимается только после v4, иначе
+        # незавершённый переход на ключ данных был бы пропущен
+        if current < 5:
+            self._create_policy_table(cur)
+            self.conn.commit()
+            if current == 4:
+                current = self._set_version(cur, 5)
+
+        if current > version:
+            print(f"✅ Схема БД обновлена: v{version} → v{current}")
+
+        cur.execute("SELECT 1 FROM meta WHERE key = 'kdf'")
+        if not cur.fetchone():
+            cur.execute("INSERT INTO meta VALUES ('kdf', ?)", (self.kdf.to_bytes(),))
+            self.conn.commit()
+
+        cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'vault_fts'")
+        self._search_index = cur.fetchone() is not None
+
+    def _set_version(self, cur: sqlite3.Cursor, version: int) -> int:
+        cur.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                    (str(version).encode(),))
+        self.conn.commit()
+        return version
+
+    def _migrate_to_data_key(self, cur: sqlite3.Cursor, master_key: bytes):
+        """
+        Переход на случайный ключ данных (v4)
+
+        Однократное перешифрование всех записей; дальше смена мастер-пароля
+        только перешифровывает wrapped_key. Вызывающий делает commit.
+
+        Записи расшифровываются действующим ключом (self.key), а не
+        master_key: если прошлая попытка не удалась, а пароль после неё
+        сменили, записи зашифрованы ключом прежнего пароля.
+
+        Поле, которое не расшифровывается, переносится как есть: одна
+        битая запись не должна навсегда блокировать миграцию.
+        """
+        data_key = CryptoUtils.generate_key()
+        old_cipher = self.cipher
+        new_cipher = VaultCipher(data_key)
+        unreadable = []
+
+        last_id = 0
+        while True:
+            cur.execute("""
+                SELECT id, password, notes FROM vault
+                WHERE id > ? ORDER BY id LIMIT ?
+            """, (last_id, self.DECRYPT_CHUNK_SIZE))
+            rows = cur.fetchall()
+            if not rows:
+                break
+
+            passwords = self._reencrypt(old_cipher, new_cipher,
+                                        [row['password'] for row in rows])
+            notes = self._reencrypt(old_cipher, new_cipher,
+                                    [row['notes'] for row in rows], optional=True)
+            unreadable.extend(
+                row['id'] for row, password, note in zip(rows, passwords, notes)
+                if password is row['password'] or (note is not None and note is row['notes'])
+            )
+
+            cur.executemany("UPDATE vault SET password = ?, notes = ? WHERE id = ?", (
+                (password, note, row['id'])
+                for row, password, note in zip(rows, passwords, notes)
+            ))
+            last_id = rows[-1]['id']
+
+        if unreadable:
+            print(f"⚠️ Не расшифровано при переходе на ключ данных, "
+                  f"перенесено как есть: {len(unreadable)} (id: {unreadable[:20]})")
+
+        cur.execute("UPDATE meta SET value = ? WHERE key = 'verification'",
+                    (new_cipher.encrypt(CryptoUtils.generate_secure_token(16)),))
+        cur.execute("INSERT OR REPLACE INTO meta VALUES ('wrapped_key', ?)",
+                    (CryptoUtils.wrap_key(master_key, data_key),))
+
+        self.key = data_key
+        self.cipher = new_cipher
+
+    @staticmethod
+    def _reencrypt(old_cipher: VaultCipher, new_cipher: VaultCipher,
+                   blobs: List[Optional[bytes]],
+                   optional: bool = False) -> List[Optional[bytes]]:
+        """
+        Перешифрование блобов; битые остаются исходным блобом
+
+        При optional пустые значения становятся None (как notes).
+        """
+        plaintexts = old_cipher.decrypt_many(blobs, strict=False)
+        result = list(blobs)
+        readable = [i for i, (blob, text) in enumerate(zip(blobs, plaintexts))
+                    if blob is not None and text is not None]
+        encrypt = new_cipher.encrypt_many_optional if optional else new_cipher.encrypt_many
+        encrypted = encrypt([plaintexts[i] for i in readable])
+        for i, blob in zip(readable, encrypted):
+            result[i] = blob
+        return result
+
+    def verify_master_key(self, master_key: bytes) -> bool:
+        """Проверка ключа из мастер-пароля на разблокированной БД"""
         if not self.key or self._is_locked:
-            print("❌ БД заблокирована")
             return False
 
         try:
-            encrypted_password = CryptoUtils.encrypt(self.key, entry.password)
+            return self._unwrap_data_key(master_key) == self.key
+        except (RuntimeError, ValueError):
+            return False
+
+    def change_master_key(self, current_key: bytes, salt: bytes, new_key: bytes,
+                          kdf: Optional[KdfParams] = None) -> bool:
+        """
+        Смена мастер-пароля по заранее вычисленным ключам
+
+        Перешифровывается только ключ данных - записи не трогаются.
+
+        Args:
+            current_key: Ключ из текущего мастер-пароля (для подтверждения)
+            salt: Новая соль
+            new_key: Ключ из нового мастер-пароля и новой соли
+            kdf: Параметры, с которыми вычислен new_key (по умолчанию текущие)
+
+        Returns:
+            True при успехе
+        """
+        if not self.verify_master_key(current_key):
+            print("❌ Неверный текущий пароль")
+            return False
+
+        try:
+            with self._kdf_lock:
+                kdf = kdf or self.kdf
+                cur = self.conn.cursor()
+                self._store_master_key(cur, salt, kdf, CryptoUtils.wrap_key(new_key, self.key))
+                self._commit()
+                self.salt, self.kdf = salt, kdf
+
+            print("✅ Мастер-пароль изменён")
+            return True
+
+        except Exception as e:
+            print(f"❌ Ошибка смены мастер-пароля: {e}")
+            self.conn.rollback()
+            return False
+
+    def change_master_password(self, current_password: str, new_password: str) -> bool:
+        """Смена мастер-пароля (вычисление обоих ключей - в вызывающем потоке)"""
+        # Под блокировкой: фоновое обновление KDF не сменит соль между расчётом и записью
+        with self._kdf_lock:
+            if not self.salt:
+                return False
+
+            kdf = self.recommended_kdf()
+            try:
+                current_key = CryptoUtils.derive(current_password, self.salt, self.kdf)
+                salt = CryptoUtils.generate_salt(kdf.salt_length)
+                new_key = CryptoUtils.derive(new_password, salt, kdf)
+            except Exception as e:
+                print(f"❌ Ошибка создания ключа: {e}")
+                return False
+
+            return self.change_master_key(current_key, salt, new_key, kdf)
+
+    def kdf_params(self) -> Tuple[Optional[bytes], Optional[KdfParams]]:
+        """Согласованная пара (соль, параметры KDF) для вычисления ключа"""
+        with self._kdf_lock:
+            return self.salt, self.kdf
+
+    @staticmethod
+    def _store_master_key(cur: sqlite3.Cursor, salt: bytes, kdf: KdfParams, wrapped: bytes):
+        cur.execute("INSERT OR REPLACE INTO meta VALUES ('salt', ?)", (salt,))
+        cur.execute("INSERT OR REPLACE INTO meta VALUES ('kdf', ?)", (kdf.to_bytes(),))
+        cur.execute("INSERT OR REPLACE INTO meta VALUES ('wrapped_key', ?)", (wrapped,))
+
+    def recommended_kdf(self) -> KdfParams:
+        """
+        Параметры KDF для смены пароля и обновления
+
+        Алгоритм БД сохраняется. Для откалиброванной БД - её собственные
+        параметры (не ниже нижних границ калибровки), иначе
+        CryptoUtils.default_kdf().
+        """
+        if not self.kdf:
+            return CryptoUtils.default_kdf()
+
+        default = CryptoUtils.default_kdf(self.kdf.algorithm)
+        if not self.kdf_calibrated:
+            return default
+
+        salt_length = max(self.kdf.salt_length, default.salt_length)
+        if self.kdf.algorithm == "scrypt":
+            return replace(self.kdf, n=max(self.kdf.n, CryptoUtils.SCRYPT_MIN_N),
+                           salt_length=salt_length)
+        return replace(self.kdf,
+                       iterations=max(self.kdf.iterations, CryptoUtils.MIN_ITERATIONS),
+                       salt_length=salt_length)
+
+    def kdf_needs_upgrade(self) -> bool:
+        """Устарели ли параметры KDF относительно recommended_kdf()"""
+        return bool(self.kdf) and self.kdf.weaker_than(self.recommended_kdf())
+
+    def start_kdf_upgrade(self, master_password: str) -> Optional[threading.Thread]:
+        """
+        Фоновое обновление устаревших параметров KDF после входа
+
+        Новый ключ вычисляется в отдельном потоке и записывается через
+        собственное соединение, поэтому вызывающий поток не ждёт.
+        Ключ данных перешифровывается, записи не трогаются.
+
+        Returns:
+            Поток обновления или None, если обновлять нечего
+        """
+        if not self.key or self._is_locked or not self.kdf_needs_upgrade():
+            return None
+
+        thread = threading.Thread(
+            target=self._upgrade_kdf,
+            args=(master_password, self.salt, self.key, self.recommended_kdf()),
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _upgrade_kdf(self, master_password: str, old_salt: bytes,
+                     data_key: bytes, kdf: KdfParams):
+        conn = None
+        try:
+            salt = CryptoUtils.generate_salt(kdf.salt_length)
+            wrapped = CryptoUtils.wrap_key(CryptoUtils.derive(master_password, salt, kdf), data_key)
+
+            conn = self._connect()
+            # Запись в БД и в self - одним шагом относительно change_master_key
+            with self._kdf_lock:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT value FROM meta WHERE key = 'salt'").fetchone()
+                has_key = conn.execute("SELECT 1 FROM meta WHERE key = 'wrapped_key'").fetchone()
+                # Пока шёл расчёт, пароль могли сменить (или БД ещё не v4)
+                if not row or row['value'] != old_salt or not has_key:
+                    conn.rollback()
+                    return
+
+                self._store_master_key(conn.cursor(), salt, kdf, wrapped)
+                conn.commit()
+                self.salt, self.kdf = salt, kdf
+            print(f"✅ Параметры KDF обновлены: {kdf.describe()}")
+
+        except Exception as e:
+            print(f"⚠️ Не удалось обновить параметры KDF: {e}")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def _create_policy_table(cur: sqlite3.Cursor):
+        """Правила генерации паролей по сайтам (PasswordPolicy в JSON, не секрет)"""
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS site_policies (
+                site TEXT PRIMARY KEY,
+                policy BLOB NOT NULL
+            )
+        """)
+
+    @staticmethod
+    def _create_search_index(cur: sqlite3.Cursor) -> bool:
+        """
+        Создание FTS5-индекса (trigram) по открытым полям site/username
+
+        Индекс хранит только ссылки на vault (external content) и
+        синхронизируется триггерами. Если SQLite собран без FTS5/trigram,
+        поиск работает через LIKE.
+        """
+        try:
+            cur.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS vault_fts USING fts5(
+                    site, username,
+                    content='vault', content_rowid='id',
+                    tokenize='trigram'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Полнотекстовый индекс недоступен: {e}")
+            return False
+
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS vault_fts_insert AFTER INSERT ON vault BEGIN
+                INSERT INTO vault_fts(rowid, site, username)
+                VALUES (new.id, new.site, new.username);
+            END
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS vault_fts_delete AFTER DELETE ON vault BEGIN
+                INSERT INTO vault_fts(vault_fts, rowid, site, username)
+                VALUES ('delete', old.id, old.site, old.username);
+            END
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS vault_fts_update
+            AFTER UPDATE OF site, username ON vault BEGIN
+                INSERT INTO vault_fts(vault_fts, rowid, site, username)
+                VALUES ('delete', old.id, old.site, old.username);
+                INSERT INTO vault_fts(rowid, site, username)
+                VALUES (new.id, new.site, new.username);
+            END
+        """)
+        return True
+
+    @staticmethod
+    def _fts_query(query: str, fuzzy: bool = False) -> Optional[str]:
+        """
+        Построение MATCH-выражения для trigram-индекса
+
+        Обычный режим - подстрока целиком (фраза из триграмм).
+        Нечёткий - любая из триграмм запроса; bm25 ставит выше записи,
+        совпавшие по большему числу триграмм. Запросы короче 3 символов
+        индекс не обслуживает (None).
+        """
+        query = query.strip()
+        if len(query) < 3:
+            return None
+
+        if not fuzzy:
+            return '"' + query.replace('"', '""') + '"'
+
+        grams = sorted({query[i:i + 3] for i in range(len(query) - 2)})
+        return " OR ".join('"' + g.replace('"', '""') + '"' for g in grams)
+
+    def add_password(self, entry: PasswordEntry) -> Optional[PasswordMeta]:
+        """
+        Добавление нового пароля
+
+        Returns:
+            Метаданные добавленной записи или None при ошибке
+        """
+        if not self.key or self._is_locked:
+            print("❌ БД заблокирована")
+            return None
+
+        try:
+            encrypted_password = self.cipher.encrypt(entry.password)
             encrypted_notes = None
             if entry.notes:
-                encrypted_notes = CryptoUtils.encrypt(self.key, entry.notes)
+                encrypted_notes = self.cipher.encrypt(entry.notes)
 
             now = datetime.now().isoformat()
 
@@ -148,18 +717,25 @@ class StorageManager:
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (entry.site, entry.username, encrypted_password, encrypted_notes, now, now))
 
-            self.conn.commit()
+            self._commit()
             print(f"✅ Пароль добавлен: {entry.site}")
-            return True
+            return PasswordMeta(
+                id=cur.lastrowid,
+                site=entry.site,
+                username=entry.username,
+                created_at=now,
+                updated_at=now,
+                has_notes=encrypted_notes is not None
+            )
 
         except sqlite3.IntegrityError:
             print(f"⚠️ Пароль для {entry.site} ({entry.username}) уже существует")
-            return False
+            return None
         except Exception as e:
             print(f"❌ Ошибка добавления: {e}")
             import traceback
             traceback.print_exc()
-            return False
+            return None
 
     def get_all_passwords(self) -> List[PasswordEntry]:
         """Получение всех паролей"""
@@ -174,25 +750,7 @@ class StorageManager:
                 ORDER BY site ASC
             """)
 
-            result = []
-            for row in cur.fetchall():
-                try:
-                    password = CryptoUtils.decrypt(self.key, row['password'])
-                    notes = None
-                    if row['notes']:
-                        notes = CryptoUtils.decrypt(self.key, row['notes'])
-
-                    result.append(PasswordEntry(
-                        site=row['site'],
-                        username=row['username'],
-                        password=password,
-                        notes=notes,
-                        created_at=row['created_at'],
-                        updated_at=row['updated_at']
-                    ))
-                except Exception as e:
-                    print(f"⚠️ Ошибка расшифровки записи {row['site']}: {e}")
-                    continue
+            result = self._rows_to_entries(cur.fetchall())
 
             print(f"✅ Загружено паролей: {len(result)}")
             return result
@@ -201,16 +759,188 @@ class StorageManager:
             print(f"❌ Ошибка загрузки: {e}")
             return []
 
-    def update_password(self, site: str, username: str, new_entry: PasswordEntry) -> bool:
-        """Обновление существующего пароля"""
+    def iter_entries(self, after_site: Optional[str] = None,
+                     after_username: Optional[str] = None,
+                     limit: Optional[int] = None) -> Iterator[PasswordEntry]:
+        """
+        Потоковое чтение паролей порциями fetchmany
+
+        Память ограничена размером порции, а не размером хранилища.
+        Keyset-пагинация: следующая страница начинается после
+        (after_site, after_username) последней полученной записи.
+        """
         if not self.key or self._is_locked:
-            return False
+            return
+
+        where, params = self._page_clause([], [], after_site, after_username, limit)
+        yield from self._iter_rows(f"""
+            SELECT site, username, password, notes, created_at, updated_at
+            FROM vault
+            {where}
+        """, params)
+
+    def iter_search(self, query: str, after_site: Optional[str] = None,
+                    after_username: Optional[str] = None,
+                    limit: Optional[int] = None) -> Iterator[PasswordEntry]:
+        """Потоковый поиск по сайту или логину (см. iter_entries)"""
+        if not self.key or self._is_locked:
+            return
+
+        match = self._fts_query(query) if self._search_index else None
+        if match is not None:
+            condition = "id IN (SELECT rowid FROM vault_fts WHERE vault_fts MATCH ?)"
+            params = [match]
+        else:
+            condition = "(site LIKE ? OR username LIKE ?)"
+            params = [f"%{query}%", f"%{query}%"]
+
+        where, params = self._page_clause(
+            [condition], params, after_site, after_username, limit
+        )
+        yield from self._iter_rows(f"""
+            SELECT site, username, password, notes, created_at, updated_at
+            FROM vault
+            {where}
+        """, params)
+
+    def list_entries(self, after_site: Optional[str] = None,
+                     after_username: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[PasswordMeta]:
+        """
+        Получение списка записей без расшифровки
+
+        Возвращает только открытые метаданные (сайт, логин, даты).
+        Пароль расшифровывается по запросу через reveal().
+        Поддерживает ту же keyset-пагинацию, что и iter_entries.
+        """
+        if not self.key or self._is_locked:
+            return []
+
+        try:
+            where, params = self._page_clause([], [], after_site, after_username, limit)
+            cur = self.conn.cursor()
+            cur.execute(f"""
+                SELECT id, site, username, notes IS NOT NULL AS has_notes,
+                       created_at, updated_at
+                FROM vault
+                {where}
+            """, params)
+
+            result = [self._row_to_meta(row) for row in cur.fetchall()]
+
+            print(f"✅ Загружено записей: {len(result)}")
+            return result
+
+        except Exception as e:
+            print(f"❌ Ошибка загрузки: {e}")
+            return []
+
+    def search_entries(self, query: str, limit: int = 200,
+                       fuzzy: bool = True) -> List[PasswordMeta]:
+        """
+        Ранжированный поиск по метаданным без расшифровки
+
+        Сначала точное совпадение подстроки (записи, где сайт или логин
+        начинается с запроса, идут первыми), затем, если ничего не найдено
+        и fuzzy=True, нечёткий поиск по общим триграммам.
+        """
+        if not self.key or self._is_locked:
+            return []
 
         try:
-            encrypted_password = CryptoUtils.encrypt(self.key, new_entry.password)
+            cur = self.conn.cursor()
+            match = self._fts_query(query) if self._search_index else None
+
+            if match is None:
+                cur.execute("""
+                    SELECT id, site, username, notes IS NOT NULL AS has_notes,
+                           created_at, updated_at
+                    FROM vault
+                    WHERE site LIKE ? OR username LIKE ?
+                    ORDER BY site ASC, username ASC
+                    LIMIT ?
+                """, (f"%{query}%", f"%{query}%", limit))
+                return [self._row_to_meta(row) for row in cur.fetchall()]
+
+            rows = self._ranked_search(cur, """
+                v.id, v.site, v.username, v.notes IS NOT NULL AS has_notes,
+                v.created_at, v.updated_at
+            """, match, query, limit)
+
+            if not rows and fuzzy:
+                rows = self._ranked_search(cur, """
+                    v.id, v.site, v.username, v.notes IS NOT NULL AS has_notes,
+                    v.created_at, v.updated_at
+                """, self._fts_query(query, fuzzy=True), query, limit)
+
+            return [self._row_to_meta(row) for row in rows]
+
+        except Exception as e:
+            print(f"❌ Ошибка поиска: {e}")
+            return []
+
+    @staticmethod
+    def _ranked_search(cur: sqlite3.Cursor, columns: str, match: str,
+                       query: str, limit: Optional[int]) -> list:
+        """Запрос к vault_fts: совпадения по префиксу выше, затем bm25"""
+        prefix = f"{query.strip()}%"
+        cur.execute(f"""
+            SELECT {columns}
+            FROM vault_fts
+            JOIN vault v ON v.id = vault_fts.rowid
+            WHERE vault_fts MATCH ?
+            ORDER BY (v.site LIKE ? OR v.username LIKE ?) DESC,
+                     bm25(vault_fts), v.site ASC
+            LIMIT ?
+        """, (match, prefix, prefix, -1 if limit is None else limit))
+        return cur.fetchall()
+
+    @staticmethod
+    def _row_to_meta(row: sqlite3.Row) -> PasswordMeta:
+        return PasswordMeta(
+            id=row['id'],
+            site=row['site'],
+            username=row['username'],
+            created_at=row['created_at'],
+            updated_at=row['updated_at'],
+            has_notes=bool(row['has_notes'])
+        )
+
+    def reveal(self, entry_id: int) -> Optional[str]:
+        """Расшифровка пароля одной записи по её id"""
+        if not self.key or self._is_locked:
+            return None
+
+        try:
+            cur = self.conn.cursor()
+            cur.execute("SELECT site, password FROM vault WHERE id = ?", (entry_id,))
+            row = cur.fetchone()
+            if not row:
+                print(f"⚠️ Запись не найдена: id={entry_id}")
+                return None
+
+            return self.cipher.decrypt(row['password'])
+
+        except Exception as e:
+            print(f"❌ Ошибка расшифровки записи id={entry_id}: {e}")
+            return None
+
+    def update_password(self, site: str, username: str,
+                        new_entry: PasswordEntry) -> Optional[PasswordMeta]:
+        """
+        Обновление существующего пароля
+
+        Returns:
+            Метаданные обновлённой записи или None, если запись не найдена
+        """
+        if not self.key or self._is_locked:
+            return None
+
+        try:
+            encrypted_password = self.cipher.encrypt(new_entry.password)
             encrypted_notes = None
             if new_entry.notes:
-                encrypted_notes = CryptoUtils.encrypt(self.key, new_entry.notes)
+                encrypted_notes = self.cipher.encrypt(new_entry.notes)
 
             now = datetime.now().isoformat()
 
@@ -221,73 +951,337 @@ class StorageManager:
                 WHERE site = ? AND username = ?
             """, (encrypted_password, encrypted_notes, now, site, username))
 
-            self.conn.commit()
-
-            if cur.rowcount > 0:
-                print(f"✅ Пароль обновлён: {site}")
-                return True
-            else:
+            if cur.rowcount == 0:
+                self._commit()
                 print(f"⚠️ Запись не найдена: {site}")
-                return False
+                return None
+
+            row = self._select_meta(cur, site, username)
+            self._commit()
+
+            print(f"✅ Пароль обновлён: {site}")
+            return self._row_to_meta(row)
 
         except Exception as e:
             print(f"❌ Ошибка обновления: {e}")
-            return False
+            return None
+
+    def delete_password(self, site: str, username: str) -> Optional[PasswordMeta]:
+        """
+        Удаление пароля
 
-    def delete_password(self, site: str, username: str) -> bool:
-        """Удаление пароля"""
+        Returns:
+            Метаданные удалённой записи или None, если запись не найдена
+        """
         if not self.key or self._is_locked:
-            return False
+            return None
 
         try:
             cur = self.conn.cursor()
-            cur.execute("DELETE FROM vault WHERE site = ? AND username = ?",
-                        (site, username))
-            self.conn.commit()
-
-            if cur.rowcount > 0:
-                print(f"✅ Пароль удалён: {site}")
-                return True
-            else:
+            row = self._select_meta(cur, site, username)
+            if not row:
                 print(f"⚠️ Запись не найдена: {site}")
-                return False
+                return None
+
+            cur.execute("DELETE FROM vault WHERE id = ?", (row['id'],))
+            self._commit()
+
+            print(f"✅ Пароль удалён: {site}")
+            return self._row_to_meta(row)
 
         except Exception as e:
             print(f"❌ Ошибка удаления: {e}")
+            return None
+
+    def get_policy(self, site: str) -> Optional[PasswordPolicy]:
+        """Правила генерации для сайта или None, если не заданы"""
+        if not self.conn or self._is_locked:
+            return None
+
+        try:
+            cur = self.conn.cursor()
+            cur.execute("SELECT policy FROM site_policies WHERE site = ?", (site,))
+            row = cur.fetchone()
+            return PasswordPolicy.from_bytes(row['policy']) if row else None
+        except Exception as e:
+            print(f"⚠️ Не удалось прочитать правила для {site}: {e}")
+            return None
+
+    def set_policy(self, site: str, policy: Optional[PasswordPolicy]) -> bool:
+        """Сохранение правил генерации для сайта (None - удалить)"""
+        if not self.conn or self._is_locked:
             return False
 
+        try:
+            cur = self.conn.cursor()
+            if policy is None:
+                cur.execute("DELETE FROM site_policies WHERE site = ?", (site,))
+            else:
+                cur.execute("INSERT OR REPLACE INTO site_policies VALUES (?, ?)",
+                            (site, policy.to_bytes()))
+            self._commit()
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка сохранения правил: {e}")
+            return False
+
+    @contextmanager
+    def batch(self):
+        """
+        Группировка изменений в одну транзакцию
+
+        Внутри блока add/update/delete не коммитят по отдельности:
+        один commit (и один fsync) на выходе, rollback при исключении.
+        Блоки можно вкладывать.
+
+        Пример:
+            with storage.batch():
+                for entry in entries:
+                    storage.add_password(entry)
+        """
+        self._batch_depth += 1
+        completed = False
+        try:
+            yield self
+            completed = True
+        finally:
+            # finally, а не except Exception: KeyboardInterrupt/GeneratorExit
+            # тоже должны вернуть счётчик, иначе _commit() замолчит навсегда
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self.conn:
+                if completed:
+                    self.conn.commit()
+                else:
+                    self.conn.rollback()
+
+    def _commit(self):
+        """Commit, если не идёт пакетная транзакция"""
+        if self._batch_depth == 0:
+            self.conn.commit()
+
+    def add_many(self, entries: List[PasswordEntry]) -> Optional[BatchResult]:
+        """
+        Пакетное добавление
+
+        Все значения шифруются заранее, вставка - одним executemany в одной
+        транзакции. Записи, уже существующие в БД (или повторённые в пакете),
+        не прерывают пакет, а попадают в BatchResult.conflicts.
+        """
+        if not self.key or self._is_locked:
+            print("❌ БД заблокирована")
+            return None
+
+        try:
+            passwords = self.cipher.encrypt_many([e.password.encode('utf-8') for e in entries])
+            notes = self.cipher.encrypt_many_optional(
+                [e.notes.encode('utf-8') if e.notes else None for e in entries])
+            now = datetime.now().isoformat()
+
+            result = BatchResult()
+            with self.batch():
+                cur = self.conn.cursor()
+                seen = self._existing_keys(cur, [(e.site, e.username) for e in entries])
+
+                rows = []
+                for entry, password, note in zip(entries, passwords, notes):
+                    key = (entry.site, entry.username)
+                    if key in seen:
+                        result.conflicts.append(key)
+                        continue
+                    seen.add(key)
+                    rows.append((entry.site, entry.username, password, note, now, now))
+
+                cur.executemany("""
+                    INSERT INTO vault (site, username, password, notes, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+                result.processed = len(rows)
+
+            print(f"✅ Добавлено паролей: {result.processed}, конфликтов: {len(result.conflicts)}")
+            return result
+
+        except Exception as e:
+            print(f"❌ Ошибка пакетного добавления: {e}")
+            return None
+
+    def update_many(self, entries: List[PasswordEntry]) -> Optional[BatchResult]:
+        """
+        Пакетное обновление паролей и заметок
+
+        Запись определяется по (entry.site, entry.username); отсутствующие
+        записи попадают в BatchResult.conflicts.
+        """
+        if not self.key or self._is_locked:
+            return None
+
+        try:
+            passwords = self.cipher.encrypt_many([e.password.encode('utf-8') for e in entries])
+            notes = self.cipher.encrypt_many_optional(
+                [e.notes.encode('utf-8') if e.notes else None for e in entries])
+            now = datetime.now().isoformat()
+
+            result = BatchResult()
+            with self.batch():
+                cur = self.conn.cursor()
+                existing = self._existing_keys(cur, [(e.site, e.username) for e in entries])
+
+                rows = []
+                for entry, password, note in zip(entries, passwords, notes):
+                    key = (entry.site, entry.username)
+                    if key not in existing:
+                        result.conflicts.append(key)
+                        continue
+                    rows.append((password, note, now, entry.site, entry.username))
+
+                cur.executemany("""
+                    UPDATE vault
+                    SET password = ?, notes = ?, updated_at = ?
+                    WHERE site = ? AND username = ?
+                """, rows)
+                result.processed = len(rows)
+
+            print(f"✅ Обновлено паролей: {result.processed}, не найдено: {len(result.conflicts)}")
+            return result
+
+        except Exception as e:
+            print(f"❌ Ошибка пакетного обновления: {e}")
+            return None
+
+    def delete_many(self, keys: List[Tuple[str, str]]) -> Optional[BatchResult]:
+        """Пакетное удаление по (site, username); отсутствующие - в conflicts"""
+        if not self.key or self._is_locked:
+            return None
+
+        try:
+            result = BatchResult()
+            with self.batch():
+                cur = self.conn.cursor()
+                existing = self._existing_keys(cur, keys)
+
+                rows = []
+                for key in keys:
+                    if key not in existing:
+                        result.conflicts.append(key)
+                        continue
+                    existing.discard(key)
+                    rows.append(key)
+
+                cur.executemany("DELETE FROM vault WHERE site = ? AND username = ?", rows)
+                result.processed = len(rows)
+
+            print(f"✅ Удалено паролей: {result.processed}, не найдено: {len(result.conflicts)}")
+            return result
+
+        except Exception as e:
+            print(f"❌ Ошибка пакетного удаления: {e}")
+            return None
+
+    def write_encrypted(self, rows: List[tuple], policy: str = "skip") -> Optional[Tuple[int, int, int]]:
+        """
+        Запись уже зашифрованных строк одним executemany (для импорта)
+
+        Args:
+            rows: Кортежи (site, username, password, notes, created_at, updated_at),
+                где password/notes - блобы VaultCipher
+            policy: Разрешение конфликта UNIQUE(site, username), одно из
+                IMPORT_POLICIES: skip - оставить существующую запись,
+                overwrite - заменить, keep-newer - заменить, если у новой
+                записи updated_at позже
+
+        Returns:
+            (добавлено, обновлено, пропущено) или None при ошибке
+        """
+        if not self.key or self._is_locked:
+            return None
+        if policy not in self.IMPORT_POLICIES:
+            raise ValueError(f"Неизвестная политика конфликтов: {policy}")
+
+        if policy == "skip":
+            conflict = "DO NOTHING"
+        else:
+            conflict = """DO UPDATE SET
+                password = excluded.password,
+                notes = excluded.notes,
+                updated_at = excluded.updated_at"""
+            if policy == "keep-newer":
+                conflict += " WHERE excluded.updated_at > vault.updated_at"
+
+        try:
+            with self.batch():
+                cur = self.conn.cursor()
+                existing = self._existing_keys(cur, [(row[0], row[1]) for row in rows])
+                inserted = len({(row[0], row[1]) for row in rows} - existing)
+
+                cur.executemany(f"""
+                    INSERT INTO vault (site, username, password, notes, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(site, username) {conflict}
+                """, rows)
+                # rowcount суммируется по executemany и не учитывает триггеры
+                changed = max(cur.rowcount, 0)
+
+            return inserted, changed - inserted, len(rows) - changed
+
+        except Exception as e:
+            print(f"❌ Ошибка записи: {e}")
+            return None
+
+    @staticmethod
+    def _existing_keys(cur: sqlite3.Cursor, keys: List[Tuple[str, str]]) -> set:
+        """Какие из пар (site, username) уже есть в vault (запросы порциями по idx_site)"""
+        sites = sorted({site for site, _ in keys})
+        wanted = set(keys)
+        existing = set()
+
+        for i in range(0, len(sites), 500):
+            chunk = sites[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cur.execute(f"SELECT site, username FROM vault WHERE site IN ({placeholders})", chunk)
+            existing.update(
+                (row['site'], row['username']) for row in cur.fetchall()
+                if (row['site'], row['username']) in wanted
+            )
+
+        return existing
+
+    @staticmethod
+    def _select_meta(cur: sqlite3.Cursor, site: str, username: str) -> Optional[sqlite3.Row]:
+        cur.execute("""
+            SELECT id, site, username, notes IS NOT NULL AS has_notes,
+                   created_at, updated_at
+            FROM vault
+            WHERE site = ? AND username = ?
+        """, (site, username))
+        return cur.fetchone()
+
     def search_passwords(self, query: str) -> List[PasswordEntry]:
-        """Поиск паролей по сайту или логину"""
+        """
+        Поиск паролей по сайту или логину
+
+        При наличии vault_fts - по индексу с ранжированием по релевантности,
+        иначе (или для запросов короче 3 символов) - через LIKE.
+        """
         if not self.key or self._is_locked:
             return []
 
         try:
             cur = self.conn.cursor()
-            cur.execute("""
-                SELECT site, username, password, notes, created_at, updated_at 
-                FROM vault 
-                WHERE site LIKE ? OR username LIKE ?
-                ORDER BY site ASC
-            """, (f"%{query}%", f"%{query}%"))
-
-            result = []
-            for row in cur.fetchall():
-                try:
-                    password = CryptoUtils.decrypt(self.key, row['password'])
-                    notes = None
-                    if row['notes']:
-                        notes = CryptoUtils.decrypt(self.key, row['notes'])
-
-                    result.append(PasswordEntry(
-                        site=row['site'],
-                        username=row['username'],
-                        password=password,
-                        notes=notes,
-                        created_at=row['created_at'],
-                        updated_at=row['updated_at']
-                    ))
-                except:
-                    continue
+            match = self._fts_query(query) if self._search_index else None
+
+            if match is not None:
+                rows = self._ranked_search(cur, """
+                    v.site, v.username, v.password, v.notes, v.created_at, v.updated_at
+                """, match, query, None)
+            else:
+                cur.execute("""
+                    SELECT site, username, password, notes, created_at, updated_at
+                    FROM vault
+                    WHERE site LIKE ? OR username LIKE ?
+                    ORDER BY site ASC
+                """, (f"%{query}%", f"%{query}%"))
+                rows = cur.fetchall()
+
+            result = self._rows_to_entries(rows, warn=False)
 
             return result
 
@@ -295,6 +1289,99 @@ class StorageManager:
             print(f"❌ Ошибка поиска: {e}")
             return []
 
+    @staticmethod
+    def _page_clause(conditions: List[str], params: list,
+                     after_site: Optional[str], after_username: Optional[str],
+                     limit: Optional[int]) -> Tuple[str, list]:
+        """
+        Сборка WHERE ... ORDER BY ... LIMIT для keyset-пагинации
+
+        Порядок (site, username) совпадает с индексом UNIQUE(site, username).
+        Без after_username страница начинается со следующего сайта.
+        """
+        conditions = list(conditions)
+        params = list(params)
+
+        if after_site is not None:
+            if after_username is None:
+                conditions.append("site > ?")
+                params.append(after_site)
+            else:
+                conditions.append("(site, username) > (?, ?)")
+                params.extend([after_site, after_username])
+
+        sql = ""
+        if conditions:
+            sql += "WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY site ASC, username ASC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return sql, params
+
+    def _iter_rows(self, sql: str, params: list) -> Iterator[PasswordEntry]:
+        """Выполнение запроса и расшифровка результата порциями"""
+        try:
+            cur = self.conn.cursor()
+            cur.execute(sql, params)
+
+            while True:
+                rows = cur.fetchmany(self.ITER_BATCH_SIZE)
+                # БД могли заблокировать между порциями
+                if not rows or not self.cipher:
+                    break
+                yield from self._rows_to_entries(rows)
+
+        except sqlite3.Error as e:
+            print(f"❌ Ошибка чтения: {e}")
+
+    def _rows_to_entries(self, rows, warn: bool = True) -> List[PasswordEntry]:
+        """
+        Расшифровка строк vault с сохранением порядка
+
+        При decrypt_workers > 1 строки делятся на чанки и расшифровываются
+        в пуле потоков; executor.map сохраняет исходный порядок (ORDER BY site).
+        """
+        chunk = self.DECRYPT_CHUNK_SIZE
+        if self.decrypt_workers == 1 or len(rows) <= chunk:
+            return self._decode_chunk(rows, warn)
+
+        if not self._executor:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.decrypt_workers,
+                thread_name_prefix="vault-decrypt"
+            )
+
+        chunks = [rows[i:i + chunk] for i in range(0, len(rows), chunk)]
+        result = []
+        for part in self._executor.map(lambda c: self._decode_chunk(c, warn), chunks):
+            result.extend(part)
+        return result
+
+    def _decode_chunk(self, rows, warn: bool) -> List[PasswordEntry]:
+        """Пакетная расшифровка строк vault; битые записи пропускаются"""
+        passwords = self.cipher.decrypt_many([row['password'] for row in rows], strict=False)
+        notes = self.cipher.decrypt_many([row['notes'] for row in rows], strict=False)
+
+        result = []
+        for row, password, note in zip(rows, passwords, notes):
+            if password is None or (row['notes'] and note is None):
+                if warn:
+                    print(f"⚠️ Ошибка расшифровки записи {row['site']}")
+                continue
+
+            result.append(PasswordEntry(
+                site=row['site'],
+                username=row['username'],
+                password=str(password, 'utf-8'),
+                notes=str(note, 'utf-8') if note is not None else None,
+                created_at=row['created_at'],
+                updated_at=row['updated_at']
+            ))
+
+        return result
+
     def get_stats(self) -> dict:
         """Получение статистики"""
         if not self.conn or self._is_locked:
@@ -312,15 +1399,161 @@ class StorageManager:
         except:
             return {"total": 0, "sites": 0}
 
-    def lock(self):
-        """Блокировка БД (очистка ключа из памяти)"""
+    def backup(self, dest: str, pages_per_step: int = None,
+               progress: Optional[Callable[[int, int], None]] = None,
+               pause: float = None) -> bool:
+        """
+        Горячая резервная копия БД (sqlite3 backup API)
+
+        Копирование идёт через отдельное соединение, поэтому метод можно
+        вызывать из фонового потока. В режиме WAL это соединение держит
+        одну транзакцию чтения на всю копию: снимок БД не меняется, а
+        запись из приложения идёт параллельно (читатели WAL не блокируют
+        писателей). В остальных режимах блокировка снимается между шагами,
+        а при изменении БД SQLite начинает копию заново.
+        Ключ не нужен: копируются зашифрованные страницы как есть.
+
+        Args:
+            dest: Путь к файлу копии (пишется во временный и переименовывается)
+            pages_per_step: Страниц за шаг (<= 0 - всё за один шаг)
+            progress: Вызывается после каждого шага с (скопировано, всего) страниц
+            pause: Пауза между шагами, с
+
+        Returns:
+            True при успехе
+        """
+        if pages_per_step is None:
+            pages_per_step = self.BACKUP_PAGES_PER_STEP
+        if pause is None:
+            pause = self.BACKUP_PAUSE
+
+        def on_step(status, remaining, total):
+            if progress:
+                progress(total - remaining, total)
+            if remaining and pause:
+                time.sleep(pause)
+
+        tmp_path = dest + ".part"
+        source = target = None
+        try:
+            source = self._connect()
+            mode = source.execute("PRAGMA journal_mode").fetchone()[0]
+            if mode.lower() == "wal":
+                # Фиксируем снимок: иначе каждая запись перезапускала бы копию
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+            target = sqlite3.connect(tmp_path)
+            source.backup(target, pages=pages_per_step, progress=on_step)
+            target.close()
+            target = None
+            os.replace(tmp_path, dest)
+            return True
+
+        except Exception as e:
+            print(f"❌ Ошибка резервного копирования: {e}")
+            if target:
+                target.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        finally:
+            if source:
+                source.close()
+
+    def create_backup(self, directory: str, keep: int = 7,
+                      **kwargs) -> Optional[str]:
+        """
+        Резервная копия с отметкой времени в каталоге и ротацией
+
+        Хранятся только keep последних копий этой БД.
+        Остальные аргументы - см. backup().
+
+        Returns:
+            Путь к новой копии или None при ошибке
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        dest = os.path.join(directory, f"{stem}-{stamp}.db")
+
+        if not self.backup(dest, **kwargs):
+            return None
+
+        for old in self.list_backups(directory)[keep:]:
+            try:
+                os.remove(old)
+            except OSError as e:
+                print(f"⚠️ Не удалось удалить старую копию {old}: {e}")
+
+        print(f"✅ Резервная копия: {dest}")
+        return dest
+
+    def list_backups(self, directory: str) -> List[str]:
+        """Резервные копии этой БД в каталоге, от новых к старым"""
+        stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        pattern = os.path.join(glob.escape(directory), f"{glob.escape(stem)}-*.db")
+        # Отметка времени в имени сортируется лексикографически
+        return sorted(glob.glob(pattern), reverse=True)
+
+    def lock(self, pin: Optional[str] = None, **quick_unlock):
+        """
+        Блокировка БД (очистка ключа из памяти)
+
+        Args:
+            pin: Если задан, ключ данных остаётся в памяти зашифрованным
+                ключом из PIN для quick_unlock() (см. QuickUnlock)
+            quick_unlock: max_attempts/ttl для QuickUnlock
+        """
+        if pin and self.key and not self._is_locked:
+            self._quick_unlock = QuickUnlock(self.key, pin, **quick_unlock)
+        else:
+            self._quick_unlock = None
+
         self.key = None
+        self.cipher = None
         self._is_locked = True
         print("🔒 База данных заблокирована")
 
+    def quick_unlock_available(self) -> bool:
+        """Доступна ли разблокировка по PIN"""
+        if self._quick_unlock and not self._quick_unlock.available:
+            self._quick_unlock = None
+        return self._quick_unlock is not None
+
+    def quick_unlock_attempts(self) -> int:
+        """Оставшиеся попытки ввода PIN"""
+        return self._quick_unlock.attempts_left if self.quick_unlock_available() else 0
+
+    def quick_unlock(self, pin: str) -> bool:
+        """
+        Разблокировка по PIN без вычисления ключа из мастер-пароля
+
+        После исчерпания попыток или истечения срока нужен unlock().
+        """
+        if not self.conn or not self.quick_unlock_available():
+            return False
+
+        data_key = self._quick_unlock.unlock(pin)
+        if data_key is None:
+            print(f"❌ Неверный PIN (осталось попыток: {self.quick_unlock_attempts()})")
+            return False
+
+        self._quick_unlock = None
+        self.key = data_key
+        self.cipher = VaultCipher(data_key)
+        self._is_locked = False
+        print("✅ База данных разблокирована по PIN")
+        return True
+
     def close(self):
         """Закрытие БД"""
         self.lock()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         if self.conn:
             self.conn.close()
             self.conn = None
@@ -0,0 +1,619 @@
+#!/usr/bin/env python3
+# strength.py - Оценка стойкости пароля в стиле zxcvbn
+"""
+Пароль разбирается на фрагменты, которые угадываются быстрее перебора:
+
+    dictionary  - частые пароли, в том числе с заглавными и l33t-заменами
+    spatial     - ряды соседних клавиш (qwerty, цифровой блок)
+    sequence    - последовательности и повторы (abc, 9876, aaaa)
+    date        - даты и годы
+
+Остальное считается перебором (10 вариантов на символ). Из всех разбиений
+выбирается требующее меньше всего попыток (динамика по позициям).
+
+Анализ инкрементальный: состояние хранится по позициям, и при вводе
+символа пересчитываются только фрагменты, которые на нём заканчиваются.
+Словарь - отсортированный массив слов (формат .pmdict, для файла - mmap);
+для каждого начала фрагмента хранится диапазон слов с этим префиксом,
+который сужается с каждым символом, как при спуске по префиксному дереву.
+
+Встроенный список частых паролей небольшой; большой список (по убыванию
+частоты, по слову на строку) конвертируется один раз:
+    python strength.py build top-100000.txt
+"""
+import argparse
+import math
+import mmap
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+DICTIONARY_EXTENSION = ".pmdict"
+DICTIONARY_PATH = "common_passwords" + DICTIONARY_EXTENSION
+MAGIC = b"PMDICT01"
+
+HEADER = struct.Struct(">8sI")
+UINT = struct.Struct(">I")
+UINT_PAIR = struct.Struct(">II")
+
+BRUTEFORCE_CARDINALITY = 10  # Попыток на символ перебора
+MIN_MATCH_GUESSES = 50  # Минимум попыток на найденный фрагмент
+MIN_YEAR_SPACE = 20
+REFERENCE_YEAR = datetime.now().year
+
+# Частые пароли по убыванию частоты (утечки последних лет)
+COMMON_PASSWORDS = """
+123456 password 123456789 12345678 12345 qwerty 1234567 111111 1234567890
+123123 abc123 1234 password1 iloveyou 1q2w3e4r 000000 qwerty123 zaq12wsx
+dragon sunshine princess letmein 654321 monkey 1qaz2wsx 123321 qwertyuiop
+superman asdfghjkl 666666 121212 football 123qwe baseball welcome 1111
+master shadow michael 987654321 jesus 7777777 mustang trustno1 access
+flower login passw0rd admin starwars 555555 lovely hello charlie donald
+freedom whatever qazwsx ninja azerty solo loveme 888888 batman hottie
+q1w2e3r4t5 aa123456 123654 zxcvbnm 112233 google 1q2w3e 159753 11111111
+computer jordan michelle tigger daniel 1234qwer killer soccer hockey
+pepper hunter buster andrew thomas robert 2000 harley ranger joshua
+maggie jennifer 696969 asdfgh 131313 summer ashley nicole chelsea biteme
+matthew yankees dallas austin thunder taylor matrix william corvette
+martin heather secret merlin diamond hammer silver anthony justin test
+bailey 1234561 asdf 123abc 11111 family samsung orange ginger george
+cookie purple internet 123456a 654321a qwe123 password123 lol123 lovers
+angel 1qazxsw2 q1w2e3r4 asd123 qwer1234 a123456 1q2w3e4r5t abcd1234
+hello123 000000a monkey123 dragon123 welcome1 admin123 root toor pass
+changeme default guest user administrator 12344321 147258369 147258
+159357 741852963 789456123 789456 456789 98765 321654 qwertyu 1qaz
+zxcvbn asdfg qwert 123qweasd 1q2w 1qa2ws3ed 12qwaszx qweasdzxc
+qweasd asdzxc zaq1xsw2 love sex god money secret666 passpass
+letmein1 football1 iloveyou1 princess1 sunshine1 baseball1 superman1
+banana chocolate pokemon naruto blink182 liverpool arsenal barcelona
+juventus chelsea1 starwars1 whatever1 trustno11 master123 shadow123
+killer123 qwerty1 qwerty12 qwertyui 1password password12 password2
+p@ssw0rd p@ssword passw0rd1 pa55word 5201314 woaini 1314520 zhang
+ferrari porsche mercedes bmw yamaha harley1 dakota cowboys eagles
+steelers packers lakers yankees1 rangers panthers tigers 19851985
+19861986 19871987 19881988 19891989 19901990 19911991 19921992 123456789a
+qwerty1234 1qaz2wsx3edc 1qazxsw23edc zaq123 qazwsx123 abc 123 qwe asd
+zxc aaa 12 99999999 88888888 77777777 00000000 11223344 121314 123456q
+q123456 qq123456 privet parol parol123 marina natasha anastasia sasha
+maksim dima andrey alexander alex vladimir olga svetlana ivan sergey
+nikita kirill masha katya lena tanya vika zenit spartak dinamo
+""".split()
+
+# l33t-замены: символ -> буквы, которые он может изображать
+L33T = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "[": "c", "<": "c",
+    "3": "e", "6": "g", "9": "g", "1": "il", "!": "i", "|": "il",
+    "0": "o", "$": "s", "5": "s", "+": "t", "7": "lt", "%": "x", "2": "z",
+}
+
+QWERTY = ("`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./")
+QWERTY_SHIFTED = ("~!@#$%^&*()_+", "QWERTYUIOP{}|", 'ASDFGHJKL:"', "ZXCVBNM<>?")
+KEYPAD = ("789", "456", "123", "0")
+
+SCORES = (
+    ("Очень слабый", 10),
+    ("Слабый", 30),
+    ("Средний", 50),
+    ("Сильный", 75),
+    ("Очень сильный", 100),
+)
+
+WARNINGS = {
+    "dictionary": "Это один из самых частых паролей",
+    "l33t": "Замены вроде p@ssw0rd почти не усложняют подбор",
+    "spatial": "Ряды соседних клавиш легко угадать",
+    "sequence": "Последовательности вроде abc или 6543 легко угадать",
+    "repeat": "Повторы вроде aaa легко угадать",
+    "date": "Даты и годы легко угадать",
+}
+
+
+@dataclass(frozen=True)
+class StrengthEstimate:
+    """Результат оценки: ожидаемое число попыток подбора и оценка 0-4"""
+    guesses: float
+    score: int
+    warning: str = ""
+
+    @property
+    def entropy(self) -> float:
+        return math.log2(max(self.guesses, 1))
+
+    @property
+    def level(self) -> str:
+        return SCORES[self.score][0]
+
+    @property
+    def percent(self) -> int:
+        return SCORES[self.score][1]
+
+
+class Dictionary:
+    """
+    Отсортированный словарь с частотными рангами (формат .pmdict)
+
+        magic "PMDICT01" | число слов (4)
+        смещения слов: (число слов + 1) x 4
+        ранги: число слов x 4 (1 - самый частый)
+        слова: UTF-8 по возрастанию байт, без разделителей
+    """
+
+    def __init__(self, buffer):
+        magic, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Неизвестный формат словаря")
+
+        self._buffer = buffer
+        self._count = count
+        self._ranks = HEADER.size + UINT.size * (count + 1)
+        self._data = self._ranks + UINT.size * count
+        if len(buffer) < self._data:
+            raise ValueError("Словарь обрезан")
+
+    @classmethod
+    def open(cls, path: str) -> "Dictionary":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def compile(words: Iterable[str]) -> bytes:
+        """Словарь .pmdict из слов по убыванию частоты"""
+        ranks = {}
+        for word in words:
+            word = word.strip().lower()
+            if word and word not in ranks:
+                ranks[word] = len(ranks) + 1
+
+        encoded = sorted((word.encode("utf-8"), rank) for word, rank in ranks.items())
+        offsets, position = [0], 0
+        for word, _ in encoded:
+            position += len(word)
+            offsets.append(position)
+
+        return b"".join([
+            HEADER.pack(MAGIC, len(encoded)),
+            struct.pack(f">{len(offsets)}I", *offsets),
+            struct.pack(f">{len(encoded)}I", *(rank for _, rank in encoded)),
+            *(word for word, _ in encoded),
+        ])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def word(self, index: int) -> bytes:
+        start, end = UINT_PAIR.unpack_from(self._buffer, HEADER.size + UINT.size * index)
+        return self._buffer[self._data + start:self._data + end]
+
+    def rank(self, index: int) -> int:
+        return UINT.unpack_from(self._buffer, self._ranks + UINT.size * index)[0]
+
+    def narrow(self, prefix: bytes, lo: int, hi: int) -> Tuple[int, int]:
+        """Диапазон слов с префиксом prefix внутри [lo, hi)"""
+        lo = self._lower_bound(prefix, lo, hi)
+        # 0xff не встречается в UTF-8: все слова с префиксом меньше prefix + 0xff
+        return lo, self._lower_bound(prefix + b"\xff", lo, hi)
+
+    def _lower_bound(self, key: bytes, lo: int, hi: int) -> int:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+def build_dictionary(source: str, dest: str = None) -> int:
+    """
+    Конвертация текстового списка паролей (по убыванию частоты) в .pmdict
+
+    Returns:
+        Число слов в словаре
+    """
+    if dest is None:
+        dest = os.path.splitext(source)[0] + DICTIONARY_EXTENSION
+
+    with open(source, encoding="utf-8", errors="ignore") as f:
+        data = Dictionary.compile(line for line in f)
+
+    tmp_path = dest + ".part"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    count = len(Dictionary(data))
+    dictionaries.cache_clear()
+    print(f"✅ Словарь паролей: {count} слов → {dest}")
+    return count
+
+
+@lru_cache(maxsize=None)
+def dictionaries() -> Tuple[Dictionary, ...]:
+    """Встроенный словарь и DICTIONARY_PATH, если он есть (загружаются при первой оценке)"""
+    result = [Dictionary(Dictionary.compile(COMMON_PASSWORDS))]
+    if os.path.exists(DICTIONARY_PATH):
+        try:
+            result.append(Dictionary.open(DICTIONARY_PATH))
+        except (OSError, ValueError, struct.error) as e:
+            print(f"⚠️ Словарь паролей не загружен: {e}")
+    return tuple(result)
+
+
+class _Keyboard:
+    """Граф соседних клавиш: символ -> клавиша, клавиша -> {сосед: направление}"""
+
+    def __init__(self, rows, shifted_rows=(), slanted=True):
+        self.keys = {}
+        self.shifted = set()
+        positions = {}
+        for r, row in enumerate(rows):
+            for c, key in enumerate(row):
+                positions[r, c] = key
+                self.keys[key] = key
+        for row, shifted in zip(rows, shifted_rows):
+            for key, char in zip(row, shifted):
+                self.keys[char] = key
+                self.shifted.add(char)
+
+        # Клавиатура - ряды со сдвигом на полклавиши, цифровой блок - сетка
+        if slanted:
+            moves = [(0, -1), (0, 1), (-1, 0), (-1, 1), (1, -1), (1, 0)]
+        else:
+            moves = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+
+        self.neighbors = {}
+        for (r, c), key in positions.items():
+            self.neighbors[key] = {
+                positions[r + dr, c + dc]: (dr, dc)
+                for dr, dc in moves if (r + dr, c + dc) in positions
+            }
+
+        self.starts = len(self.neighbors)
+        self.degree = sum(map(len, self.neighbors.values())) / self.starts
+
+    def direction(self, a: str, b: str) -> Optional[tuple]:
+        key_a, key_b = self.keys.get(a), self.keys.get(b)
+        if key_a is None or key_b is None:
+            return None
+        return self.neighbors[key_a].get(key_b)
+
+    def guesses(self, token: str, turns: int) -> float:
+        """Число рядов той же длины с тем же числом поворотов (формула zxcvbn)"""
+        guesses = 0.0
+        for i in range(2, len(token) + 1):
+            for j in range(1, min(turns, i - 1) + 1):
+                guesses += math.comb(i - 1, j - 1) * self.starts * self.degree ** j
+
+        shifted = sum(1 for char in token if char in self.shifted)
+        if shifted:
+            unshifted = len(token) - shifted
+            if unshifted == 0:
+                guesses *= 2
+            else:
+                guesses *= sum(math.comb(len(token), i) for i in range(1, min(shifted, unshifted) + 1))
+        return guesses
+
+
+KEYBOARDS = (_Keyboard(QWERTY, QWERTY_SHIFTED), _Keyboard(KEYPAD, slanted=False))
+
+
+class _Position:
+    """Состояние анализа после символа k"""
+    __slots__ = ("ranges", "walks", "sequence", "best")
+
+    def __init__(self):
+        # Диапазоны словаря: (начало, словарь, lo, hi, префикс, l33t-замены)
+        self.ranges: List[tuple] = []
+        # Ряды клавиш по клавиатурам: (начало, поворотов, направление)
+        self.walks: List[tuple] = []
+        # Последовательность: (начало, шаг)
+        self.sequence: tuple = (0, None)
+        # Лучшее разбиение префикса: (log2 попыток, фрагментов, перебор?, начало, шаблон)
+        self.best: tuple = (0.0, 0, False, 0, None)
+
+
+class StrengthEstimator:
+    """
+    Инкрементальная оценка стойкости
+
+    Хранит состояние по позициям для последнего пароля: при вводе
+    символа, удалении с конца или правке в середине пересчёт идёт
+    только с первой изменённой позиции.
+    """
+
+    MAX_RANGES = 64  # Ограничение числа отслеживаемых префиксов на позицию
+
+    def __init__(self):
+        self._password = ""
+        self._positions: List[_Position] = []
+        self._lock = threading.Lock()
+
+    def estimate(self, password: str) -> StrengthEstimate:
+        with self._lock:
+            common = 0
+            limit = min(len(password), len(self._password))
+            while common < limit and password[common] == self._password[common]:
+                common += 1
+
+            del self._positions[common:]
+            for k in range(common, len(password)):
+                self._positions.append(self._step(password, k))
+            self._password = password
+
+            if not password:
+                return StrengthEstimate(guesses=1, score=0)
+
+            cost = self._positions[-1].best[0]
+            return StrengthEstimate(
+                guesses=2 ** cost,
+                score=_score(2 ** cost),
+                warning=self._warning(password),
+            )
+
+    def _step(self, password: str, k: int) -> _Position:
+        position = _Position()
+        previous = self._positions[k - 1] if k else None
+        char = password[k]
+        matches = []  # (начало, попыток, шаблон)
+
+        # Словарь: сужаем диапазоны всех начал, заканчивающихся на k - 1
+        candidates = [(char.lower(), None)]
+        candidates += [(letter, (char, letter)) for letter in L33T.get(char, "")]
+        ranges = previous.ranges if previous else []
+        started = [(k, d, 0, len(dictionary), "", ())
+                   for d, dictionary in enumerate(dictionaries())]
+
+        for start, d, lo, hi, prefix, subs in ranges + started:
+            dictionary = dictionaries()[d]
+            for letter, sub in candidates:
+                text = prefix + letter
+                key = text.encode("utf-8")
+                new_lo, new_hi = dictionary.narrow(key, lo, hi)
+                if new_lo == new_hi:
+                    continue
+                new_subs = subs + (sub,) if sub else subs
+                if len(position.ranges) < self.MAX_RANGES:
+                    position.ranges.append((start, d, new_lo, new_hi, text, new_subs))
+                if len(text) >= 3 and dictionary.word(new_lo) == key:
+                    token = password[start:k + 1]
+                    guesses = (dictionary.rank(new_lo) * _uppercase_variations(token)
+                               * _l33t_variations(token, new_subs))
+                    matches.append((start, guesses, "l33t" if new_subs else "dictionary"))
+
+        # Ряды соседних клавиш
+        for i, keyboard in enumerate(KEYBOARDS):
+            direction = keyboard.direction(password[k - 1], char) if k else None
+            if direction is None:
+                walk = (k, 0, None)
+            else:
+                start, turns, last = previous.walks[i]
+                walk = (start, turns + (direction != last), direction)
+            position.walks.append(walk)
+
+            start, turns, _ = walk
+            if k - start >= 2:
+                matches.append((start, keyboard.guesses(password[start:k + 1], turns), "spatial"))
+
+        # Последовательности и повторы
+        start, delta = previous.sequence if previous else (k, None)
+        step = _sequence_step(password[k - 1], char) if k else None
+        if step is None:
+            position.sequence = (k, None)
+        elif step != delta:
+            position.sequence = (k - 1, step)
+        else:
+            position.sequence = (start, delta)
+
+        start, delta = position.sequence
+        if delta is not None and k - start >= 2:
+            matches.append((start, _sequence_guesses(password[start:k + 1], delta),
+                            "repeat" if delta == 0 else "sequence"))
+
+        # Даты
+        for length in range(4, min(k + 1, 10) + 1):
+            guesses = _date_guesses(password[k - length + 1:k + 1])
+            if guesses:
+                matches.append((k - length + 1, guesses, "date"))
+
+        position.best = self._best(k, matches)
+        return position
+
+    def _best(self, k: int, matches: List[tuple]) -> tuple:
+        """
+        Лучшее разбиение password[:k + 1]
+
+        Каждый новый фрагмент умножает число попыток на свой номер
+        (порядок фрагментов неизвестен атакующему - множитель l!, как в zxcvbn).
+        """
+        def before(start):
+            return self._positions[start - 1].best if start else (0.0, 0, False, 0, None)
+
+        cost, tokens, bruteforce, _, _ = before(k)
+        step = math.log2(BRUTEFORCE_CARDINALITY)
+        if bruteforce:
+            best = (cost + step, tokens, True, k, None)
+        else:
+            best = (cost + step + math.log2(tokens + 1), tokens + 1, True, k, None)
+
+        for start, guesses, pattern in matches:
+            cost, tokens, _, _, _ = before(start)
+            total = cost + math.log2(max(guesses, MIN_MATCH_GUESSES)) + math.log2(tokens + 1)
+            if total < best[0]:
+                best = (total, tokens + 1, False, start, pattern)
+        return best
+
+    def _warning(self, password: str) -> str:
+        """Предупреждение по самому длинному шаблону в лучшем разбиении"""
+        k = len(password) - 1
+        found, longest = None, 0
+        while k >= 0:
+            _, _, _, start, pattern = self._positions[k].best
+            if pattern and k - start + 1 > longest:
+                found, longest = pattern, k - start + 1
+            k = start - 1 if pattern else k - 1
+        return WARNINGS.get(found, "")
+
+
+_estimator = StrengthEstimator()
+
+
+def estimate(password: str) -> StrengthEstimate:
+    """Оценка стойкости (общий экземпляр с памятью префиксов)"""
+    return _estimator.estimate(password)
+
+
+def _score(guesses: float) -> int:
+    for score, limit in enumerate((1e3, 1e6, 1e8, 1e10)):
+        if guesses < limit + 5:
+            return score
+    return 4
+
+
+def _uppercase_variations(token: str) -> float:
+    if token.islower() or not any(c.isalpha() for c in token):
+        return 1
+    letters = [c for c in token if c.isalpha()]
+    if token.isupper() or (letters[0].isupper() and "".join(letters[1:]).islower()) \
+            or (letters[-1].isupper() and "".join(letters[:-1]).islower()):
+        return 2
+
+    upper = sum(1 for c in letters if c.isupper())
+    lower = len(letters) - upper
+    return sum(math.comb(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+def _l33t_variations(token: str, subs: tuple) -> float:
+    variations = 1
+    lowered = token.lower()
+    for subbed, letter in set(subs):
+        s, u = lowered.count(subbed), lowered.count(letter)
+        if s == 0 or u == 0:
+            variations *= 2
+        else:
+            variations *= sum(math.comb(s + u, i) for i in range(1, min(s, u) + 1))
+    return variations
+
+
+def _is_digits(text: str) -> bool:
+    """Только ASCII-цифры (isdigit верен и для «²», «٣», которые int не всегда разберёт)"""
+    return text.isascii() and text.isdecimal()
+
+
+def _char_class(char: str) -> str:
+    if _is_digits(char):
+        return "digit"
+    if char.isascii() and char.islower():
+        return "lower"
+    if char.isascii() and char.isupper():
+        return "upper"
+    return "other"
+
+
+def _sequence_step(a: str, b: str) -> Optional[int]:
+    """Шаг между соседними символами последовательности или None"""
+    if a == b:
+        return 0
+    if _char_class(a) != _char_class(b) or _char_class(a) == "other":
+        return None
+    delta = ord(b) - ord(a)
+    return delta if abs(delta) <= 5 else None
+
+
+def _sequence_guesses(token: str, delta: int) -> float:
+    first = token[0]
+    if delta == 0:
+        base = {"digit": 10, "lower": 26, "upper": 26}.get(_char_class(first), 33)
+    elif first in "aAzZ019":
+        base = 4
+    elif _is_digits(first):
+        base = 10
+    else:
+        base = 26
+    if delta < 0:
+        base *= 2
+    return base * len(token)
+
+
+def _year(text: str) -> Optional[int]:
+    year = int(text)
+    if len(text) == 2:
+        return year + (1900 if year > 50 else 2000)
+    if len(text) == 4 and 1900 <= year <= 2049:
+        return year
+    return None
+
+
+def _is_day_month(a: str, b: str) -> bool:
+    day, month = int(a), int(b)
+    return (1 <= day <= 31 and 1 <= month <= 12) or (1 <= month <= 31 and 1 <= day <= 12)
+
+
+def _date_guesses(token: str) -> Optional[float]:
+    """Число попыток для даты (ДДММГГГГ, ГГГГ-ММ-ДД, ...) или года; None - не дата"""
+    separator = next((c for c in token if not _is_digits(c)), None)
+    if separator is None:
+        if len(token) == 4:
+            year = _year(token)
+            return max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) if year else None
+        splits = []
+        for year_length in (2, 4):
+            rest = len(token) - year_length
+            if not 2 <= rest <= 4:
+                continue
+            for year_first in (False, True):
+                year = token[:year_length] if year_first else token[rest:]
+                day_month = token[year_length:] if year_first else token[:rest]
+                for cut in range(max(1, rest - 2), min(2, rest - 1) + 1):
+                    splits.append((year, day_month[:cut], day_month[cut:]))
+    else:
+        parts = token.split(separator)
+        if separator not in "-/._ \\" or len(parts) != 3 or not all(_is_digits(p) for p in parts):
+            return None
+        if len(parts[0]) == 4:
+            splits = [(parts[0], parts[1], parts[2])]
+        elif len(parts[2]) in (2, 4) and len(parts[0]) <= 2 and len(parts[1]) <= 2:
+            splits = [(parts[2], parts[0], parts[1])]
+        else:
+            return None
+
+    for year_text, a, b in splits:
+        year = _year(year_text)
+        if year and _is_day_month(a, b):
+            guesses = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365
+            return guesses * 4 if separator else guesses
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Оценка стойкости паролей")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="конвертация списка частых паролей в .pmdict")
+    p.add_argument("source")
+    p.add_argument("dest", nargs="?", default=DICTIONARY_PATH)
+
+    p = sub.add_parser("check", help="оценка паролей")
+    p.add_argument("passwords", nargs="+")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        build_dictionary(args.source, args.dest)
+        return
+
+    for password in args.passwords:
+        result = estimate(password)
+        print(f"{password}: {result.level}, 10^{math.log10(result.guesses):.1f} попыток, "
+              f"{result.entropy:.0f} бит {result.warning}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Тесты политик генерации: точный подсчёт против полного перебора
+"""
+
+import string
+from itertools import product
+
+import pytest
+
+from generator import PasswordPolicy
+
+# Маленькие алфавиты, чтобы перебор был быстрым
+TINY = dict(lowercase=None, uppercase=None, symbol_set="!@")
+
+
+def _alphabets(policy: PasswordPolicy) -> dict:
+    """Наборы символов, собранные независимо от PasswordPolicy.classes()"""
+    chars = {
+        "lowercase": string.ascii_lowercase,
+        "uppercase": string.ascii_uppercase,
+        "digits": string.digits,
+        "symbols": policy.symbol_set,
+    }
+    if policy.exclude_ambiguous:
+        chars = {name: "".join(c for c in s if c not in "loIO01") for name, s in chars.items()}
+    return {name: s for name, s in chars.items() if getattr(policy, name) is not None and s}
+
+
+def _satisfies(policy: PasswordPolicy, password: str) -> bool:
+    alphabets = _alphabets(policy)
+    if not policy.min_length <= len(password) <= policy.max_length:
+        return False
+    if any(not any(c in s for s in alphabets.values()) for c in password):
+        return False
+    if any(sum(c in s for c in password) < getattr(policy, name) for name, s in alphabets.items()):
+        return False
+    if policy.start_with and not any(password[0] in alphabets[name] for name in policy.start_with):
+        return False
+    if policy.no_repeat and any(a == b for a, b in zip(password, password[1:])):
+        return False
+    return True
+
+
+def _brute_force(policy: PasswordPolicy) -> int:
+    alphabet = "".join(_alphabets(policy).values())
+    return sum(
+        _satisfies(policy, "".join(chars))
+        for length in range(policy.min_length, policy.max_length + 1)
+        for chars in product(alphabet, repeat=length)
+    )
+
+
+POLICIES = [
+    dict(min_length=1, max_length=4, digits=0, symbols=0, **TINY),
+    dict(min_length=2, max_length=4, digits=2, symbols=1, **TINY),
+    dict(min_length=3, max_length=4, digits=1, symbols=2, **TINY),
+    dict(min_length=3, max_length=4, digits=1, symbols=2, symbol_set="!@#",
+         lowercase=None, uppercase=None),
+    dict(min_length=2, max_length=4, digits=0, symbols=1, no_repeat=True, **TINY),
+    dict(min_length=3, max_length=4, digits=0, symbols=3, no_repeat=True, **TINY),
+    dict(min_length=3, max_length=4, digits=2, symbols=2, no_repeat=True, **TINY),
+    dict(min_length=2, max_length=4, digits=1, symbols=1, start_with=("symbols",), **TINY),
+    dict(min_length=3, max_length=4, digits=0, symbols=2, no_repeat=True,
+         start_with=("digits",), **TINY),
+    dict(min_length=2, max_length=4, digits=1, symbols=1, no_repeat=True,
+         start_with=("digits", "symbols"), **TINY),
+    dict(min_length=2, max_length=3, digits=1, symbols=0, exclude_ambiguous=True, **TINY),
+    dict(min_length=2, max_length=4, digits=2, symbols=None, no_repeat=True,
+         exclude_ambiguous=True, start_with=("digits",), **TINY),
+    dict(min_length=1, max_length=3, digits=None, symbols=1, symbol_set="!@#$", no_repeat=True,
+         lowercase=None, uppercase=None),
+]
+
+
+@pytest.mark.parametrize("kwargs", POLICIES)
+def test_count_matches_brute_force(kwargs):
+    policy = PasswordPolicy(**kwargs)
+    assert policy.count() == _brute_force(policy)
+
+
+@pytest.mark.parametrize("kwargs", POLICIES)
+def test_count_by_length(kwargs):
+    policy = PasswordPolicy(**kwargs)
+    total = sum(policy.count(n) for n in range(policy.min_length, policy.max_length + 1))
+    assert total == policy.count()
+
+
+@pytest.mark.parametrize("kwargs", POLICIES + [
+    dict(),
+    dict(no_repeat=True),
+    dict(min_length=16, max_length=16, lowercase=2, uppercase=2, digits=3, symbols=3,
+         start_with=("uppercase",), exclude_ambiguous=True),
+    dict(min_length=18, max_length=18, lowercase=None, uppercase=None, digits=None,
+         symbols=0, symbol_set="!?@", no_repeat=True),
+    dict(min_length=20, max_length=32, lowercase=4, uppercase=4, digits=4, symbols=4,
+         no_repeat=True, start_with=("lowercase", "uppercase")),
+])
+def test_generate_satisfies_policy(kwargs):
+    policy = PasswordPolicy(**kwargs)
+    for _ in range(200):
+        password = policy.generate()
+        assert _satisfies(policy, password), password
+
+
+def test_generate_covers_all_passwords():
+    policy = PasswordPolicy(min_length=2, max_length=3, digits=0, symbols=1,
+                            no_repeat=True, start_with=("symbols",), **TINY)
+    seen = {policy.generate() for _ in range(5000)}
+    assert len(seen) == policy.count()
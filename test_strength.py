@@ -0,0 +1,24 @@
+"""
+Регрессионные тесты оценщика стойкости
+"""
+
+import pytest
+
+from strength import StrengthEstimator
+
+
+@pytest.mark.parametrize("password", [
+    "²²²²",            # надстрочные: isdigit() верен, int() падает
+    "ab²³¹⁴",
+    "01²02²1990",      # «дата» с надстрочным разделителем
+    "٠١٠١١٩٩٠",        # арабско-индийские цифры
+    "١٢.٠٥.١٩٩٠",
+])
+def test_non_ascii_digits(password):
+    result = StrengthEstimator().estimate(password)
+    assert result.entropy > 0
+
+
+def test_ascii_date_still_detected():
+    estimator = StrengthEstimator()
+    assert estimator.estimate("12.05.1990").entropy < estimator.estimate("12.05.x990").entropy